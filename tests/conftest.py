@@ -0,0 +1,312 @@
+import functools
+import logging
+import os
+import uuid
+import pytest
+
+from framework import artifacts, history, instrumentation, locators, scheduler, web_vitals
+from framework.event_log import setup_logging, shutdown_logging
+
+from framework import flows
+from framework.browser_pool import BrowserPool
+from framework.checkpoints import restore_checkpoint, resume_point, save_checkpoint
+from framework.config import BROWSER_CONTEXTS, BROWSER_POOL_SIZE, DRIVER_PROFILE, SITE_MODE, PERF_BUDGET_ENFORCE, THROTTLING
+from framework.drivers import PROFILES, create_driver, remote_url
+from framework.fast_mode import network_stats, log_network_stats
+from framework.popups import collect_dismissals, log_dismissals
+from framework.replay import MODES, SiteProxy
+from framework.throttling import PROFILES as THROTTLING_PROFILES, use_throttling
+
+
+def pytest_addoption(parser):
+    parser.addoption("--driver-profile", choices=PROFILES, default=DRIVER_PROFILE,
+                     help="default: maximized Chrome; fast: headless Chrome that blocks images, fonts and trackers")
+    parser.addoption("--site-mode", choices=MODES, default=SITE_MODE,
+                     help="live: use the real site; record: use it and save the traffic; replay: serve the saved traffic offline")
+    parser.addoption("--throttling", choices=list(THROTTLING_PROFILES), default=THROTTLING,
+                     help="network and CPU profile to run under, e.g. 3G, slow-4G or low-end-device (see THROTTLING_PROFILES)")
+    parser.addoption("--artifacts", choices=artifacts.MODES, default=artifacts.CAPTURE,
+                     help="failure: capture screenshot, HTML, console and network log of failing tests; step: after every step too; off")
+    parser.addoption("--resume", action="store_true",
+                     help="start at the first test that failed in the last run, restoring the saved checkpoints")
+    parser.addoption("--resume-from", metavar="TEST",
+                     help="start at this test (name or node id), restoring the saved checkpoints")
+    parser.addoption("--schedule", choices=scheduler.ORDERS, default=scheduler.SCHEDULER.get("order", "duration"),
+                     help="duration: longest tests first, from the run history; file: the order in the test file")
+    parser.addoption("--budget", type=float, metavar="SECONDS",
+                     help="only run the most valuable tests that fit into this many seconds per worker")
+    parser.addoption("--shard", metavar="K/N",
+                     help="run shard K of N, the shards being balanced by the tests' durations in the run history")
+    parser.addoption("--grid", metavar="URL", default=None,
+                     help="remote WebDriver or Selenium Grid endpoint to run the browsers on (default: GRID in config.json)")
+    parser.addoption("--browser-contexts", action="store_true", default=BROWSER_CONTEXTS,
+                     help="run every test in its own isolated browser context of one shared Chrome per worker")
+
+def pytest_configure(config):
+    setup_logging()
+    # pytest-xdist hands every worker the same run id, so their history ends up under one run
+    config.run_uid = getattr(config, "workerinput", {}).get("testrunuid") or uuid.uuid4().hex
+    config.outcomes = {}
+    artifacts.enable_step_capture(config.getoption("--artifacts"))
+    config.restore_checkpoints = set()  # Checkpoints still to be restored, filled in when resuming
+    # Registered here as well so the suite still runs cleanly without pytest-xdist
+    config.addinivalue_line("markers", "xdist_group(name): run all tests of the group on the same worker")
+    config.addinivalue_line("markers", "throttling(profile): run the test under this network and CPU profile")
+
+def pytest_collection_modifyitems(config, items):
+    # A resumed run keeps the file order, it picks up where the failed run stopped
+    if not _resume(config, items):
+        _schedule(config, items)
+
+def _schedule(config, items):
+    order, budget, shard = config.getoption("--schedule"), config.getoption("--budget"), config.getoption("--shard")
+    if order == "file" and not budget and not shard:
+        return
+    if not any("driver" in getattr(item, "fixturenames", ()) for item in items):
+        return  # Only unit tests: they have no history to schedule by
+    stats = scheduler.load_stats()
+    if shard:
+        index, count = _parse_shard(shard)
+        chosen = scheduler.shards(items, stats, count)[index - 1]
+        config.hook.pytest_deselected(items=[item for item in items if item not in chosen])
+        items[:] = chosen
+        logging.info(f"SCHEDULER: Shard {index}/{count}: running {len(items)} tests")
+    if budget:
+        workers = getattr(config, "workerinput", {}).get("workercount") or config.getoption("numprocesses", None)
+        selected = scheduler.select_within_budget([[item.nodeid for item in block] for block in scheduler.blocks(items)],
+                                                  stats, budget, workers if isinstance(workers, int) and workers > 0 else 1)
+        if items and not selected:
+            raise pytest.UsageError(f"No test fits into a budget of {budget:.0f}s; tests without history count as "
+                                    f"{scheduler.DEFAULT_DURATION}s (SCHEDULER[\"default_duration\"])")
+        config.hook.pytest_deselected(items=[item for item in items if item.nodeid not in selected])
+        items[:] = [item for item in items if item.nodeid in selected]
+        logging.info(f"SCHEDULER: Budget of {budget:.0f}s: running {len(items)} tests")
+    if order == "duration":
+        items[:] = scheduler.longest_first(items, stats)
+
+def _parse_shard(shard):
+    """(K, N) of a --shard K/N value."""
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise pytest.UsageError(f"--shard expects K/N, like 1/3, not {shard!r}") from None
+    if not 1 <= index <= count:
+        raise pytest.UsageError(f"--shard {shard}: K must be between 1 and N")
+    return index, count
+
+def _resume(config, items):
+    start_at = config.getoption("--resume-from")
+    if not (start_at or config.getoption("--resume")):
+        return False
+    failed = []
+    if not start_at:
+        connection = history.connect()
+        failed = history.failed_in_last_run(connection)
+        connection.close()
+    index = resume_point(items, failed, start_at)
+    if index is None:
+        logging.info(f"CHECKPOINT: Nothing to resume from ({start_at or 'no failures in the last run'}), running every test")
+        return False
+    config.hook.pytest_deselected(items=items[:index])
+    logging.info(f"CHECKPOINT: Resuming from {items[index].nodeid}, skipping {index} tests")
+    items[:] = items[index:]
+    config.restore_checkpoints = {"logged-in", "pin-set", "on-search-results", "item-in-cart", "on-address-book"}
+    return True
+
+def _record_outcome(outcomes, report):
+    # A failing setup or teardown fails the test as well; the first failure is the one kept
+    previous = outcomes.get(report.nodeid)
+    if previous and previous[0] == "failed":
+        return
+    if report.failed:
+        outcomes[report.nodeid] = ("failed", report.when, report.longreprtext[-4000:])
+    elif report.skipped:
+        outcomes[report.nodeid] = ("skipped", report.when, None)
+    elif report.when == "call":
+        outcomes[report.nodeid] = ("passed", None, None)
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    report = outcome.get_result()
+    _record_outcome(item.config.outcomes, report)
+    if report.failed and report.when in ("setup", "call"):
+        # The driver is still on the page that failed, the fixture teardown has not run yet
+        path = artifacts.capture_failure(item.funcargs.get("driver"), item.nodeid, report.longreprtext[-2000:],
+                                         item.config.getoption("--artifacts"))
+        if path:
+            report.user_properties.append(("artifacts", path))
+    summary = getattr(item, "timings", None)
+    if report.when == "teardown" and summary and item.config.pluginmanager.hasplugin("html"):
+        from pytest_html import extras
+        report.extras = getattr(report, "extras", []) + [extras.html(instrumentation.html_summary(summary))]
+        test_samples = web_vitals.samples_for(item.nodeid)
+        if test_samples:
+            report.extras.append(extras.html(web_vitals.html_summary(test_samples)))
+
+def pytest_sessionfinish(session):
+    artifacts.flush()
+    if instrumentation.results:
+        path = instrumentation.write_report()
+        logging.info(f"TIMING: Step timings written to {path}")
+        config = session.config
+        history.record_run(config.run_uid, instrumentation.results, config.outcomes,
+                           worker=os.getenv('PYTEST_XDIST_WORKER'), profile=config.getoption("--driver-profile"),
+                           site_mode=config.getoption("--site-mode"))
+    if web_vitals.samples:
+        path = web_vitals.write_report()
+        logging.info(f"VITALS: Web performance metrics written to {path}")
+    if locators.stats.rows:
+        locators.log_report()
+        path = locators.write_report()
+        logging.info(f"LOCATOR: Lookups written to {path}")
+
+def pytest_unconfigure(config):
+    shutdown_logging()
+
+@pytest.fixture(autouse=True)
+def step_timings(request):
+    """Times every test, including its prerequisites, and records the breakdown on the test item."""
+    instrumentation.start_test(request.node.nodeid)
+    yield
+    summary = instrumentation.finish_test()
+    request.node.timings = summary
+    for key in ("wall", "sleep", "wait", "execute", "commands"):
+        request.node.user_properties.append((f"timing_{key}", summary[key]))
+
+@pytest.fixture(scope="session")
+def site_proxy(request):
+    """The record/replay proxy for this worker, or None when running against the live site."""
+    mode = request.config.getoption("--site-mode")
+    if mode == "live":
+        yield None
+        return
+    proxy = SiteProxy(mode)
+    yield proxy
+    proxy.stop()
+
+@pytest.fixture(scope="session")
+def browser_pool(request, site_proxy):
+    # Session scope gives every pytest-xdist worker its own pool of browsers
+    profile = request.config.getoption("--driver-profile")
+    proxy = site_proxy.address if site_proxy else None
+    remote = request.config.getoption("--grid") or remote_url()
+    contexts = request.config.getoption("--browser-contexts")
+    # With a context per test, disposing of the context is the reset, so one Chrome per worker is enough
+    pool = BrowserPool(factory=functools.partial(create_driver, profile, proxy, remote),
+                       size=1 if contexts else BROWSER_POOL_SIZE, contexts=contexts)
+    yield pool
+    pool.close()  # Logs the reuse hit rate, pool wait and per-context memory
+
+@pytest.fixture
+def driver(request, browser_pool):
+    driver = browser_pool.acquire()
+    yield driver
+    usage = browser_pool.release(driver)
+    for metric, value in (usage or {}).items():
+        request.node.user_properties.append((f"context_{metric}", value))
+
+@pytest.fixture(autouse=True)
+def throttling(request, driver):
+    """Applies the test's throttling marker, or the run's --throttling profile, before anything else loads."""
+    marker = request.node.get_closest_marker("throttling")
+    profile = marker.args[0] if marker else request.config.getoption("--throttling")
+    use_throttling(driver, profile)
+    return profile
+
+@pytest.fixture(autouse=True)
+def network_report(request, driver):
+    """Reports the requests and bytes each test used and saved in the fast profile."""
+    if driver.profile != "fast":
+        yield
+        return
+    network_stats(driver)  # Drop whatever the previous test left in the log
+    yield
+    stats = network_stats(driver)
+    log_network_stats(request.node.name, stats)
+    for key, value in stats.items():
+        request.node.user_properties.append((f"network_{key}", value))
+
+@pytest.fixture(autouse=True)
+def popup_report(request, driver):
+    """Logs the popups the in-page observer dismissed during each test."""
+    yield
+    if getattr(driver, "auto_dismiss", False):
+        counts = log_dismissals(request.node.name, collect_dismissals(driver))
+        request.node.user_properties.append(("popups_dismissed", sum(counts.values())))
+
+@pytest.fixture(autouse=True)
+def web_vitals_report(request, driver):
+    """Checks the Web performance metrics of every page the test visited against PERF_BUDGETS."""
+    yield
+    test_samples = web_vitals.samples_for(request.node.nodeid)
+    violations = [violation for sample in test_samples for violation in sample["violations"]]
+    request.node.user_properties.append(("pages_measured", len(test_samples)))
+    request.node.user_properties.append(("budget_violations", len(violations)))
+    if violations and PERF_BUDGET_ENFORCE:
+        pytest.fail("Over the performance budget: " + "; ".join(violations))
+
+@pytest.fixture(scope="session")
+def state():
+    """Milestones reached on this worker's account that the DOM cannot show cheaply."""
+    return set()
+
+
+# Prerequisites. Tests request these by name to declare the state they start from.
+# The ones named after a checkpoint save it once their state is in place, and
+# restore it first when the run resumes from a failed test (see checkpoints).
+
+def _checkpointed(request, driver, state, name, ensure):
+    if name in request.config.restore_checkpoints:
+        request.config.restore_checkpoints.discard(name)
+        checkpoint = restore_checkpoint(driver, name)
+        if checkpoint:
+            state.update(checkpoint["state"])
+    # A state that was already in place was saved when it was brought about, or has just been restored
+    if ensure(driver):
+        save_checkpoint(driver, name, state)
+
+@pytest.fixture
+def home_page(driver):
+    flows.ensure_home_page(driver)
+
+@pytest.fixture
+def logged_in(request, driver, state):
+    _checkpointed(request, driver, state, "logged-in", flows.ensure_logged_in)
+
+@pytest.fixture
+def logged_out(driver):
+    flows.ensure_logged_out(driver)
+
+@pytest.fixture
+def pin_code_set(request, driver, state):
+    _checkpointed(request, driver, state, "pin-set", flows.ensure_pin_code_set)
+
+@pytest.fixture
+def on_search_results(request, driver, state):
+    _checkpointed(request, driver, state, "on-search-results", flows.ensure_search_results)
+
+@pytest.fixture
+def item_in_cart(request, driver, state):
+    _checkpointed(request, driver, state, "item-in-cart", flows.ensure_item_in_cart)
+
+@pytest.fixture
+def item_in_wishlist(driver, state, logged_in, on_search_results):
+    if "wishlisted" not in state:
+        flows.add_to_wishlist(driver)
+        state.add("wishlisted")
+
+@pytest.fixture
+def on_address_book(request, driver, state, logged_in):
+    _checkpointed(request, driver, state, "on-address-book", flows.ensure_address_book)
+
+@pytest.fixture
+def address_form_open(driver, on_address_book):
+    flows.open_address_form(driver)
+
+@pytest.fixture
+def address_saved(driver, state, on_address_book):
+    if "address_saved" not in state:
+        flows.open_address_form(driver)
+        flows.fill_address_form(driver)
+        state.add("address_saved")
@@ -0,0 +1 @@
+"""Shared configuration, helpers and user journeys for the Reliance Digital test suite."""
@@ -0,0 +1,162 @@
+"""Debugging artifacts: screenshot, page HTML, browser console and network log.
+
+ARTIFACTS["capture"] says when they are taken:
+
+* failure - when a test fails (the default)
+* step    - after every top-level helper step as well, for hard cases
+* off     - never
+
+Only reading the data from the browser happens on the test thread. Decoding,
+compressing and writing it is handed to a single background thread, so a
+capture costs the test a few WebDriver commands and no disk I/O. The HTML is
+stored gzipped under its SHA-256 in ARTIFACTS["dir"]/dom and shared by every
+capture of the same DOM, the console and network log go into one gzipped
+JSON file per capture next to the screenshot:
+
+    reports/artifacts/<test>/<n>-<label>/screenshot.png
+    reports/artifacts/<test>/<n>-<label>/capture.json.gz
+    reports/artifacts/dom/<sha256>.html.gz
+
+The network log is the page's resource timing entries, which reading does
+not consume, so it works in every driver profile.
+"""
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common.exceptions import WebDriverException
+
+from . import instrumentation
+from .config import ARTIFACTS, REPORT_DIR
+
+CAPTURE = os.getenv('ARTIFACT_CAPTURE', ARTIFACTS.get("capture", "failure"))  # failure, step or off
+ARTIFACT_DIR = ARTIFACTS.get("dir", os.path.join(REPORT_DIR, "artifacts"))
+NETWORK_ENTRIES = ARTIFACTS.get("network_entries", 200)
+MODES = ("failure", "step", "off")
+
+RECENT_NETWORK = """
+return performance.getEntriesByType('resource').slice(-arguments[0]).map(function (entry) {
+    return {url: entry.name, type: entry.initiatorType, start: Math.round(entry.startTime),
+            duration: Math.round(entry.duration), bytes: entry.transferSize || 0, status: entry.responseStatus || null};
+});
+"""
+
+
+def _safe_name(text):
+    return re.sub(r"[^\w.-]+", "_", text).strip("_")
+
+
+class ArtifactWriter:
+    """Compresses and writes the captures on a background thread."""
+
+    def __init__(self, directory=ARTIFACT_DIR):
+        self.directory = directory
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+        self.lock = threading.Lock()
+        self.counts = {}  # test -> captures so far
+        self.stats = {"captures": 0, "bytes": 0, "dom_snapshots": 0, "dom_reused": 0, "errors": 0}
+
+    def _next_dir(self, test, label):
+        with self.lock:
+            number = self.counts[test] = self.counts.get(test, 0) + 1
+        return os.path.join(self.directory, _safe_name(test)[-120:], f"{number:03d}-{_safe_name(label)}")
+
+    def submit(self, test, label, raw):
+        """Queues a capture and returns the directory it will be written to."""
+        path = self._next_dir(test, label)
+        self.executor.submit(self._write, path, raw)
+        return path
+
+    def _write_file(self, path, data):
+        temporary = f"{path}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(data)
+        os.replace(temporary, path)  # Other workers may be writing the same DOM snapshot
+        self.stats["bytes"] += len(data)
+
+    def _write(self, path, raw):
+        try:
+            os.makedirs(path, exist_ok=True)
+            if raw.get("screenshot"):
+                self._write_file(os.path.join(path, "screenshot.png"), base64.b64decode(raw.pop("screenshot")))
+            html = raw.pop("html", None)
+            if html is not None:
+                digest = hashlib.sha256(html.encode("utf-8")).hexdigest()
+                dom_path = os.path.join(self.directory, "dom", f"{digest}.html.gz")
+                if os.path.exists(dom_path):
+                    self.stats["dom_reused"] += 1
+                else:
+                    os.makedirs(os.path.dirname(dom_path), exist_ok=True)
+                    self._write_file(dom_path, gzip.compress(html.encode("utf-8")))
+                    self.stats["dom_snapshots"] += 1
+                raw["dom"] = os.path.relpath(dom_path, path)
+            self._write_file(os.path.join(path, "capture.json.gz"),
+                             gzip.compress(json.dumps(raw, default=str).encode("utf-8")))
+            self.stats["captures"] += 1
+        except Exception as e:  # Losing an artifact must never fail the run
+            self.stats["errors"] += 1
+            logging.warning(f"ARTIFACTS: Could not write {path}: {e!r}")
+
+    def flush(self):
+        """Waits for every queued capture to be written."""
+        self.executor.shutdown(wait=True)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="artifacts")
+        return dict(self.stats)
+
+writer = ArtifactWriter()
+
+
+def _read(name, read):
+    try:
+        return read()
+    except WebDriverException as e:
+        logging.info(f"ARTIFACTS: Could not read the {name}: {e.msg}")
+        return None
+
+def capture(driver, test, label, error=None):
+    """Reads the browser state now and queues it for writing. Returns the capture directory."""
+    start = time.monotonic()
+    raw = {
+        "test": test,
+        "label": label,
+        "time": time.time(),
+        "error": error,
+        "url": _read("URL", lambda: driver.current_url),
+        "title": _read("title", lambda: driver.title),
+        "screenshot": _read("screenshot", driver.get_screenshot_as_base64),
+        "html": _read("page HTML", lambda: driver.page_source),
+        "console": _read("console", lambda: driver.get_log("browser")),
+        "network": _read("network log", lambda: driver.execute_script(RECENT_NETWORK, NETWORK_ENTRIES)),
+    }
+    path = writer.submit(test, label, raw)
+    logging.info(f"ARTIFACTS: Captured {label} in {time.monotonic() - start:.2f}s, writing to {path}")
+    return path
+
+def capture_failure(driver, test, error=None, mode=CAPTURE):
+    if mode == "off" or driver is None:
+        return None
+    return capture(driver, test, "failure", error)
+
+def _after_step(driver, record):
+    if record["depth"] == 0:
+        capture(driver, instrumentation.current_test() or "session", f"{record['step']} {record['target']}"[:60])
+
+def enable_step_capture(mode=CAPTURE):
+    """Captures after every top-level step when ARTIFACTS["capture"] is "step"."""
+    if mode == "step" and _after_step not in instrumentation.step_listeners:
+        instrumentation.step_listeners.append(_after_step)
+
+def flush():
+    """Waits for the background writes and logs what they stored."""
+    stats = writer.flush()
+    if stats["captures"] or stats["errors"]:
+        logging.info(f"ARTIFACTS: {stats['captures']} captures, {stats['dom_snapshots']} DOM snapshots "
+                     f"({stats['dom_reused']} reused), {stats['bytes'] / 1024:.0f} KiB in {writer.directory}")
+    return stats
@@ -0,0 +1,230 @@
+"""Benchmarks the framework itself against local copies of the key pages.
+
+The pages in tests/benchmark/pages stand in for the home page, the login
+modal, the search results (with any number of products), the filter panel
+and the address form. They use the same markup the suite looks for, so the
+flows below go through the real helpers and journeys, but they are served
+from localhost and never change, which leaves the helpers and the driver
+setup as the only thing being measured.
+
+    python -m tests.framework.benchmark
+    python -m tests.framework.benchmark --save-baseline
+    python -m tests.framework.benchmark --runs 10 --products 200
+
+Every flow runs BENCHMARK["runs"] times. The report has the latency
+percentiles and WebDriver command count of each flow, the driver start up
+time and the wall time of the whole benchmark, and is compared against the
+stored baseline, which lives next to the pages so it can be committed. The
+exit status is 1 when a flow got slower than the baseline, or sends more
+WebDriver commands, by more than BENCHMARK["threshold"]. The command count
+gets the same tolerance because the adaptive polling makes it vary between
+runs.
+"""
+import argparse
+import functools
+import json
+import logging
+import math
+import os
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+from . import flows, instrumentation, locators
+from .config import BENCHMARK, DRIVER_PROFILE, OTP_ENV, REPORT_DIR, THROTTLING
+from .drivers import PROFILES, create_driver
+from .helpers import find, wait_for_page_ready, handle_popup, query_all
+from .pages import SearchResults
+from .throttling import PROFILES as THROTTLING_PROFILES, use_throttling
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "benchmark")
+PAGES_DIR = os.path.join(BENCHMARK_DIR, "pages")
+RUNS = BENCHMARK.get("runs", 5)
+PRODUCTS = BENCHMARK.get("products", 48)
+THRESHOLD = BENCHMARK.get("threshold", 0.2)
+BASELINE = BENCHMARK.get("baseline", os.path.join(BENCHMARK_DIR, "baseline.json"))
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class FixtureSite:
+    """Serves the fixture pages on a free local port."""
+
+    def __init__(self, directory=PAGES_DIR, host="127.0.0.1"):
+        self.server = ThreadingHTTPServer((host, 0), functools.partial(_QuietHandler, directory=directory))
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# The flows. Each one starts from a fresh page load so the runs are independent.
+
+def open_home(driver, site, products):
+    driver.get(f"{site.url}home.html?n={products}")
+    wait_for_page_ready(driver, "home page")
+    handle_popup(driver)
+    find(driver, locators.PAGE_BODY)
+
+def login_modal(driver, site, products):
+    open_home(driver, site, products)
+    flows.login(driver)
+    find(driver, locators.ACCOUNT_DETAILS)
+
+def search_results(driver, site, products):
+    open_home(driver, site, products)
+    flows.search(driver)
+    find(driver, locators.SEARCH_HEADING)
+    links = query_all(driver, *locators.PRODUCT_LINKS.primary)
+    assert len(links) == products, f"Expected {products} products, found {len(links)}"
+
+def filter_panel(driver, site, products):
+    driver.get(f"{site.url}search.html?q={flows.SEARCH_TERM}&n={products}")
+    wait_for_page_ready(driver, "search results")
+    results = SearchResults.of(driver)
+    results.filters.set_price_range("10000", "17000")
+    prices = results.prices()
+    assert all(10000 <= price <= 17000 for price in prices), f"Prices outside 10000-17000: {prices}"
+
+def address_form(driver, site, products):
+    driver.get(f"{site.url}address.html")
+    find(driver, locators.ADD_ADDRESS)
+    flows.open_address_form(driver)
+    flows.fill_address_form(driver)
+
+FLOWS = {
+    "home page": open_home,
+    "login modal": login_modal,
+    "search results": search_results,
+    "filter panel": filter_panel,
+    "address form": address_form,
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(values)
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+def run(profile=DRIVER_PROFILE, runs=RUNS, products=PRODUCTS, names=None, throttling=THROTTLING):
+    """Runs every flow `runs` times in one browser and returns the results."""
+    # The fixture login accepts any code, make sure the login journey gets one without asking
+    os.environ.setdefault(OTP_ENV, "123456")
+    suite_start = time.monotonic()
+    site = FixtureSite()
+    start = time.monotonic()
+    driver = create_driver(profile)
+    driver_setup = time.monotonic() - start
+    results = {}
+    try:
+        for name in names or FLOWS:
+            durations, commands = [], []
+            for _ in range(runs):
+                instrumentation.start_test(f"benchmark::{name}")
+                use_throttling(driver, throttling)
+                try:
+                    FLOWS[name](driver, site, products)
+                finally:
+                    summary = instrumentation.finish_test()
+                durations.append(summary["wall"])
+                commands.append(summary["commands"])
+            results[name] = {
+                "runs": runs,
+                "p50": percentile(durations, 0.5),
+                "p90": percentile(durations, 0.9),
+                "p95": percentile(durations, 0.95),
+                "max": max(durations),
+                "commands": percentile(commands, 0.5),
+            }
+    finally:
+        driver.quit()
+        site.stop()
+    return {
+        "profile": profile,
+        "throttling": throttling,
+        "products": products,
+        "driver_setup": driver_setup,
+        "wall": time.monotonic() - suite_start,
+        "flows": results,
+    }
+
+def compare(report, baseline, threshold=THRESHOLD):
+    """Returns the regressions of report against baseline, as readable lines."""
+    regressions = []
+    if baseline.get("throttling", "none") != report["throttling"]:
+        return [f"baseline was measured under {baseline.get('throttling', 'none')} throttling, not {report['throttling']}"]
+    for name, flow in report["flows"].items():
+        before = baseline.get("flows", {}).get(name)
+        if before is None:
+            continue
+        if flow["p50"] > before["p50"] * (1 + threshold):
+            regressions.append(f"{name}: p50 {flow['p50']:.3f}s, baseline {before['p50']:.3f}s")
+        if flow["commands"] > before["commands"] * (1 + threshold):
+            regressions.append(f"{name}: {flow['commands']} WebDriver commands, baseline {before['commands']}")
+    if "wall" in baseline and report["wall"] > baseline["wall"] * (1 + threshold):
+        regressions.append(f"wall time {report['wall']:.2f}s, baseline {baseline['wall']:.2f}s")
+    return regressions
+
+def print_report(report, baseline=None):
+    print(f"{'flow':<16}{'runs':>6}{'p50 (s)':>10}{'p90 (s)':>10}{'p95 (s)':>10}{'max (s)':>10}{'commands':>10}{'p50 vs baseline':>18}")
+    for name, flow in report["flows"].items():
+        before = (baseline or {}).get("flows", {}).get(name)
+        change = f"{flow['p50'] / before['p50'] - 1:+.0%}" if before else "-"
+        print(f"{name:<16}{flow['runs']:>6}{flow['p50']:>10.3f}{flow['p90']:>10.3f}{flow['p95']:>10.3f}"
+              f"{flow['max']:>10.3f}{flow['commands']:>10}{change:>18}")
+    print(f"Driver setup {report['driver_setup']:.2f}s, wall time {report['wall']:.2f}s "
+          f"({report['profile']} profile, {report['throttling']} throttling, {report['products']} products)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.benchmark",
+                                     description="Benchmark the helpers and driver setup against local fixture pages.")
+    parser.add_argument("--driver-profile", choices=PROFILES, default=DRIVER_PROFILE)
+    parser.add_argument("--throttling", choices=list(THROTTLING_PROFILES), default=THROTTLING)
+    parser.add_argument("--runs", type=int, default=RUNS)
+    parser.add_argument("--products", type=int, default=PRODUCTS, help="number of products on the search results page")
+    parser.add_argument("--flow", action="append", choices=list(FLOWS), help="only run this flow (repeatable)")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown, 0.2 is 20%%")
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the new baseline")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    report = run(args.driver_profile, args.runs, args.products, args.flow, args.throttling)
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+    print_report(report, baseline)
+
+    path = os.path.join(REPORT_DIR, "benchmark.json")
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or ".", exist_ok=True)
+        with open(args.baseline, "w") as file:
+            json.dump(report, file, indent=2)
+        print(f"Saved the baseline to {args.baseline}")
+        return 0
+    if baseline is None:
+        print(f"No baseline at {args.baseline}, run with --save-baseline to store one")
+        return 0
+    regressions = compare(report, baseline, args.threshold)
+    for regression in regressions:
+        print(f"REGRESSION: {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,201 @@
+"""A pool of pre-launched browsers that are reset between tests instead of restarted.
+
+Starting Chrome and chromedriver takes seconds, while clearing cookies and
+storage, closing extra tabs and going to about:blank takes milliseconds.
+The pool keeps BROWSER_POOL_SIZE sessions warm, hands one to each test and
+resets it when the test is done. A session is replaced in the background
+after BROWSER_MAX_USES tests or as soon as it stops responding.
+
+With BROWSER_CONTEXTS the reset is a whole browser context instead: every
+test runs in a fresh isolated context of an idle Chrome (see contexts),
+which is disposed of with all its cookies, storage and tabs afterwards, and
+the memory its pages held is recorded. One Chrome per worker is then enough.
+"""
+import logging
+import queue
+import threading
+import time
+from selenium.common.exceptions import WebDriverException
+
+from .config import BROWSER_CONTEXTS, BROWSER_POOL_SIZE, BROWSER_MAX_USES
+from .contexts import BrowserContext
+from .drivers import create_driver
+
+LAUNCH_RETRIES = 3  # failed launches in a row before a pool slot is given up
+CLEAR_STORAGE = "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+
+
+class BrowserPool:
+    def __init__(self, factory=create_driver, size=BROWSER_POOL_SIZE, max_uses=BROWSER_MAX_USES,
+                 contexts=BROWSER_CONTEXTS):
+        self.factory = factory
+        self.size = size
+        self.max_uses = max_uses
+        self.contexts = contexts
+        self.context_memory = []  # per-context usage, see contexts.METRICS
+        self.idle = queue.Queue()
+        self.uses = {}  # driver -> number of tests it has been handed to
+        self.closed = False
+        self.acquires = 0
+        self.reuse_hits = 0
+        self.recycled = 0
+        self.wait_times = []
+        self.launch_failures = 0  # in a row
+        self.lost_slots = 0
+        for _ in range(size):
+            self._launch_async()
+
+    def _launch(self):
+        try:
+            driver = self.factory()
+        except Exception as e:
+            self.idle.put(e)  # Surfaces in acquire() instead of dying silently in the thread
+            return
+        if self.closed:
+            driver.quit()
+            return
+        self.launch_failures = 0
+        self.uses[driver] = 0
+        self.idle.put(driver)
+
+    def _launch_async(self):
+        threading.Thread(target=self._launch, daemon=True).start()
+
+    def _healthy(self, driver):
+        try:
+            driver.window_handles
+            return True
+        except WebDriverException:
+            return False
+
+    def _reset(self, driver):
+        """Brings a used session back to a blank state. Returns False if the session is broken."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.execute_script(CLEAR_STORAGE)
+            driver.delete_all_cookies()
+            if hasattr(driver, "execute_cdp_cmd"):
+                # delete_all_cookies only covers the current domain
+                driver.execute_cdp_cmd("Network.clearBrowserCookies", {})
+            driver.get("about:blank")
+            return True
+        except WebDriverException as e:
+            logging.warning(f"POOL: Reset failed, recycling the session: {e!r}")
+            return False
+
+    def _retire(self, driver):
+        self.uses.pop(driver, None)
+        self.recycled += 1
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+        if not self.closed:
+            self._launch_async()
+
+    def _launch_failed(self, error):
+        """Relaunches the slot of a failed launch, until LAUNCH_RETRIES launches in a row have failed."""
+        self.launch_failures += 1
+        if self.launch_failures <= LAUNCH_RETRIES:
+            logging.warning(f"POOL: Launch failed, retrying ({self.launch_failures}/{LAUNCH_RETRIES}): {error!r}")
+            self._launch_async()
+        else:
+            self.lost_slots += 1
+            logging.error(f"POOL: Launch failed {self.launch_failures} times in a row, giving up a session: {error!r}")
+
+    def acquire(self, timeout=60):
+        """Hands out an idle session, waiting for one to finish launching if needed."""
+        start = time.monotonic()
+        while True:
+            if self.lost_slots >= self.size:
+                raise RuntimeError(f"Browser pool exhausted: all {self.size} sessions failed to launch")
+            try:
+                driver = self.idle.get(timeout=timeout)
+            except queue.Empty:
+                raise RuntimeError(f"Browser pool exhausted: no session became idle within {timeout}s") from None
+            if isinstance(driver, Exception):
+                self._launch_failed(driver)
+                raise driver
+            if self._healthy(driver):
+                break
+            logging.warning("POOL: Dropping an unresponsive session")
+            self._retire(driver)
+        if self.contexts:
+            try:
+                driver.context = BrowserContext(driver)
+                driver.context.activate()
+            except WebDriverException as e:
+                self._retire(driver)
+                raise RuntimeError(f"Could not open a browser context: {e!r}") from e
+        wait = time.monotonic() - start
+        self.wait_times.append(wait)
+        self.acquires += 1
+        if self.uses[driver]:
+            self.reuse_hits += 1
+        self.uses[driver] += 1
+        logging.info(f"POOL: Acquired session (use {self.uses[driver]}/{self.max_uses}) after waiting {wait:.2f}s")
+        return driver
+
+    def _close_context(self, driver):
+        """Disposes of the test's browser context. Returns its memory usage, or None if the session is broken."""
+        try:
+            usage = driver.context.close()
+        except WebDriverException as e:
+            logging.warning(f"POOL: Closing the browser context failed, recycling the session: {e!r}")
+            return None
+        finally:
+            driver.context = None
+        self.context_memory.append(usage)
+        return usage
+
+    def release(self, driver):
+        """Returns the session to the pool. Returns the memory usage of its browser context, if it had one."""
+        usage = None
+        if getattr(driver, "context", None):
+            usage = self._close_context(driver)
+            healthy = usage is not None
+        else:
+            healthy = self._reset(driver)
+        if self.uses.get(driver, 0) >= self.max_uses or not healthy:
+            self._retire(driver)
+        else:
+            self.idle.put(driver)
+        return usage
+
+    def report(self):
+        waits = self.wait_times
+        return {
+            "acquires": self.acquires,
+            "reuse_hits": self.reuse_hits,
+            "reuse_hit_rate": self.reuse_hits / self.acquires if self.acquires else 0.0,
+            "recycled": self.recycled,
+            "pool_wait_total": sum(waits),
+            "pool_wait_avg": sum(waits) / len(waits) if waits else 0.0,
+            "pool_wait_max": max(waits, default=0.0),
+            "contexts": len(self.context_memory),
+            "context_heap_avg": (sum(usage["JSHeapUsedSize"] for usage in self.context_memory) / len(self.context_memory)
+                                 if self.context_memory else 0.0),
+            "context_heap_max": max((usage["JSHeapUsedSize"] for usage in self.context_memory), default=0.0),
+        }
+
+    def close(self):
+        self.closed = True
+        while True:
+            try:
+                driver = self.idle.get_nowait()
+            except queue.Empty:
+                break
+            if not isinstance(driver, Exception):
+                driver.quit()
+        stats = self.report()
+        logging.info(f"POOL: {stats['acquires']} acquires, reuse hit rate {stats['reuse_hit_rate']:.0%}, "
+                     f"pool wait {stats['pool_wait_total']:.2f}s total / {stats['pool_wait_max']:.2f}s max, "
+                     f"{stats['recycled']} recycled")
+        if stats["contexts"]:
+            logging.info(f"POOL: {stats['contexts']} browser contexts, JS heap {stats['context_heap_avg'] / 2 ** 20:.1f} MiB "
+                         f"average / {stats['context_heap_max'] / 2 ** 20:.1f} MiB max")
+        return stats
@@ -0,0 +1,99 @@
+"""Named checkpoints of the browser state, for rerunning a failed test without the tests before it.
+
+Whenever a prerequisite fixture has brought the browser into its state
+("logged-in", "pin-set", "on-search-results", ...), the cookies,
+localStorage, sessionStorage, current URL and the milestones in the
+``state`` fixture are saved as a checkpoint of that name. Checkpoints are
+encrypted like the stored session (see session_store) and kept per
+pytest-xdist worker in CHECKPOINTS["dir"].
+
+    pytest --resume
+    pytest --resume-from test_add_new_address
+
+--resume starts at the first test that failed in the last run (see history),
+--resume-from at the named test. The tests before it are deselected, and the
+prerequisites of the first test that runs restore their checkpoint instead
+of walking through the site again. The usual prerequisite checks run after
+the restore, so a checkpoint the site no longer accepts just costs the work
+it was meant to save.
+"""
+import json
+import logging
+import os
+import time
+from cryptography.fernet import InvalidToken
+
+from .config import CHECKPOINTS, URL
+from .session_store import DUMP_STORAGE, LOAD_STORAGE, cipher
+
+ENABLED = CHECKPOINTS.get("enabled", True)
+CHECKPOINT_DIR = CHECKPOINTS.get("dir", ".auth/checkpoints")
+MAX_AGE = CHECKPOINTS.get("max_age", 12 * 60 * 60)  # seconds
+
+
+def _path(name, directory=CHECKPOINT_DIR):
+    worker = os.getenv('PYTEST_XDIST_WORKER')
+    return os.path.join(directory, f"{name}_{worker}.bin" if worker else f"{name}.bin")
+
+def save_checkpoint(driver, name, state=(), directory=CHECKPOINT_DIR):
+    """Saves the browser state and the milestones in state under name."""
+    if not ENABLED:
+        return None
+    checkpoint = {
+        "name": name,
+        "saved_at": time.time(),
+        "url": driver.current_url,
+        "cookies": driver.get_cookies(),
+        "state": sorted(state),
+        **driver.execute_script(DUMP_STORAGE),
+    }
+    path = _path(name, directory)
+    os.makedirs(directory, exist_ok=True)
+    tmp_file = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as file:
+        file.write(cipher().encrypt(json.dumps(checkpoint).encode()))
+    os.replace(tmp_file, path)
+    logging.info(f"CHECKPOINT: Saved {name} at {checkpoint['url']}")
+    return path
+
+def load_checkpoint(name, directory=CHECKPOINT_DIR, max_age=MAX_AGE):
+    """Returns the checkpoint, or None when it is missing, unreadable or too old."""
+    try:
+        with open(_path(name, directory), "rb") as file:
+            checkpoint = json.loads(cipher().decrypt(file.read()))
+    except FileNotFoundError:
+        return None
+    except (InvalidToken, ValueError) as e:
+        logging.warning(f"CHECKPOINT: Ignoring unreadable checkpoint {name}: {e!r}")
+        return None
+    if checkpoint["saved_at"] + max_age <= time.time():
+        logging.info(f"CHECKPOINT: {name} is too old to restore")
+        return None
+    return checkpoint
+
+def restore_checkpoint(driver, name, directory=CHECKPOINT_DIR):
+    """Puts the browser back into the saved state. Returns the checkpoint, or None when there is none."""
+    checkpoint = load_checkpoint(name, directory)
+    if checkpoint is None:
+        return None
+    start = time.monotonic()
+    # Cookies and storage can only be set for the origin that is currently open
+    if not driver.current_url.startswith(URL):
+        driver.get(URL)
+    driver.delete_all_cookies()
+    for cookie in checkpoint["cookies"]:
+        if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+            cookie.pop("sameSite", None)  # add_cookie rejects any other value
+        driver.add_cookie(cookie)
+    driver.execute_script("window.localStorage.clear(); window.sessionStorage.clear();")
+    driver.execute_script(LOAD_STORAGE, checkpoint)
+    driver.get(checkpoint["url"])
+    logging.info(f"CHECKPOINT: Restored {name} ({checkpoint['url']}) in {time.monotonic() - start:.2f}s")
+    return checkpoint
+
+def resume_point(items, failed=(), start_at=None):
+    """Index of the first item to run: the one named start_at, or else the first one in failed. None if there is none."""
+    for index, item in enumerate(items):
+        if (item.nodeid == start_at or item.name == start_at) if start_at else item.nodeid in failed:
+            return index
+    return None
@@ -0,0 +1,53 @@
+import json
+import os
+
+# Load configuration from environment variable or default to local path
+config_path = os.getenv('CONFIG_PATH', 'config/config.json')
+try:
+    with open(config_path, 'r') as file:
+        config = json.load(file)
+except FileNotFoundError:
+    raise SystemExit(f"Configuration file not found at {config_path}")
+except json.JSONDecodeError:
+    raise SystemExit(f"Error decoding JSON from the configuration file at {config_path}")
+
+URL = config.get("URL")
+EXPECTED_TITLE = config.get("EXPECTED_TITLE")
+DELAY = config.get("DELAY", 2)
+MOBILE_NUMBER = config.get("MOBILE_NUMBER")
+OTP = config.get("OTP")  # Note: OTP should be manually entered by user in a real scenario.
+OTP_PROVIDER = config.get("OTP_PROVIDER", "auto")  # auto, config, env, file, http or manual
+OTP_TIMEOUT = config.get("OTP_TIMEOUT", 120)  # seconds
+OTP_ENV = config.get("OTP_ENV", "OTP")
+OTP_FILE = config.get("OTP_FILE", ".auth/otp.txt")
+OTP_HTTP_PORT = config.get("OTP_HTTP_PORT", 8765)
+PIN_CODE = config.get("PIN_CODE")
+DRIVER_PROFILE = os.getenv('DRIVER_PROFILE', config.get("DRIVER_PROFILE", "default"))  # default or fast
+THROTTLING = os.getenv('THROTTLING', config.get("THROTTLING", "none"))  # none or a throttling profile name
+THROTTLING_PROFILES = config.get("THROTTLING_PROFILES", {})
+FAST_MODE = config.get("FAST_MODE", {})
+BROWSER_POOL_SIZE = config.get("BROWSER_POOL_SIZE", 2)
+BROWSER_MAX_USES = config.get("BROWSER_MAX_USES", 20)
+BROWSER_CONTEXTS = os.getenv('BROWSER_CONTEXTS', str(config.get("BROWSER_CONTEXTS", False))).lower() in ("1", "true", "yes")  # a fresh browser context per test, see contexts
+POPUP_SELECTORS = config.get("POPUP_SELECTORS", ["#wzrk-cancel"])
+SITE_MODE = os.getenv('SITE_MODE', config.get("SITE_MODE", "live"))  # live, record or replay
+REPLAY_DIR = config.get("REPLAY_DIR", "recordings/reliancedigital")
+LOG_DIR = config.get("LOG_DIR", "logs")
+LOG_HISTORY = config.get("LOG_HISTORY", 20)  # archived run logs to keep
+CONSOLE_LOG = config.get("CONSOLE_LOG", True)
+REPORT_DIR = config.get("REPORT_DIR", "reports")
+HISTORY_DB = config.get("HISTORY_DB", "reports/history.sqlite")
+ADAPTIVE_WAITS = config.get("ADAPTIVE_WAITS", {})
+LOCATORS = config.get("LOCATORS", {})
+BENCHMARK = config.get("BENCHMARK", {})
+PERF_BUDGETS = config.get("PERF_BUDGETS", {})  # step name (or "*") -> {metric: limit}
+PERF_BUDGET_ENFORCE = config.get("PERF_BUDGET_ENFORCE", False)
+LOAD = config.get("LOAD", {})
+ARTIFACTS = config.get("ARTIFACTS", {})
+CHECKPOINTS = config.get("CHECKPOINTS", {})
+SCHEDULER = config.get("SCHEDULER", {})
+GRID = config.get("GRID", {})
+GRID_URL = os.getenv('GRID_URL', GRID.get("url"))  # a Selenium Grid or remote WebDriver endpoint, None for local Chrome
+GRID_NODES = [url for url in os.getenv('GRID_NODES', "").split(",") if url] or GRID.get("nodes", [])  # one per worker
+SESSION_FILE = config.get("SESSION_FILE", ".auth/session.bin")
+SESSION_TTL = config.get("SESSION_TTL", 12 * 60 * 60)  # seconds
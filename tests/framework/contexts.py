@@ -0,0 +1,73 @@
+"""Isolated browser contexts inside one Chrome, created over CDP.
+
+A browser context is Chrome's incognito-like profile: its tabs share
+nothing (cookies, storage, cache) with the tabs of other contexts, but they
+all live in the same browser process. With BROWSER_CONTEXTS enabled the
+browser pool gives every test a fresh context in an already running Chrome
+and throws the whole context away afterwards, instead of clearing cookies
+and storage of the one origin that happens to be open.
+
+Chromedriver uses the CDP target id as the window handle, so a context's
+tab can be switched to like any other window.
+
+Before a context is disposed, the JS heap, DOM node and document counts of
+every tab in it are read with Performance.getMetrics. That is the memory the
+context's pages held, which the pool reports per test and in total.
+
+A WebDriver session drives one tab at a time, so a worker still runs its
+tests one after another: the contexts isolate consecutive tests inside one
+long-lived Chrome, they do not run tests in parallel within it. Parallel
+runs still take one worker, and one Chrome, per concurrent test.
+"""
+import logging
+import time
+
+from .drivers import switch_to_window
+
+METRICS = ("JSHeapUsedSize", "JSHeapTotalSize", "Nodes", "Documents")
+
+
+class BrowserContext:
+    def __init__(self, driver):
+        self.driver = driver
+        self.default_window = driver.current_window_handle
+        start = time.monotonic()
+        self.id = driver.execute_cdp_cmd("Target.createBrowserContext", {})["browserContextId"]
+        self.handle = driver.execute_cdp_cmd("Target.createTarget",
+                                             {"url": "about:blank", "browserContextId": self.id})["targetId"]
+        self.setup_time = time.monotonic() - start
+
+    def activate(self):
+        """Makes the context's tab the current window and the main window of the journeys (see flows)."""
+        switch_to_window(self.driver, self.handle)
+        self.driver.main_window = self.handle
+        self.driver.reserved_windows = {self.default_window}
+
+    def handles(self):
+        """The window handles of every tab in this context."""
+        targets = self.driver.execute_cdp_cmd("Target.getTargets", {})["targetInfos"]
+        return [target["targetId"] for target in targets
+                if target.get("browserContextId") == self.id and target["type"] == "page"]
+
+    def memory(self):
+        """Sum of METRICS over the context's tabs."""
+        totals = dict.fromkeys(METRICS, 0)
+        for handle in self.handles():
+            switch_to_window(self.driver, handle)
+            self.driver.execute_cdp_cmd("Performance.enable", {})
+            metrics = self.driver.execute_cdp_cmd("Performance.getMetrics", {})["metrics"]
+            for metric in metrics:
+                if metric["name"] in totals:
+                    totals[metric["name"]] += metric["value"]
+        return totals
+
+    def close(self):
+        """Measures the context, disposes of it with all its tabs and returns the measurement."""
+        usage = self.memory()
+        switch_to_window(self.driver, self.default_window)
+        self.driver.execute_cdp_cmd("Target.disposeBrowserContext", {"browserContextId": self.id})
+        self.driver.main_window = None
+        self.driver.reserved_windows = set()
+        logging.info(f"CONTEXT: Closed {self.id}: {usage['JSHeapUsedSize'] / 2 ** 20:.1f} MiB JS heap, "
+                     f"{usage['Nodes']:.0f} DOM nodes, {usage['Documents']:.0f} documents")
+        return usage
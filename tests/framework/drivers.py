@@ -0,0 +1,128 @@
+"""Creates the browser sessions used by the suite.
+
+DRIVER_PROFILE selects how Chrome is started:
+
+* default - a normal, maximized Chrome window
+* fast    - headless Chrome that blocks images, fonts and trackers (see fast_mode)
+
+Some setup, like popup dismissal, the Web performance observer, throttling
+and request blocking, is done over CDP and only applies to one tab. Use switch_to_window
+instead of driver.switch_to.window so that new tabs get the same setup as
+the first one.
+
+Chrome runs locally unless a remote endpoint is configured: GRID["url"]
+(or GRID_URL) for a Selenium Grid that every worker shares, or GRID["nodes"]
+(or GRID_NODES) for one endpoint per pytest-xdist worker. CDP commands go
+through the grid's goog/cdp/execute endpoint, so the per-tab setup works
+the same on remote browsers. See grid for a local stand-in.
+
+Every navigation (driver.get, back, forward, refresh, switching or closing
+windows) bumps driver.page_generation, which tells the page objects (see
+pages) that the elements they cached belong to a document that is gone.
+"""
+import functools
+import os
+
+from selenium import webdriver
+from selenium.webdriver.chromium.remote_connection import ChromiumRemoteConnection
+from selenium.webdriver.remote.command import Command
+
+from .config import DRIVER_PROFILE, GRID_NODES, GRID_URL
+from .fast_mode import enable_request_blocking
+from .instrumentation import instrument_driver
+from .popups import enable_popup_auto_dismiss
+from .throttling import enable_throttling
+from .web_vitals import enable_web_vitals
+
+PROFILES = ("default", "fast")
+
+# Commands after which the elements found so far belong to another document or window
+NAVIGATION_COMMANDS = {Command.GET, Command.GO_BACK, Command.GO_FORWARD, Command.REFRESH,
+                       Command.SWITCH_TO_WINDOW, Command.CLOSE, Command.NEW_WINDOW}
+
+
+class RemoteChrome(webdriver.Remote):
+    """A Chrome session on a remote WebDriver endpoint with the CDP and log access of a local one."""
+
+    def __init__(self, url, options):
+        super().__init__(command_executor=ChromiumRemoteConnection(url, "goog", "chrome"), options=options)
+        self.remote_url = url
+
+    def execute_cdp_cmd(self, cmd, cmd_args):
+        return self.execute("executeCdpCommand", {"cmd": cmd, "params": cmd_args})["value"]
+
+    def get_log(self, log_type):
+        return self.execute(Command.GET_LOG, {"type": log_type})["value"]
+
+
+def remote_url(worker=None):
+    """The endpoint for this worker: its node from GRID_NODES, else GRID_URL, else None for a local Chrome."""
+    worker = worker or os.getenv('PYTEST_XDIST_WORKER')
+    if GRID_NODES:
+        index = int(worker[2:]) if worker and worker[2:].isdigit() else 0  # gw0, gw1, ...
+        return GRID_NODES[index % len(GRID_NODES)]
+    return GRID_URL
+
+def create_driver(profile=DRIVER_PROFILE, proxy=None, remote=None):
+    """Starts a new Chrome session with the given profile.
+
+    proxy is the host:port of a replay.SiteProxy to send all traffic through,
+    so with a remote browser it has to be reachable from the remote machine.
+    remote is the URL of a remote WebDriver endpoint, None starts Chrome locally.
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown driver profile: {profile}")
+    options = webdriver.ChromeOptions()
+    window_setup = [enable_popup_auto_dismiss, enable_web_vitals, enable_throttling]
+    logging_prefs = {"browser": "ALL"}  # The console messages kept with the failure artifacts
+    if proxy:
+        options.add_argument(f'--proxy-server=http://{proxy}')
+        options.add_argument('--ignore-certificate-errors')  # The proxy signs its own certificates
+    if profile == "fast":
+        options.add_argument('--headless=new')
+        options.add_argument('--window-size=1920,1080')
+        # Browser wide fallback for tabs that are opened before their CDP setup has run
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
+        logging_prefs["performance"] = "ALL"
+        window_setup.append(enable_request_blocking)
+    else:
+        options.add_argument('--start-maximized')
+    options.set_capability("goog:loggingPrefs", logging_prefs)
+    browser = RemoteChrome(remote, options) if remote else webdriver.Chrome(options=options)
+    driver = track_navigation(instrument_driver(browser))
+    driver.profile = profile
+    driver.window_setup = window_setup
+    driver.prepared_windows = set()
+    prepare_window(driver)
+    return driver
+
+def track_navigation(driver):
+    """Counts the navigations of driver in driver.page_generation."""
+    execute = driver.execute
+    driver.page_generation = 0
+
+    @functools.wraps(execute)
+    def tracked_execute(driver_command, params=None):
+        try:
+            return execute(driver_command, params)
+        finally:
+            if driver_command in NAVIGATION_COMMANDS:
+                driver.page_generation += 1
+
+    driver.execute = tracked_execute
+    return driver
+
+def prepare_window(driver):
+    """Runs the per-tab setup for the current window if it has not run there yet."""
+    if not getattr(driver, "window_setup", None):
+        return
+    handle = driver.current_window_handle
+    if handle in driver.prepared_windows:
+        return
+    for setup in driver.window_setup:
+        setup(driver)
+    driver.prepared_windows.add(handle)
+
+def switch_to_window(driver, handle):
+    driver.switch_to.window(handle)
+    prepare_window(driver)
@@ -0,0 +1,130 @@
+"""Structured, non-blocking logging for the suite.
+
+Every log record is written once, as one JSON object per line, by a
+background QueueListener so that file I/O stays off the test thread.
+Records carry the running test and, for the helper steps recorded by
+instrumentation, the step, locator, duration and outcome as fields.
+
+Each run starts a fresh log file. The previous one is gzipped into
+LOG_DIR/archive and only the newest LOG_HISTORY archives are kept.
+Human readable console output is optional (CONSOLE_LOG).
+"""
+import copy
+import datetime
+import glob
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+from logging.handlers import QueueHandler, QueueListener
+
+from . import instrumentation
+from .config import LOG_DIR, LOG_HISTORY, CONSOLE_LOG
+
+# Structured fields that callers pass through logging's extra argument
+EVENT_FIELDS = ("event", "step", "locator", "duration", "outcome", "commands")
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "test": getattr(record, "test", None),
+            "message": record.getMessage(),
+        }
+        for field in EVENT_FIELDS:
+            if hasattr(record, field):
+                entry[field] = getattr(record, field)
+        if getattr(record, "exception", None):
+            entry["exception"] = record.exception
+        return json.dumps(entry, default=str)
+
+
+class _ConsoleFormatter(logging.Formatter):
+    def format(self, record):
+        text = super().format(record)
+        exception = getattr(record, "exception", None)
+        return f"{text}\n{exception}" if exception else text
+
+
+class _QueueHandler(QueueHandler):
+    """Keeps the traceback in its own field. QueueHandler.prepare would fold it into the message."""
+
+    def prepare(self, record):
+        if record.exc_info:
+            record = copy.copy(record)
+            record.exception = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = record.exc_text = None
+        return super().prepare(record)
+
+
+class _TestContext(logging.Filter):
+    """Stamps records with the running test while still on the test thread."""
+
+    def filter(self, record):
+        record.test = instrumentation.current_test()
+        return True
+
+
+class _MessagesOnly(logging.Filter):
+    """Keeps the step events out of the console, they are meant for the JSON log."""
+
+    def filter(self, record):
+        return getattr(record, "event", None) != "step"
+
+
+def log_file_path(log_dir=LOG_DIR):
+    # Every pytest-xdist worker gets its own log file so parallel runs do not clobber each other
+    worker = os.getenv('PYTEST_XDIST_WORKER')
+    return os.path.join(log_dir, f"test_{worker}.log" if worker else "test.log")
+
+def rotate(path, history=LOG_HISTORY):
+    """Moves the previous run's log into the archive, gzipped, and prunes old archives."""
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return
+    archive_dir = os.path.join(os.path.dirname(path), "archive")
+    os.makedirs(archive_dir, exist_ok=True)
+    name, _ = os.path.splitext(os.path.basename(path))
+    stamp = datetime.datetime.fromtimestamp(os.path.getmtime(path)).strftime("%Y%m%d-%H%M%S")
+    with open(path, "rb") as source, gzip.open(os.path.join(archive_dir, f"{name}-{stamp}.log.gz"), "wb") as target:
+        shutil.copyfileobj(source, target)
+    os.remove(path)
+    for old in sorted(glob.glob(os.path.join(archive_dir, f"{name}-*.log.gz")))[:-history]:
+        os.remove(old)
+
+def setup_logging(console=CONSOLE_LOG, log_dir=LOG_DIR):
+    """Routes the root logger through a queue to the JSON log file and, optionally, the console."""
+    global _listener
+    if _listener is not None:
+        return
+    os.makedirs(log_dir, exist_ok=True)
+    path = log_file_path(log_dir)
+    rotate(path)
+    file_handler = logging.FileHandler(path)
+    file_handler.setFormatter(JsonFormatter())
+    handlers = [file_handler]
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(_ConsoleFormatter('%(asctime)s - %(levelname)s - %(message)s'))
+        console_handler.addFilter(_MessagesOnly())
+        handlers.append(console_handler)
+    records = queue.SimpleQueue()
+    queue_handler = _QueueHandler(records)
+    queue_handler.addFilter(_TestContext())
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    root.addHandler(queue_handler)
+    _listener = QueueListener(records, *handlers, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Flushes everything still queued. Call once at the end of the run."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,57 @@
+"""Request blocking and network accounting for the "fast" driver profile.
+
+Images, fonts, media and third-party trackers (including the CleverTap
+script behind the wzrk popup) are blocked through the CDP
+Network.setBlockedURLs command. The block list lives under FAST_MODE in
+config.json. Resource types are blocked by file extension, since
+setBlockedURLs only matches URL patterns.
+
+Blocked requests never transfer anything, so the bytes saved are an
+estimate based on FAST_MODE["estimated_bytes"] per resource type.
+"""
+import json
+import logging
+
+from .config import FAST_MODE
+
+RESOURCE_TYPE_PATTERNS = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.svg*", "*.ico*", "*.avif*"],
+    "Font": ["*.woff*", "*.woff2*", "*.ttf*", "*.otf*", "*.eot*"],
+    "Media": ["*.mp4*", "*.webm*", "*.mp3*", "*.m3u8*"],
+    "Stylesheet": ["*.css*"],
+}
+
+
+def blocked_url_patterns(settings=FAST_MODE):
+    patterns = list(settings.get("block_url_patterns", []))
+    for resource_type in settings.get("block_resource_types", []):
+        patterns.extend(RESOURCE_TYPE_PATTERNS.get(resource_type, []))
+    return patterns
+
+def enable_request_blocking(driver, settings=FAST_MODE):
+    """Blocks the configured requests in the current tab. Has to run once per tab."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": blocked_url_patterns(settings)})
+
+def network_stats(driver, settings=FAST_MODE):
+    """Summarises the network traffic since the last call, from Chrome's performance log."""
+    estimated_bytes = settings.get("estimated_bytes", {})
+    types = {}
+    stats = {"requests": 0, "bytes": 0, "blocked_requests": 0, "bytes_saved": 0}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        params = message.get("params", {})
+        if message["method"] == "Network.requestWillBeSent":
+            stats["requests"] += 1
+            types[params["requestId"]] = params.get("type", "Other")
+        elif message["method"] == "Network.loadingFinished":
+            stats["bytes"] += int(params.get("encodedDataLength", 0))
+        elif message["method"] == "Network.loadingFailed" and params.get("blockedReason"):
+            resource_type = params.get("type") or types.get(params["requestId"], "Other")
+            stats["blocked_requests"] += 1
+            stats["bytes_saved"] += estimated_bytes.get(resource_type, estimated_bytes.get("Other", 0))
+    return stats
+
+def log_network_stats(name, stats):
+    logging.info(f"NETWORK: {name}: {stats['requests']} requests, {stats['bytes'] / 1024:.0f} KB transferred, "
+                 f"{stats['blocked_requests']} requests blocked (~{stats['bytes_saved'] / 1024:.0f} KB saved)")
@@ -0,0 +1,175 @@
+"""Reusable user journeys and the prerequisite checks built on top of them.
+
+Every ``ensure_*`` function brings the browser into a known state and only
+does the work that is actually missing, so a test can declare what it needs
+("logged in", "pin code set", "on search results") instead of relying on
+whichever test happened to run before it.
+"""
+import logging
+import pytest
+
+from .config import URL, MOBILE_NUMBER, PIN_CODE, OTP_TIMEOUT
+from .otp import get_otp_provider
+from .session_store import save_session, restore_session, clear_session
+from . import locators
+from .helpers import find, wait_for_page_ready, handle_popup, is_present
+from .pages import AddressBook, Header, ProductPage, SearchResults
+
+SEARCH_TERM = "smartphones"
+PRODUCT = "Apple iPhone 13 128 GB, Blue"
+ADDRESS_BOOK_URL = URL.rstrip('/') + "/profile/address"
+ADDRESS = {
+    locators.ADDRESS_PINCODE: "560078 ",
+    locators.ADDRESS_FIRST_NAME: "Suman",
+    locators.ADDRESS_LAST_NAME: "Naidu R",
+    locators.ADDRESS_LINE1: "no 03",
+    locators.ADDRESS_LINE2: "vittall nagar",
+    locators.ADDRESS_LANDMARK: "opp national convent school",
+    locators.ADDRESS_MOBILE_NUMBER: "9538998293",
+}
+
+
+def switch_to_main_window(driver):
+    """Closes any extra tabs and switches back to the first window, or to the tab of the test's browser context."""
+    handles = driver.window_handles
+    main = getattr(driver, "main_window", None) or handles[0]
+    keep = getattr(driver, "reserved_windows", set()) | {main}
+    for handle in handles:
+        if handle not in keep:
+            driver.switch_to.window(handle)
+            driver.close()
+    driver.switch_to.window(main)
+
+def open_home_page(driver):
+    driver.get(URL)
+    logging.info(f"ACTION: Opened home page: {URL}")
+    wait_for_page_ready(driver, "home page")
+    handle_popup(driver)
+    find(driver, locators.PAGE_BODY)
+
+def login(driver):
+    """Logs in with MOBILE_NUMBER using the code from the configured OTP provider."""
+    modal = Header.of(driver).open_login()
+    modal.enter_mobile_number(MOBILE_NUMBER)
+    modal.proceed()
+    # Fill in the OTP as soon as the provider delivers it
+    otp_input = modal.otp_input()
+    handle_popup(driver)
+    provider = get_otp_provider()
+    otp_value = provider.wait_for_otp(otp_input, OTP_TIMEOUT)
+    if otp_value is None:
+        logging.error(f"ERROR: No OTP from the {provider.name} provider within {OTP_TIMEOUT}s")
+        pytest.fail(f"No OTP received within {OTP_TIMEOUT}s")
+    if otp_input.get_attribute('value') != otp_value:
+        otp_input.clear()  # A retried login would otherwise append to the digits already typed
+        otp_input.send_keys(otp_value)
+    logging.info("ACTION: OTP entered successfully.")
+    modal.submit()
+
+def logout(driver):
+    AddressBook.of(driver).logout()
+    clear_session()  # The stored session is revoked along with this one
+
+def set_pin_code(driver):
+    Header.of(driver).set_pin_code(PIN_CODE)
+
+def search(driver, term=SEARCH_TERM):
+    return Header.of(driver).search(term)
+
+def open_product(driver, product=PRODUCT):
+    """Opens the product from the search results in a new window and switches to it."""
+    return SearchResults.of(driver).open_product(product)
+
+def add_to_cart(driver):
+    ProductPage.of(driver).add_to_cart()
+
+def add_to_wishlist(driver):
+    ProductPage.of(driver).add_to_wishlist()
+
+def open_address_book(driver):
+    driver.get(ADDRESS_BOOK_URL)
+    logging.info(f"ACTION: Opened address book: {ADDRESS_BOOK_URL}")
+    handle_popup(driver)
+    find(driver, locators.ADD_ADDRESS)
+
+def open_address_form(driver):
+    AddressBook.of(driver).open_form()
+
+def fill_address_form(driver, address=None):
+    """Fills the new-address form with ADDRESS (or the given fields) and submits it."""
+    book = AddressBook.of(driver)
+    # The pin code looks the city up as it is typed, so it gets real keystrokes
+    book.fill("address", address or ADDRESS, typed=(locators.ADDRESS_PINCODE,))
+    book.submit_form()
+
+
+# Prerequisite checks. Each one is cheap when the state is already in place.
+# The ones behind a checkpoint return whether they had to bring the state about.
+
+def ensure_home_page(driver):
+    switch_to_main_window(driver)
+    if driver.current_url.rstrip('/') != URL.rstrip('/'):
+        open_home_page(driver)
+
+def ensure_logged_in(driver):
+    switch_to_main_window(driver)
+    if not driver.current_url.startswith(URL):
+        open_home_page(driver)
+    if is_present(driver, locators.ACCOUNT_DETAILS):
+        return False
+    # A stored session is much cheaper than the OTP flow, fall back to a full login when it is stale
+    if restore_session(driver):
+        wait_for_page_ready(driver, "restore session")
+        if is_present(driver, locators.ACCOUNT_DETAILS):
+            return True
+        logging.info("SESSION: Stored session was rejected, logging in again")
+    ensure_home_page(driver)
+    login(driver)
+    find(driver, locators.ACCOUNT_DETAILS)
+    save_session(driver)
+    return True
+
+def ensure_logged_out(driver):
+    switch_to_main_window(driver)
+    if not driver.current_url.startswith(URL):
+        open_home_page(driver)
+    if Header.of(driver).is_logged_in():
+        open_address_book(driver)
+        logout(driver)
+    ensure_home_page(driver)
+
+def ensure_pin_code_set(driver):
+    switch_to_main_window(driver)
+    if not driver.current_url.startswith(URL):
+        open_home_page(driver)
+    if is_present(driver, locators.DELIVERY_LOCATION):
+        return False
+    set_pin_code(driver)
+    find(driver, locators.DELIVERY_LOCATION)
+    return True
+
+def ensure_search_results(driver, term=SEARCH_TERM):
+    switch_to_main_window(driver)
+    headings = driver.find_elements(*locators.SEARCH_HEADING.primary)
+    if headings and term in headings[0].text.lower():
+        return False
+    ensure_home_page(driver)
+    search(driver, term)
+    find(driver, locators.SEARCH_HEADING)
+    return True
+
+def ensure_item_in_cart(driver):
+    if ProductPage.of(driver).has_item_in_cart():
+        return False
+    ensure_pin_code_set(driver)
+    ensure_search_results(driver)
+    open_product(driver)
+    add_to_cart(driver)
+    return True
+
+def ensure_address_book(driver):
+    switch_to_main_window(driver)
+    if driver.current_url.rstrip('/') == ADDRESS_BOOK_URL:
+        return False
+    open_address_book(driver)
+    return True
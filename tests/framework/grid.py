@@ -0,0 +1,198 @@
+"""A stand-in Selenium Grid made of local chromedriver processes.
+
+Each node is a chromedriver plus a small relay in front of it that passes
+the WebDriver commands through and keeps track of the sessions on the node.
+Drivers connect to a node like to any remote endpoint (see
+drivers.create_driver), so the distributed mode can be tried on one
+machine before pointing GRID["url"] or GRID["nodes"] at a real grid.
+
+    python -m tests.framework.grid run --nodes 3
+    python -m tests.framework.grid run --nodes 3 -- -k "search or filters"
+    python -m tests.framework.grid serve --nodes 2
+
+``run`` starts the nodes and runs the suite with one pytest-xdist worker per
+node (GRID_NODES tells every worker its node), then reports the utilization
+of every node: the share of the wall time it had a browser session open and
+the share it spent executing commands. The report is also written to
+REPORT_DIR/grid.json. ``serve`` only starts the nodes and prints their URLs.
+"""
+import argparse
+import http.client
+import json
+import os
+import re
+import socket
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.common.driver_finder import DriverFinder
+
+from .config import REPORT_DIR
+
+SESSION_PATH = re.compile(r"^/session/([^/]+)$")
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class _Relay(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _forward(self):
+        node = self.server.node
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else None
+        start = time.monotonic()
+        connection = http.client.HTTPConnection("127.0.0.1", node.service.port, timeout=node.timeout)
+        try:
+            connection.request(self.command, self.path, body, {"Content-Type": "application/json; charset=utf-8"})
+            response = connection.getresponse()
+            status, content_type, data = response.status, response.getheader("Content-Type", "application/json"), response.read()
+        finally:
+            connection.close()
+        node.record(self.command, self.path, status, data, time.monotonic() - start)
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    do_GET = do_POST = do_DELETE = _forward
+
+    def log_message(self, format, *args):
+        pass
+
+
+class Node:
+    """One chromedriver with a relay that measures how busy it is."""
+
+    def __init__(self, name, timeout=300):
+        self.name = name
+        self.timeout = timeout
+        self.service = Service(port=_free_port())
+        self.service.path = DriverFinder(self.service, webdriver.ChromeOptions()).get_driver_path()
+        self.service.start()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _Relay)
+        self.server.daemon_threads = True
+        self.server.node = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+        self.open_sessions = {}  # session id -> start
+        self.sessions = 0
+        self.session_seconds = 0.0
+        self.commands = 0
+        self.command_seconds = 0.0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def record(self, method, path, status, data, seconds):
+        with self.lock:
+            self.commands += 1
+            self.command_seconds += seconds
+            if method == "POST" and path == "/session" and status == 200:
+                self.open_sessions[json.loads(data)["value"]["sessionId"]] = time.monotonic()
+                self.sessions += 1
+            match = SESSION_PATH.match(path)
+            if method == "DELETE" and match and match.group(1) in self.open_sessions:
+                self.session_seconds += time.monotonic() - self.open_sessions.pop(match.group(1))
+
+    def stats(self):
+        with self.lock:
+            now = time.monotonic()
+            wall = now - self.started
+            session_seconds = self.session_seconds + sum(now - start for start in self.open_sessions.values())
+            return {
+                "node": self.name,
+                "url": self.url,
+                "wall": wall,
+                "sessions": self.sessions,
+                "commands": self.commands,
+                "session_utilization": session_seconds / wall if wall else 0.0,
+                "command_utilization": self.command_seconds / wall if wall else 0.0,
+            }
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.service.stop()
+
+
+class LocalGrid:
+    def __init__(self, count):
+        self.nodes = []
+        try:
+            for number in range(count):
+                self.nodes.append(Node(f"node-{number + 1}"))
+        except Exception:
+            self.stop()
+            raise
+
+    @property
+    def urls(self):
+        return [node.url for node in self.nodes]
+
+    def stats(self):
+        return [node.stats() for node in self.nodes]
+
+    def stop(self):
+        for node in self.nodes:
+            node.stop()
+
+
+def print_report(rows):
+    print(f"{'node':<10}{'sessions':>10}{'commands':>10}{'session use':>13}{'command use':>13}")
+    for row in rows:
+        print(f"{row['node']:<10}{row['sessions']:>10}{row['commands']:>10}"
+              f"{row['session_utilization']:>13.0%}{row['command_utilization']:>13.0%}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.grid",
+                                     description="Run the suite on a stand-in grid of local chromedriver nodes.")
+    parser.add_argument("mode", choices=("run", "serve"))
+    parser.add_argument("--nodes", type=int, default=2)
+    parser.add_argument("pytest_args", nargs="*", help="extra pytest arguments, after --")
+    args = parser.parse_args(argv)
+
+    grid = LocalGrid(args.nodes)
+    try:
+        if args.mode == "serve":
+            for node in grid.nodes:
+                print(f"{node.name}: {node.url}")
+            print(f"Use GRID_NODES={','.join(grid.urls)} with pytest -n {args.nodes}, Ctrl+C to stop")
+            try:
+                while True:
+                    time.sleep(1)
+            except KeyboardInterrupt:
+                pass
+            status = 0
+        else:
+            env = dict(os.environ, GRID_NODES=",".join(grid.urls))
+            command = [sys.executable, "-m", "pytest", "tests/test_script.py", "-n", str(args.nodes),
+                       "--dist", "loadgroup", *args.pytest_args]
+            status = subprocess.call(command, env=env)
+        rows = grid.stats()
+    finally:
+        grid.stop()
+    print_report(rows)
+    path = os.path.join(REPORT_DIR, "grid.json")
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"nodes": rows}, file, indent=2)
+    print(f"Report written to {path}")
+    return status
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,285 @@
+import logging
+import time
+import pytest
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import NoSuchElementException, StaleElementReferenceException, WebDriverException
+
+from . import instrumentation, latency_model, locators, web_vitals
+from .instrumentation import step
+from .throttling import NO_THROTTLING
+
+
+@step()
+def highlight_element(driver, element):
+    """Highlights (blinks) a Selenium Webdriver element."""
+    driver.execute_script("arguments[0].style.border='5px solid #1BDAE6'", element)
+    instrumentation.sleep(0.3)
+    driver.execute_script("arguments[0].style.border=''", element)
+
+def _wait_until(driver, condition, key, timeout):
+    """Polls condition with a backing-off interval and feeds the result to the latency model.
+
+    key names the locator in the latency model; timeout None means the
+    timeout the model learned for it. Returns the condition's result, or
+    None when the timeout ran out.
+    """
+    throttling = getattr(driver, "throttling", NO_THROTTLING)
+    if timeout is None:
+        timeout = latency_model.model.timeout(key, throttling=throttling)
+    start = time.monotonic()
+    intervals = latency_model.poll_intervals()
+    while True:
+        try:
+            result = condition(driver)
+        except (NoSuchElementException, StaleElementReferenceException):
+            result = None
+        elapsed = time.monotonic() - start
+        if result:
+            latency_model.model.observe(key, elapsed, throttling=throttling)
+            return result
+        if elapsed >= timeout:
+            latency_model.model.observe(key, elapsed, timed_out=True, throttling=throttling)
+            logging.warning(f"WAIT: Gave up on {key} after {timeout:.1f}s")
+            return None
+        time.sleep(min(next(intervals), timeout - elapsed))
+
+@step("wait")
+def wait_for_element(driver, by, value, timeout=None):
+    element = _wait_until(driver, EC.presence_of_element_located((by, value)), f"{by} {value}", timeout)
+    if element is None:
+        logging.error(f"Element not found: {value}")
+        pytest.fail(f"Element not found: {value}")
+    return element
+
+@step("wait")
+def wait_for_clickable(driver, by, value, timeout=None):
+    element = _wait_until(driver, EC.element_to_be_clickable((by, value)), f"{by} {value}", timeout)
+    if element is None:
+        logging.error(f"Element not clickable: {value}")
+        pytest.fail(f"Element not clickable: {value}")
+    return element
+
+@step("wait")
+def find(driver, locator, clickable=False, timeout=None):
+    """Waits for the element behind a registry locator (see locators).
+
+    The primary selector is polled on its own at first. Once it has been
+    missing for FALLBACK_AFTER seconds (or half the timeout, if shorter),
+    the fallbacks are polled too and the first selector that matches wins.
+    """
+    if timeout is None:
+        timeout = latency_model.model.timeout(str(locator), throttling=getattr(driver, "throttling", NO_THROTTLING))
+    fallback_after = min(locators.FALLBACK_AFTER, timeout / 2)
+    expected = EC.element_to_be_clickable if clickable else EC.presence_of_element_located
+    conditions = [expected(selector) for selector in locator.selectors]
+    start = time.monotonic()
+    matched = []
+
+    def any_selector(driver):
+        tried = conditions if time.monotonic() - start >= fallback_after else conditions[:1]
+        for index, condition in enumerate(tried):
+            try:
+                element = condition(driver)
+            except (NoSuchElementException, StaleElementReferenceException):
+                continue
+            if element:
+                matched.append(index)
+                return element
+        return None
+
+    element = _wait_until(driver, any_selector, str(locator), timeout)
+    locators.stats.record(locator, time.monotonic() - start, matched[0] if matched else None)
+    if element is None:
+        state = "clickable" if clickable else "found"
+        logging.error(f"Element not {state}: {locator}")
+        pytest.fail(f"Element not {state}: {locator}")
+    return element
+
+# Installs the readiness hooks once per document and reports the current state.
+# Requests that were already in flight before the hooks were installed are not counted.
+READINESS_PROBE = """
+var w = window;
+if (!w.__readiness) {
+    var r = w.__readiness = {pending: 0, lastMutation: Date.now()};
+    new MutationObserver(function () { r.lastMutation = Date.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+    var send = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        r.pending++;
+        this.addEventListener('loadend', function () { r.pending--; });
+        return send.apply(this, arguments);
+    };
+    if (w.fetch) {
+        var fetch = w.fetch;
+        w.fetch = function () {
+            r.pending++;
+            return fetch.apply(this, arguments).finally(function () { r.pending--; });
+        };
+    }
+}
+return {readyState: document.readyState, pending: w.__readiness.pending, idle: Date.now() - w.__readiness.lastMutation};
+"""
+
+# (label, seconds waited) for every wait_for_page_ready call in this process
+readiness_timings = []
+
+@step("wait")
+def wait_for_page_ready(driver, label="page", timeout=10, quiet_period=0.5, poll=0.1):
+    """Waits until the page has settled instead of sleeping for a fixed time.
+
+    The page counts as settled once document.readyState is 'complete', no
+    XHR/fetch request is in flight and the DOM has not changed for
+    quiet_period seconds. On timeout the step carries on, just like the fixed
+    sleeps it replaces, and the next wait_for_element reports the real problem;
+    the step is recorded as timed out. The page's Web performance metrics are
+    then recorded under label.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    status = None
+    while True:
+        try:
+            status = driver.execute_script(READINESS_PROBE)
+        except WebDriverException:
+            status = None  # The document is being replaced mid-navigation
+        if status and status['readyState'] == 'complete' and status['pending'] <= 0 and status['idle'] >= quiet_period * 1000:
+            break
+        if time.monotonic() >= deadline:
+            logging.warning(f"WAIT: {label} did not settle within {timeout}s: {status}")
+            instrumentation.mark_outcome("timeout")
+            break
+        time.sleep(poll)
+    waited = time.monotonic() - start
+    readiness_timings.append((label, waited))
+    logging.info(f"WAIT: {label} settled after {waited:.2f}s")
+    if getattr(driver, "web_vitals", False) and status:
+        web_vitals.record(driver, label)
+    return waited
+
+@step()
+def handle_popup(driver):
+    """Closes the wzrk popup if it is showing. Free when the page dismisses popups itself (see popups)."""
+    if getattr(driver, "auto_dismiss", False):
+        return
+    try:
+        popup = driver.find_element(By.ID, "wzrk-cancel")
+        if popup.is_displayed():
+            highlight_element(driver, popup)
+            popup.click()
+            logging.info("Popup closed successfully")
+            instrumentation.sleep(1)  # Allow some time for the popup to close
+    except NoSuchElementException:
+        logging.info("No popup to handle")
+
+QUERY_ALL = """
+var by = arguments[0], value = arguments[1], attributes = arguments[2];
+var nodes = [];
+if (by === 'xpath') {
+    var result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    for (var i = 0; i < result.snapshotLength; i++) { nodes.push(result.snapshotItem(i)); }
+} else {
+    nodes = Array.prototype.slice.call(document.querySelectorAll(value));
+}
+return nodes.map(function (node) {
+    var style = window.getComputedStyle(node);
+    var row = {
+        text: (node.innerText || node.textContent || '').trim(),
+        visible: style.display !== 'none' && style.visibility !== 'hidden' && node.getClientRects().length > 0,
+        attributes: {}
+    };
+    attributes.forEach(function (name) { row.attributes[name] = node.getAttribute(name); });
+    return row;
+});
+"""
+
+def _css_selector(by, value):
+    if by == By.CSS_SELECTOR:
+        return value
+    if by == By.ID:
+        return f'[id="{value}"]'
+    if by == By.NAME:
+        return f'[name="{value}"]'
+    if by == By.TAG_NAME:
+        return value
+    if by == By.CLASS_NAME:
+        return f".{value}"
+    raise ValueError(f"query_all does not support locating by {by}")
+
+@step()
+def query_all(driver, by, value, attributes=()):
+    """Reads every matching element in a single round-trip.
+
+    Returns one dict per element, in document order, with its trimmed text,
+    whether it is visible and the requested attributes. Use it instead of
+    find_elements plus .text/.get_attribute per element for list checks.
+    """
+    if by != By.XPATH:
+        by, value = "css", _css_selector(by, value)
+    return driver.execute_script(QUERY_ALL, by, value, list(attributes))
+
+def is_present(driver, locator):
+    """Returns True if any selector of the registry locator matches right now, without waiting."""
+    return any(driver.find_elements(by, value) for by, value in locator.selectors)
+
+# Sets every field in one go. React keeps its own copy of an input's value and
+# ignores element.value = ..., so the value goes through the native setter of
+# the element's prototype, followed by the input/change/blur events React and
+# the form validation listen to. Returns the indexes of the fields not found.
+FILL_FORM = """
+var fields = arguments[0], missing = [];
+function lookup(selectors) {
+    for (var i = 0; i < selectors.length; i++) {
+        var by = selectors[i][0], value = selectors[i][1], node;
+        if (by === 'xpath') {
+            node = document.evaluate(value, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+        } else {
+            node = document.querySelector(value);
+        }
+        if (node) { return node; }
+    }
+    return null;
+}
+fields.forEach(function (field, index) {
+    var node = lookup(field[0]);
+    if (!node) { missing.push(index); return; }
+    var prototype = Object.getPrototypeOf(node);
+    var setter = Object.getOwnPropertyDescriptor(prototype, 'value');
+    node.focus();
+    if (setter && setter.set) { setter.set.call(node, field[1]); } else { node.value = field[1]; }
+    ['input', 'change'].forEach(function (type) { node.dispatchEvent(new Event(type, {bubbles: true})); });
+    node.blur();
+});
+return missing;
+"""
+
+# (form, seconds, number of fields) for every fill_form call in this process
+form_timings = []
+
+@step()
+def fill_form(driver, form, fields, typed=()):
+    """Fills a form from {registry locator: value} with a single script call.
+
+    The first field is waited for, the rest are expected to be on the page
+    with it. Fields in typed are typed key by key afterwards instead, for
+    inputs that only react to real keystrokes. A field the script cannot
+    find is waited for and typed as well, so a slow form still gets filled.
+    """
+    start = time.monotonic()
+    typed = {str(locator) for locator in typed}
+    bulk = [(locator, value) for locator, value in fields.items() if str(locator) not in typed]
+    keyed = [(locator, value) for locator, value in fields.items() if str(locator) in typed]
+    find(driver, next(iter(fields)))
+    if bulk:
+        selectors = [[[by, value] if by == By.XPATH else ["css", _css_selector(by, value)] for by, value in locator.selectors]
+                     for locator, _ in bulk]
+        missing = driver.execute_script(FILL_FORM, [[selector, str(value)] for selector, (_, value) in zip(selectors, bulk)])
+        for index in missing:
+            logging.info(f"FORM: {bulk[index][0]} was not on the page yet, typing it instead")
+            keyed.append(bulk[index])
+    for locator, value in keyed:
+        find(driver, locator).send_keys(value)
+    elapsed = time.monotonic() - start
+    form_timings.append((form, elapsed, len(fields)))
+    logging.info(f"ACTION: Filled the {form} form ({len(fields)} fields, {len(keyed)} typed) in {elapsed:.2f}s")
+    return elapsed
@@ -0,0 +1,301 @@
+"""Run history in a local SQLite database, with a small CLI to query it.
+
+Every run appends to HISTORY_DB: one row per run, per test, per helper
+step and per wait, plus the failures. Indexes on the test name, locator
+and time keep the questions below fast over thousands of runs.
+
+    python -m tests.framework.history runs
+    python -m tests.framework.history slower --days 7
+    python -m tests.framework.history flaky --days 30
+    python -m tests.framework.history timeouts --test test_filters
+    python -m tests.framework.history trend test_filters
+    python -m tests.framework.history html reports/trends.html
+
+Run it from the project root, like pytest.
+"""
+import argparse
+import contextlib
+import datetime
+import html
+import os
+import sqlite3
+import time
+
+from .config import HISTORY_DB
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE NOT NULL,
+    started_at REAL NOT NULL,
+    profile TEXT,
+    site_mode TEXT
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    worker TEXT,
+    throttling TEXT,
+    outcome TEXT NOT NULL,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    sleep REAL,
+    wait REAL,
+    execute REAL,
+    commands INTEGER
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    name TEXT NOT NULL,
+    locator TEXT,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    sleep REAL,
+    wait REAL,
+    execute REAL,
+    commands INTEGER,
+    outcome TEXT
+);
+CREATE TABLE IF NOT EXISTS waits (
+    id INTEGER PRIMARY KEY,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    kind TEXT NOT NULL,
+    locator TEXT,
+    started_at REAL NOT NULL,
+    duration REAL NOT NULL,
+    timed_out INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS failures (
+    id INTEGER PRIMARY KEY,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    phase TEXT,
+    message TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_started_at ON runs(started_at);
+CREATE INDEX IF NOT EXISTS tests_name_started_at ON tests(name, started_at);
+CREATE INDEX IF NOT EXISTS tests_run ON tests(run_id);
+CREATE INDEX IF NOT EXISTS steps_locator_started_at ON steps(locator, started_at);
+CREATE INDEX IF NOT EXISTS steps_test ON steps(test_id);
+CREATE INDEX IF NOT EXISTS waits_locator_started_at ON waits(locator, started_at);
+CREATE INDEX IF NOT EXISTS waits_test ON waits(test_id);
+CREATE INDEX IF NOT EXISTS failures_test ON failures(test_id);
+"""
+
+WAIT_STEPS = {"wait_for_element": "element", "wait_for_clickable": "clickable", "wait_for_page_ready": "page",
+              "find": "locator"}
+
+
+def connect(path=HISTORY_DB):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # Parallel workers write at the same time at the end of a run
+    connection = sqlite3.connect(path, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    # Databases created before the throttling profiles existed
+    columns = [row[1] for row in connection.execute("PRAGMA table_info(tests)")]
+    if "throttling" not in columns:
+        connection.execute("ALTER TABLE tests ADD COLUMN throttling TEXT")
+    return connection
+
+def record_run(uid, results, outcomes, worker=None, profile=None, site_mode=None, path=HISTORY_DB):
+    """Stores the instrumentation results of this process.
+
+    outcomes maps a test name to (outcome, failed phase, failure message).
+    Workers of the same run share its uid and end up under one run row.
+    """
+    # The connection's own context manager only commits, closing it is up to us
+    with contextlib.closing(connect(path)) as connection, connection:
+        started_at = min((test["started_at"] for test in results), default=time.time())
+        connection.execute("INSERT OR IGNORE INTO runs (uid, started_at, profile, site_mode) VALUES (?, ?, ?, ?)",
+                           (uid, started_at, profile, site_mode))
+        connection.execute("UPDATE runs SET started_at = MIN(started_at, ?) WHERE uid = ?", (started_at, uid))
+        run_id = connection.execute("SELECT id FROM runs WHERE uid = ?", (uid,)).fetchone()[0]
+        for test in results:
+            outcome, phase, message = outcomes.get(test["test"], ("unknown", None, None))
+            test_id = connection.execute(
+                "INSERT INTO tests (run_id, name, worker, throttling, outcome, started_at, duration, sleep, wait, execute, "
+                "commands) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (run_id, test["test"], worker, test.get("tags", {}).get("throttling", "none"), outcome, test["started_at"],
+                 test["wall"], test["sleep"], test["wait"], test["execute"], test["commands"])).lastrowid
+            connection.executemany(
+                "INSERT INTO steps (test_id, name, locator, started_at, duration, sleep, wait, execute, commands, outcome) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(test_id, step["step"], step["target"], test["started_at"] + step["offset"], step["duration"],
+                  step["sleep"], step["wait"], step["execute"], step["commands"], step["outcome"])
+                 for step in test["steps"]])
+            connection.executemany(
+                "INSERT INTO waits (test_id, kind, locator, started_at, duration, timed_out) VALUES (?, ?, ?, ?, ?, ?)",
+                [(test_id, WAIT_STEPS[step["step"]], step["target"], test["started_at"] + step["offset"],
+                  step["duration"], int(step["outcome"] != "ok"))
+                 for step in test["steps"] if step["step"] in WAIT_STEPS])
+            if outcome == "failed":
+                connection.execute("INSERT INTO failures (test_id, phase, message) VALUES (?, ?, ?)",
+                                   (test_id, phase, message))
+    return run_id
+
+
+# Queries behind the CLI. Each returns a list of rows (tuples) plus their column names.
+
+def recent_runs(connection, limit=20):
+    rows = connection.execute("""
+        SELECT runs.uid, datetime(runs.started_at, 'unixepoch', 'localtime'), runs.profile, runs.site_mode,
+               COUNT(tests.id), SUM(tests.outcome = 'passed'), SUM(tests.outcome = 'failed'),
+               ROUND(MAX(tests.started_at + tests.duration) - MIN(tests.started_at), 1)
+        FROM runs JOIN tests ON tests.run_id = runs.id
+        GROUP BY runs.id ORDER BY runs.started_at DESC LIMIT ?""", (limit,)).fetchall()
+    return ["run", "started", "profile", "site", "tests", "passed", "failed", "wall (s)"], rows
+
+def slower_steps(connection, days=7, limit=20):
+    """Compares each step's mean duration over the last `days` with the `days` before."""
+    now = time.time()
+    rows = connection.execute("""
+        SELECT name, locator,
+               AVG(CASE WHEN started_at >= :recent THEN duration END) AS recent,
+               AVG(CASE WHEN started_at < :recent THEN duration END) AS before,
+               SUM(started_at >= :recent)
+        FROM steps WHERE started_at >= :since
+        GROUP BY name, locator
+        HAVING recent IS NOT NULL AND before IS NOT NULL
+        ORDER BY recent - before DESC LIMIT :limit""",
+        {"recent": now - days * 86400, "since": now - 2 * days * 86400, "limit": limit}).fetchall()
+    rows = [(name, locator, round(recent, 3), round(before, 3), round(recent - before, 3), count)
+            for name, locator, recent, before, count in rows]
+    return ["step", "locator", "recent (s)", "before (s)", "change (s)", "calls"], rows
+
+def flaky_tests(connection, days=30):
+    """Failure rate and how often the outcome flipped between consecutive runs."""
+    since = time.time() - days * 86400
+    outcomes = {}
+    for name, outcome in connection.execute(
+            "SELECT name, outcome FROM tests WHERE started_at >= ? ORDER BY name, started_at", (since,)):
+        outcomes.setdefault(name, []).append(outcome)
+    rows = []
+    for name, history in outcomes.items():
+        failures = history.count("failed")
+        flips = sum(1 for previous, current in zip(history, history[1:]) if previous != current)
+        rows.append((name, len(history), failures, round(failures / len(history), 2), flips))
+    rows.sort(key=lambda row: (row[4], row[3]), reverse=True)
+    return ["test", "runs", "failures", "failure rate", "flips"], rows
+
+def timeouts(connection, test=None, days=30):
+    since = time.time() - days * 86400
+    rows = connection.execute("""
+        SELECT tests.name, waits.kind, waits.locator, COUNT(*), SUM(waits.timed_out),
+               ROUND(AVG(waits.duration), 3), ROUND(MAX(waits.duration), 3)
+        FROM waits JOIN tests ON tests.id = waits.test_id
+        WHERE waits.started_at >= ? AND tests.name LIKE ?
+        GROUP BY tests.name, waits.kind, waits.locator
+        HAVING SUM(waits.timed_out) > 0
+        ORDER BY SUM(waits.timed_out) DESC""", (since, f"%{test or ''}%")).fetchall()
+    return ["test", "wait", "locator", "waits", "timeouts", "mean (s)", "max (s)"], rows
+
+def trend(connection, test, days=30):
+    """Daily mean duration and failures of the tests matching `test`, per throttling profile."""
+    since = time.time() - days * 86400
+    rows = connection.execute("""
+        SELECT name, COALESCE(throttling, 'none'), date(started_at, 'unixepoch', 'localtime') AS day, COUNT(*),
+               ROUND(AVG(duration), 2), SUM(outcome = 'failed')
+        FROM tests WHERE name LIKE ? AND started_at >= ?
+        GROUP BY name, throttling, day ORDER BY name, throttling, day""", (f"%{test}%", since)).fetchall()
+    return ["test", "throttling", "day", "runs", "mean (s)", "failures"], rows
+
+
+def failed_in_last_run(connection):
+    """Names of the tests that failed in the most recent run."""
+    rows = connection.execute("""
+        SELECT tests.name FROM tests
+        WHERE tests.outcome = 'failed' AND tests.run_id = (SELECT id FROM runs ORDER BY started_at DESC LIMIT 1)
+        ORDER BY tests.started_at""").fetchall()
+    return [name for name, in rows]
+
+def _sparkline(values, width=240, height=40):
+    if not values:
+        return ""
+    top = max(values) or 1
+    step = width / max(len(values) - 1, 1)
+    points = " ".join(f"{i * step:.1f},{height - value / top * (height - 4) - 2:.1f}" for i, value in enumerate(values))
+    return (f'<svg width="{width}" height="{height}"><polyline fill="none" stroke="#1BDAE6" stroke-width="2" '
+            f'points="{points}"/></svg>')
+
+def _table(columns, rows):
+    head = "".join(f"<th>{html.escape(str(column))}</th>" for column in columns)
+    body = "".join("<tr>" + "".join(f"<td>{html.escape(str(value))}</td>" for value in row) + "</tr>" for row in rows)
+    return f"<table><tr>{head}</tr>{body}</table>"
+
+def write_html(connection, path, days=30):
+    """Writes a static page with per-test duration trends, flaky tests, slower steps and timeouts."""
+    _, daily = trend(connection, "", days)
+    per_test = {}
+    for name, throttling, day, runs, mean, failures in daily:
+        label = name if throttling == "none" else f"{name} [{throttling}]"
+        per_test.setdefault(label, []).append((day, mean, failures))
+    trend_rows = "".join(
+        f"<tr><td>{html.escape(name)}</td><td>{_sparkline([mean for _, mean, _ in points])}</td>"
+        f"<td>{points[-1][1]}</td><td>{sum(failures for _, _, failures in points)}</td></tr>"
+        for name, points in sorted(per_test.items()))
+    page = f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Test trends</title>
+<style>body {{ font-family: Helvetica, Arial, sans-serif; font-size: 12px; }} td, th {{ padding: 2px 8px; text-align: left; }}</style>
+</head><body>
+<h1>Test trends, last {days} days</h1>
+<p>Generated {datetime.datetime.now():%Y-%m-%d %H:%M}</p>
+<h2>Mean duration per day</h2>
+<table><tr><th>Test</th><th>Trend</th><th>Latest (s)</th><th>Failures</th></tr>{trend_rows}</table>
+<h2>Flaky tests</h2>{_table(*flaky_tests(connection, days))}
+<h2>Steps that got slower (last 7 days vs the 7 before)</h2>{_table(*slower_steps(connection, 7))}
+<h2>Timeouts</h2>{_table(*timeouts(connection, None, days))}
+</body></html>
+"""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        file.write(page)
+    return path
+
+
+def _print_table(columns, rows):
+    rows = [[("" if value is None else str(value)) for value in row] for row in rows]
+    widths = [max([len(str(column))] + [len(row[i]) for row in rows]) for i, column in enumerate(columns)]
+    print("  ".join(str(column).ljust(width) for column, width in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(value.ljust(width) for value, width in zip(row, widths)))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.history", description="Query the test run history.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    commands = parser.add_subparsers(dest="command", required=True)
+    runs_parser = commands.add_parser("runs", help="most recent runs")
+    runs_parser.add_argument("--limit", type=int, default=20)
+    slower_parser = commands.add_parser("slower", help="steps that got slower")
+    slower_parser.add_argument("--days", type=int, default=7)
+    flaky_parser = commands.add_parser("flaky", help="failure rate and outcome flips per test")
+    flaky_parser.add_argument("--days", type=int, default=30)
+    timeouts_parser = commands.add_parser("timeouts", help="waits that timed out")
+    timeouts_parser.add_argument("--test")
+    timeouts_parser.add_argument("--days", type=int, default=30)
+    trend_parser = commands.add_parser("trend", help="daily mean duration of a test")
+    trend_parser.add_argument("test")
+    trend_parser.add_argument("--days", type=int, default=30)
+    html_parser = commands.add_parser("html", help="write a static trend page")
+    html_parser.add_argument("output", nargs="?", default="reports/trends.html")
+    html_parser.add_argument("--days", type=int, default=30)
+    args = parser.parse_args(argv)
+
+    with contextlib.closing(connect(args.db)) as connection:
+        if args.command == "runs":
+            _print_table(*recent_runs(connection, args.limit))
+        elif args.command == "slower":
+            _print_table(*slower_steps(connection, args.days))
+        elif args.command == "flaky":
+            _print_table(*flaky_tests(connection, args.days))
+        elif args.command == "timeouts":
+            _print_table(*timeouts(connection, args.test, args.days))
+        elif args.command == "trend":
+            _print_table(*trend(connection, args.test, args.days))
+        elif args.command == "html":
+            print(f"Wrote {write_html(connection, args.output, args.days)}")
+
+
+if __name__ == "__main__":
+    main()
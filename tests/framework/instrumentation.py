@@ -0,0 +1,206 @@
+"""Per-step timing and WebDriver command counts for every test.
+
+Time inside a test is split into three buckets:
+
+* sleep   - fixed pauses (instrumentation.sleep, e.g. in highlight_element)
+* wait    - polling for elements or page readiness (wait_for_* helpers),
+            including the WebDriver commands issued while polling
+* execute - every other WebDriver command
+
+Whatever is left of the wall time is Python overhead. Every helper wrapped
+with @step is also recorded on its own with the same breakdown. The results
+of a run are written to REPORT_DIR as JSON and shown in the pytest-html report.
+"""
+import functools
+import html
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+from .config import REPORT_DIR
+
+CATEGORIES = ("sleep", "wait", "execute")
+
+
+class TestTimings:
+    def __init__(self, name):
+        self.name = name
+        self.start = time.monotonic()
+        self.started_at = time.time()
+        self.totals = dict.fromkeys(CATEGORIES, 0.0)
+        self.commands = 0
+        self.steps = []
+        self.stack = []  # (category, [time spent in nested phases])
+        self.depth = 0
+        self.outcomes = []  # per running step, an outcome set with mark_outcome
+        self.duration = None
+        self.tags = {}  # Conditions the test ran under, e.g. the throttling profile
+
+    def summary(self):
+        wall = self.duration if self.duration is not None else time.monotonic() - self.start
+        return {
+            "test": self.name,
+            "started_at": self.started_at,
+            "wall": wall,
+            **self.totals,
+            "other": wall - sum(self.totals.values()),
+            "commands": self.commands,
+            "tags": dict(self.tags),
+            "steps": sorted(self.steps, key=lambda row: row["offset"]),
+        }
+
+_current = None
+# Summaries of the finished tests in this process
+results = []
+# Called as listener(driver, record) after every recorded step, see artifacts
+step_listeners = []
+
+def current_test():
+    return _current.name if _current else None
+
+def tag(name, value):
+    """Tags the running test, so its timings can be told apart from runs under other conditions."""
+    if _current is not None:
+        _current.tags[name] = value
+
+def start_test(name):
+    global _current
+    _current = TestTimings(name)
+    return _current
+
+def finish_test():
+    global _current
+    timings = _current
+    if timings is None:
+        return None
+    timings.duration = time.monotonic() - timings.start
+    summary = timings.summary()
+    results.append(summary)
+    logging.info(f"TIMING: {timings.name}: {summary['wall']:.2f}s wall, {summary['sleep']:.2f}s sleeping, "
+                 f"{summary['wait']:.2f}s waiting, {summary['execute']:.2f}s executing, {summary['commands']} commands")
+    _current = None
+    return summary
+
+@contextmanager
+def phase(category):
+    """Counts the time spent in the block towards category, minus any nested phases."""
+    timings = _current
+    if timings is None:
+        yield
+        return
+    nested = [0.0]
+    timings.stack.append((category, nested))
+    start = time.monotonic()
+    try:
+        yield
+    finally:
+        elapsed = time.monotonic() - start
+        timings.stack.pop()
+        timings.totals[category] += elapsed - nested[0]
+        if timings.stack:
+            timings.stack[-1][1][0] += elapsed
+
+def mark_outcome(outcome):
+    """Records the innermost running step with this outcome instead of "ok", e.g. "timeout"."""
+    if _current is not None and _current.outcomes:
+        _current.outcomes[-1] = outcome
+
+def sleep(seconds):
+    """time.sleep that shows up as sleeping in the timings."""
+    with phase("sleep"):
+        time.sleep(seconds)
+
+def _describe(args):
+    # Registry locators (see locators) are described by their name
+    return " ".join(str(arg) for arg in args if isinstance(arg, (str, int, float)) or hasattr(arg, "selectors"))
+
+def step(category=None):
+    """Records every call of the decorated helper as a step; category puts its time in that bucket."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(driver, *args, **kwargs):
+            timings = _current
+            if timings is None:
+                return func(driver, *args, **kwargs)
+            before = dict(timings.totals)
+            commands = timings.commands
+            start = time.monotonic()
+            depth = timings.depth
+            timings.depth += 1
+            timings.outcomes.append(None)
+            outcome = "ok"
+            try:
+                if category:
+                    with phase(category):
+                        return func(driver, *args, **kwargs)
+                return func(driver, *args, **kwargs)
+            except BaseException as e:  # pytest.fail raises outside the Exception hierarchy
+                outcome = type(e).__name__
+                raise
+            finally:
+                timings.depth -= 1
+                marked = timings.outcomes.pop()
+                if marked and outcome == "ok":
+                    outcome = marked
+                record = {
+                    "step": func.__name__,
+                    "target": _describe(args),
+                    "depth": depth,
+                    "offset": start - timings.start,
+                    "duration": time.monotonic() - start,
+                    "commands": timings.commands - commands,
+                    "outcome": outcome,
+                    **{name: timings.totals[name] - before[name] for name in CATEGORIES},
+                }
+                timings.steps.append(record)
+                logging.info(f"STEP: {record['step']} {record['target']} {outcome} in {record['duration']:.3f}s",
+                             extra={"event": "step", "step": record["step"], "locator": record["target"],
+                                    "duration": record["duration"], "outcome": outcome, "commands": record["commands"]})
+                for listener in step_listeners:
+                    try:
+                        listener(driver, record)
+                    except Exception as e:  # A listener must not hide the step's own outcome
+                        logging.warning(f"STEP: Listener {listener.__name__} failed: {e!r}")
+        return wrapper
+    return decorator
+
+def instrument_driver(driver):
+    """Counts and times every WebDriver command sent by driver, including the ones sent by its elements."""
+    execute = driver.execute
+
+    @functools.wraps(execute)
+    def timed_execute(driver_command, params=None):
+        timings = _current
+        if timings is None:
+            return execute(driver_command, params)
+        timings.commands += 1
+        if any(category == "wait" for category, _ in timings.stack):
+            return execute(driver_command, params)  # Already counted as waiting
+        with phase("execute"):
+            return execute(driver_command, params)
+
+    driver.execute = timed_execute
+    return driver
+
+def write_report(path=None):
+    """Writes the timings of every test run in this process as JSON and returns the path."""
+    if path is None:
+        worker = os.getenv('PYTEST_XDIST_WORKER')
+        path = os.path.join(REPORT_DIR, f"timings_{worker}.json" if worker else "timings.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"tests": results}, file, indent=2)
+    return path
+
+def html_summary(summary):
+    """Renders a test's timings as an HTML table for the pytest-html report."""
+    rows = "".join(
+        f"<tr><td>{'&nbsp;' * 4 * row['depth']}{row['step']}</td><td>{html.escape(row['target'])}</td><td>{row['duration']:.3f}</td>"
+        f"<td>{row['sleep']:.3f}</td><td>{row['wait']:.3f}</td><td>{row['execute']:.3f}</td><td>{row['commands']}</td></tr>"
+        for row in summary["steps"])
+    return (f"<p>Wall {summary['wall']:.2f}s: sleeping {summary['sleep']:.2f}s, waiting {summary['wait']:.2f}s, "
+            f"executing {summary['execute']:.2f}s, other {summary['other']:.2f}s, {summary['commands']} WebDriver commands</p>"
+            "<table><tr><th>Step</th><th>Target</th><th>Wall (s)</th><th>Sleep (s)</th><th>Wait (s)</th>"
+            f"<th>Execute (s)</th><th>Commands</th></tr>{rows}</table>")
@@ -0,0 +1,148 @@
+"""Learns how long each locator takes to appear and sizes its waits from that.
+
+The appearance times come from the waits table of the run history (see
+history) plus everything observed in this process. Once a locator has
+ADAPTIVE_WAITS["min_samples"] samples, its timeout is the configured
+percentile of those times multiplied by a safety factor and clamped to
+[min_timeout, max_timeout]. Until then the old fixed 10 s is used. Waits
+that timed out are only counted: their duration is the timeout, not the
+time the element took, and learning from it would inflate the timeouts.
+The times are kept per throttling profile (see throttling): a timeout
+learned on the unthrottled site would be far too short under 3G.
+
+Polling starts tight and backs off: poll_start seconds, multiplied by
+poll_backoff after every miss, up to poll_max. Fast elements are found
+within a few tens of milliseconds, slow ones are not hammered.
+
+    python -m tests.framework.latency_model
+
+lists the learned stats per locator and profile, slowest first.
+"""
+import argparse
+import contextlib
+import logging
+import os
+import threading
+import time
+
+from .config import ADAPTIVE_WAITS, HISTORY_DB
+from .history import connect
+from .throttling import NO_THROTTLING
+
+DEFAULT_TIMEOUT = 10
+
+ENABLED = ADAPTIVE_WAITS.get("enabled", True)
+PERCENTILE = ADAPTIVE_WAITS.get("percentile", 0.95)
+FACTOR = ADAPTIVE_WAITS.get("factor", 2.0)
+MIN_TIMEOUT = ADAPTIVE_WAITS.get("min_timeout", 3)
+MAX_TIMEOUT = ADAPTIVE_WAITS.get("max_timeout", 30)
+MIN_SAMPLES = ADAPTIVE_WAITS.get("min_samples", 5)
+HISTORY_DAYS = ADAPTIVE_WAITS.get("history_days", 14)
+POLL_START = ADAPTIVE_WAITS.get("poll_start", 0.05)
+POLL_BACKOFF = ADAPTIVE_WAITS.get("poll_backoff", 1.5)
+POLL_MAX = ADAPTIVE_WAITS.get("poll_max", 0.5)
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)]
+
+
+class LatencyModel:
+    """Appearance times per locator ("<by> <value>", or the name of a registry locator) and throttling
+    profile, and the timeouts derived from them."""
+
+    def __init__(self, history_db=HISTORY_DB):
+        self.history_db = history_db
+        self.samples = None  # (locator, throttling) -> [seconds], loaded on first use
+        self.timeouts = {}  # (locator, throttling) -> times the wait ran out in this process
+        self.lock = threading.Lock()
+
+    def _load(self):
+        """Reads the recent waits from the history. Called with the lock held, once."""
+        self.samples = {}
+        if not os.path.exists(self.history_db):
+            return  # Nothing learned yet, and no database to create just for reading
+        try:
+            with contextlib.closing(connect(self.history_db)) as connection:
+                rows = connection.execute(
+                    "SELECT waits.locator, COALESCE(tests.throttling, ?), waits.duration "
+                    "FROM waits JOIN tests ON tests.id = waits.test_id "
+                    "WHERE waits.kind IN ('element', 'clickable', 'locator') "
+                    "AND waits.timed_out = 0 AND waits.started_at >= ?",
+                    (NO_THROTTLING, time.time() - HISTORY_DAYS * 86400)).fetchall()
+        except Exception as e:  # A broken history must not break the waits
+            logging.warning(f"WAIT: Could not load the wait history from {self.history_db}: {e!r}")
+            return
+        for locator, throttling, duration in rows:
+            self.samples.setdefault((locator, throttling), []).append(duration)
+        logging.info(f"WAIT: Learned appearance times of {len(self.samples)} locators from {len(rows)} waits")
+
+    def _samples(self, locator, throttling=NO_THROTTLING):
+        with self.lock:
+            if self.samples is None:
+                self._load()
+            return list(self.samples.get((locator, throttling), []))
+
+    def observe(self, locator, seconds, timed_out=False, throttling=NO_THROTTLING):
+        key = (locator, throttling)
+        with self.lock:
+            if self.samples is None:
+                self._load()
+            if timed_out:
+                self.timeouts[key] = self.timeouts.get(key, 0) + 1
+            else:
+                self.samples.setdefault(key, []).append(seconds)
+
+    def timeout(self, locator, default=DEFAULT_TIMEOUT, throttling=NO_THROTTLING):
+        """The timeout to use for locator under the throttling profile; default while there is too little data."""
+        samples = self._samples(locator, throttling)
+        if not ENABLED or len(samples) < MIN_SAMPLES:
+            return default
+        return min(max(_percentile(samples, PERCENTILE) * FACTOR, MIN_TIMEOUT), MAX_TIMEOUT)
+
+    def stats(self):
+        """One row per locator and profile: samples, p50, p95, max, learned timeout and timeouts in this process."""
+        with self.lock:
+            if self.samples is None:
+                self._load()
+            items = [(key, list(samples)) for key, samples in self.samples.items()]
+        rows = [{
+            "locator": locator,
+            "throttling": throttling,
+            "samples": len(samples),
+            "p50": _percentile(samples, 0.5),
+            "p95": _percentile(samples, 0.95),
+            "max": max(samples),
+            "timeout": self.timeout(locator, throttling=throttling),
+            "timed_out": self.timeouts.get((locator, throttling), 0),
+        } for (locator, throttling), samples in items if samples]
+        return sorted(rows, key=lambda row: row["p95"], reverse=True)
+
+
+def poll_intervals(start=POLL_START, backoff=POLL_BACKOFF, maximum=POLL_MAX):
+    """Seconds to sleep between polls: tight at first, then backing off."""
+    interval = start
+    while True:
+        yield interval
+        interval = min(interval * backoff, maximum)
+
+model = LatencyModel()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.latency_model",
+                                     description="Show the learned appearance times and timeouts per locator.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    parser.add_argument("--limit", type=int, default=30)
+    args = parser.parse_args(argv)
+    rows = LatencyModel(args.db).stats()[:args.limit]
+    print(f"{'samples':>8}{'p50 (s)':>9}{'p95 (s)':>9}{'max (s)':>9}{'timeout':>9}  locator")
+    for row in rows:
+        label = row['locator'] if row['throttling'] == NO_THROTTLING else f"{row['locator']} [{row['throttling']}]"
+        print(f"{row['samples']:>8}{row['p50']:>9.2f}{row['p95']:>9.2f}{row['max']:>9.2f}{row['timeout']:>9.1f}  "
+              f"{label}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Load generation from the recorded user journeys.
+
+A recording made with ``--site-mode record`` (see replay) holds every HTTP
+exchange the browser made while the suite walked through the site: home
+page, pin code, search, product page, add to cart. The page loads and the
+XHR/fetch calls among them (HTML and JSON responses on the site's own
+hosts) form the journey. Each HTML document starts a new step, and the
+calls that follow it belong to that step.
+
+Each virtual user is an asyncio task that walks the journey over plain
+sockets, keeps its own cookies and pauses for a random think time between
+steps. Users start one after the other over the ramp-up period and repeat
+the journey until the duration is over.
+
+    python -m tests.framework.load
+    python -m tests.framework.load --users 50 --ramp-up 20 --duration 120
+
+By default the requests go to a local replay proxy serving the same
+recording, so the load never reaches the real site. Use ``--target live``
+only with the site owner's consent. Settings live under LOAD in config.json.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import ssl
+import time
+from urllib.parse import urlsplit
+
+from .benchmark import percentile
+from .config import LOAD, REPLAY_DIR, REPORT_DIR, URL
+from .replay import Archive, SiteProxy
+
+USERS = LOAD.get("users", 10)
+RAMP_UP = LOAD.get("ramp_up", 10)  # seconds until every user has started
+THINK_TIME = LOAD.get("think_time", [1, 3])  # seconds between steps, min and max
+DURATION = LOAD.get("duration", 60)  # seconds
+TIMEOUT = LOAD.get("timeout", 30)  # seconds per request
+HOSTS = LOAD.get("hosts") or [urlsplit(URL).netloc]
+USER_AGENT = "Mozilla/5.0 (X11; Linux x86_64) load-test"
+
+
+def journey_from_archive(archive, hosts=HOSTS):
+    """Returns the recorded journey as [(step name, [(method, url, body)])]."""
+    steps = []
+    for exchange in archive.exchanges:
+        parts = urlsplit(exchange["url"])
+        if parts.netloc not in hosts:
+            continue
+        headers = {name.lower(): value for name, value in exchange["response_headers"]}
+        content_type = headers.get("content-type", "")
+        request = (exchange["method"], exchange["url"], base64.b64decode(exchange["request_body"]))
+        if "html" in content_type:
+            steps.append((parts.path or "/", [request]))
+        elif "json" in content_type and steps:
+            steps[-1][1].append(request)
+    return steps
+
+
+class Stats:
+    def __init__(self):
+        self.latencies = {}  # step name -> request latencies
+        self.step_latencies = {}  # step name -> latencies of the whole step
+        self.requests = 0
+        self.errors = 0
+        self.error_kinds = {}
+        self.journeys = 0
+        self.bytes = 0
+
+    def error(self, kind):
+        self.errors += 1
+        self.error_kinds[kind] = self.error_kinds.get(kind, 0) + 1
+
+    def summary(self, elapsed):
+        def spread(values):
+            return {"count": len(values), "p50": percentile(values, 0.5), "p90": percentile(values, 0.9),
+                    "p95": percentile(values, 0.95), "p99": percentile(values, 0.99), "max": max(values)}
+        every_latency = [latency for values in self.latencies.values() for latency in values]
+        return {
+            "elapsed": elapsed,
+            "requests": self.requests,
+            "errors": self.errors,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            "error_kinds": self.error_kinds,
+            "throughput": self.requests / elapsed if elapsed else 0.0,
+            "journeys": self.journeys,
+            "bytes": self.bytes,
+            "latency": spread(every_latency) if every_latency else None,
+            "steps": {name: spread(values) for name, values in self.step_latencies.items()},
+        }
+
+
+async def _request(method, url, body, cookies, proxy=None):
+    """Sends one request and returns (status, body size, Set-Cookie values)."""
+    parts = urlsplit(url)
+    if proxy:
+        # Plain HTTP proxy request with the absolute URL, which is what the replay proxy expects
+        host, _, port = proxy.partition(":")
+        reader, writer = await asyncio.open_connection(host, int(port))
+        target = url
+    else:
+        secure = parts.scheme == "https"
+        reader, writer = await asyncio.open_connection(
+            parts.hostname, parts.port or (443 if secure else 80), ssl=ssl.create_default_context() if secure else None)
+        target = parts.path + (f"?{parts.query}" if parts.query else "") or "/"
+    headers = {"Host": parts.netloc, "User-Agent": USER_AGENT, "Accept": "*/*", "Connection": "close"}
+    if cookies:
+        headers["Cookie"] = "; ".join(f"{name}={value}" for name, value in cookies.items())
+    if body:
+        headers["Content-Type"] = "application/json"
+        headers["Content-Length"] = str(len(body))
+    try:
+        writer.write(f"{method} {target} HTTP/1.1\r\n".encode()
+                     + "".join(f"{name}: {value}\r\n" for name, value in headers.items()).encode() + b"\r\n" + (body or b""))
+        await writer.drain()
+        status = int((await reader.readline()).split()[1])
+        set_cookies = []
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.lower() == "set-cookie":
+                set_cookies.append(value.strip())
+        size = len(await reader.read())
+    finally:
+        writer.close()
+    return status, size, set_cookies
+
+async def virtual_user(journey, stats, deadline, think_time=THINK_TIME, proxy=None, timeout=TIMEOUT):
+    """Walks the journey over and over until the deadline."""
+    while time.monotonic() < deadline:
+        cookies = {}
+        for name, requests in journey:
+            step_start = time.monotonic()
+            for method, url, body in requests:
+                start = time.monotonic()
+                stats.requests += 1
+                try:
+                    status, size, set_cookies = await asyncio.wait_for(
+                        _request(method, url, body, cookies, proxy), timeout)
+                except asyncio.TimeoutError:
+                    stats.error("timeout")
+                    continue
+                except (OSError, ValueError, IndexError) as e:
+                    stats.error(type(e).__name__)
+                    continue
+                stats.latencies.setdefault(name, []).append(time.monotonic() - start)
+                stats.bytes += size
+                if status >= 400:
+                    stats.error(f"HTTP {status}")
+                for cookie in set_cookies:
+                    cookie_name, _, value = cookie.split(";", 1)[0].partition("=")
+                    cookies[cookie_name.strip()] = value.strip()
+            stats.step_latencies.setdefault(name, []).append(time.monotonic() - step_start)
+            if time.monotonic() >= deadline:
+                return
+            await asyncio.sleep(random.uniform(*think_time))
+        stats.journeys += 1
+
+async def run(journey, users=USERS, ramp_up=RAMP_UP, duration=DURATION, think_time=THINK_TIME, proxy=None):
+    """Runs the virtual users and returns the summary."""
+    stats = Stats()
+    start = time.monotonic()
+    deadline = start + duration
+    tasks = []
+    for number in range(users):
+        tasks.append(asyncio.create_task(virtual_user(journey, stats, deadline, think_time, proxy)))
+        if number < users - 1:
+            await asyncio.sleep(ramp_up / users)
+    await asyncio.gather(*tasks)
+    return stats.summary(time.monotonic() - start)
+
+
+def print_report(summary, users):
+    latency = summary["latency"] or {}
+    print(f"{users} users, {summary['elapsed']:.1f}s: {summary['requests']} requests "
+          f"({summary['throughput']:.1f}/s), {summary['journeys']} journeys, "
+          f"{summary['error_rate']:.1%} errors {summary['error_kinds'] or ''}")
+    if latency:
+        print(f"Request latency: p50 {latency['p50'] * 1000:.0f} ms, p90 {latency['p90'] * 1000:.0f} ms, "
+              f"p95 {latency['p95'] * 1000:.0f} ms, p99 {latency['p99'] * 1000:.0f} ms")
+    print(f"{'step':<40}{'count':>8}{'p50 (ms)':>10}{'p90 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}")
+    for name, step in summary["steps"].items():
+        print(f"{name[:39]:<40}{step['count']:>8}{step['p50'] * 1000:>10.0f}{step['p90'] * 1000:>10.0f}"
+              f"{step['p95'] * 1000:>10.0f}{step['p99'] * 1000:>10.0f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.load",
+                                     description="Replay the recorded user journeys as concurrent virtual users.")
+    parser.add_argument("--users", type=int, default=USERS)
+    parser.add_argument("--ramp-up", type=float, default=RAMP_UP, help="seconds until every user has started")
+    parser.add_argument("--duration", type=float, default=DURATION, help="seconds")
+    parser.add_argument("--think-time", type=float, nargs=2, default=THINK_TIME, metavar=("MIN", "MAX"))
+    parser.add_argument("--recording", default=REPLAY_DIR, help="directory with the recorded journey")
+    parser.add_argument("--target", choices=("replay", "live"), default="replay",
+                        help="replay: a local stand-in serving the recording; live: the real site")
+    args = parser.parse_args(argv)
+
+    archive = Archive(args.recording)
+    archive.load()
+    journey = journey_from_archive(archive)
+    if not journey:
+        raise SystemExit(f"No page loads of {', '.join(HOSTS)} in the recording at {args.recording}")
+    print(f"Journey: {' -> '.join(name for name, _ in journey)} "
+          f"({sum(len(requests) for _, requests in journey)} requests)")
+
+    stand_in = SiteProxy("replay", args.recording) if args.target == "replay" else None
+    try:
+        summary = asyncio.run(run(journey, args.users, args.ramp_up, args.duration, args.think_time,
+                                  proxy=stand_in.address if stand_in else None))
+    finally:
+        if stand_in:
+            stand_in.stop()
+    print_report(summary, args.users)
+    path = os.path.join(REPORT_DIR, "load.json")
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"users": args.users, "ramp_up": args.ramp_up, "think_time": args.think_time,
+                   "journey": [name for name, _ in journey], **summary}, file, indent=2)
+    print(f"Report written to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""Every page element the suite touches, defined once.
+
+Each Locator has a primary selector and fallbacks, tried in that order.
+XPaths that only match on tag names and exact attribute values are turned
+into the equivalent CSS selector when they are defined, since CSS lookups
+are cheaper for the browser. Text matches (contains(text(), ...)) stay XPath.
+
+Selectors with {placeholders} are templates; fill them in with
+``locator.format(brand="Xiaomi")``.
+
+helpers.find looks elements up through the registry and records here how
+long every lookup took and whether it needed a fallback, so that
+``log_report`` can point out slow and broken selectors after a run.
+"""
+import json
+import logging
+import os
+import re
+import threading
+from selenium.webdriver.common.by import By
+
+from .config import LOCATORS, REPORT_DIR
+
+FALLBACK_AFTER = LOCATORS.get("fallback_after", 2)  # seconds before the fallbacks are tried as well
+SLOW_LOOKUP = LOCATORS.get("slow_lookup", 1.0)  # mean seconds above which a locator is reported as slow
+
+STRATEGIES = {By.ID, By.CSS_SELECTOR, By.XPATH, By.NAME, By.TAG_NAME, By.CLASS_NAME, By.LINK_TEXT,
+              By.PARTIAL_LINK_TEXT}
+
+_XPATH_STEP = re.compile(r"^(?P<tag>[\w-]+|\*)(?:\[(?P<predicates>[^\[\]]+)\])?$")
+_XPATH_PREDICATE = re.compile(r"^@(?P<name>[\w-]+)='(?P<value>[^']*)'$")
+_CSS_IDENTIFIER = re.compile(r"^[A-Za-z_][\w-]*$")
+
+
+def xpath_to_css(xpath):
+    """The CSS selector matching exactly what xpath matches, or None when there is none this simple.
+
+    Handles paths of // and / steps made of a tag name and @attribute='value' predicates.
+    """
+    if not xpath.startswith("//"):
+        return None
+    parts = re.split(r"(//|/)", xpath)[1:]
+    css = []
+    for axis, step_text in zip(parts[::2], parts[1::2]):
+        match = _XPATH_STEP.match(step_text)
+        if not match:
+            return None
+        step = "" if match["tag"] == "*" else match["tag"]
+        for predicate in (match["predicates"] or "").split(" and ") if match["predicates"] else []:
+            attribute = _XPATH_PREDICATE.match(predicate.strip())
+            if not attribute:
+                return None
+            name, value = attribute["name"], attribute["value"]
+            if name == "id" and _CSS_IDENTIFIER.match(value):
+                step += f"#{value}"
+            else:
+                step += f"[{name}='{value}']"
+        if css:
+            css.append(" > " if axis == "/" else " ")
+        elif axis == "/":
+            return None  # An absolute path from the root, rare enough not to bother
+        css.append(step or "*")
+    return "".join(css)
+
+
+class Locator:
+    def __init__(self, name, selectors):
+        self.name = name
+        self.selectors = selectors
+
+    @property
+    def primary(self):
+        return self.selectors[0]
+
+    def format(self, **values):
+        """Fills in a template, e.g. the brand of a filter option."""
+        return Locator(self.name, [(by, value.format(**values)) for by, value in self.selectors])
+
+    def __str__(self):
+        return self.name
+
+    def __repr__(self):
+        return f"Locator({self.name!r}, {self.selectors!r})"
+
+REGISTRY = {}
+
+def define(name, *selectors):
+    """Registers a page element. selectors are (By, value) pairs, the primary one first."""
+    if name in REGISTRY:
+        raise ValueError(f"Locator {name} is defined twice")
+    if not selectors:
+        raise ValueError(f"Locator {name} has no selector")
+    prepared = []
+    for by, value in selectors:
+        if by not in STRATEGIES:
+            raise ValueError(f"Locator {name} uses an unknown strategy: {by}")
+        if by == By.XPATH and "{" not in value:
+            css = xpath_to_css(value)
+            if css:
+                by, value = By.CSS_SELECTOR, css
+        if (by, value) not in prepared:
+            prepared.append((by, value))
+    locator = Locator(name, prepared)
+    REGISTRY[name] = locator
+    return locator
+
+
+PAGE_BODY = define("page.body", (By.TAG_NAME, "body"))
+
+# Header
+LOGIN_BUTTON = define("header.login_button",
+                      (By.CSS_SELECTOR, "li[aria-label='Login'] span#RIL_HeaderLoginAndMyAccount"),
+                      (By.XPATH, "//li[@class='header__maininfo__list__item dropdown__item' and @tabindex='0' and @aria-label='Login']//span[@class='pb__24 pointer' and @id='RIL_HeaderLoginAndMyAccount' and @role='button' and @tabindex='0']"))
+ACCOUNT_MENU = define("header.account_menu", (By.ID, "RIL_HeaderLoginAndMyAccount"))
+ACCOUNT_DETAILS = define("header.account_details", (By.XPATH, "//li[@aria-label='Account Details']"))
+ACCOUNT_GREETING = define("header.account_greeting",
+                          (By.XPATH, "//li[@aria-label='Account Details']//span[contains(text(), 'Hi suman')]"))
+SEARCH_BAR = define("header.search_bar", (By.ID, "suggestionBoxEle"))
+PIN_CODE_BUTTON = define("header.pin_code_button", (By.XPATH, "//div[@aria-label='Select your Pin Code']"))
+DELIVERY_LOCATION = define("header.delivery_location", (By.XPATH, "//span[@aria-label='Deliver to Bangalore 560078']"))
+FIND_STORE_LINK = define("header.find_store_link", (By.XPATH, "//a[@aria-label='Opening Find a store Page in New Tab']"))
+WISHLIST_LINK = define("header.wishlist_link", (By.CSS_SELECTOR, "a[href='/profile/wishlist'] div#wishlist"))
+MY_CREDITS_LINK = define("header.my_credits_link", (By.CSS_SELECTOR, "a[href='/profile/storecredit'] div#storecredit"))
+
+# Pin code modal
+PIN_CODE_INPUT = define("pin_code.input", (By.ID, "pincode"))
+PIN_CODE_APPLY = define("pin_code.apply", (By.XPATH, "//button[@aria-label='APPLY']"))
+
+# Login modal
+MOBILE_NUMBER = define("login.mobile_number", (By.ID, "lMobileNumber"))
+PROCEED = define("login.proceed", (By.XPATH, "//button[@aria-label='Proceed']"))
+OTP_INPUT = define("login.otp", (By.ID, "l-m-otp"))
+SUBMIT_LOGIN = define("login.submit", (By.XPATH, "//button[@aria-label='Login']"))
+LOGIN_ERROR = define("login.error",
+                     (By.XPATH, "//div[@class='Input__Error-sc-q4csvm-7 hMaMHi']"),
+                     (By.XPATH, "//div[starts-with(@class, 'Input__Error')]"))
+
+# Search results
+SEARCH_HEADING = define("search.heading", (By.XPATH, "//div[@class='pl__headline']/h1"))
+PRODUCT_LINKS = define("search.product_links", (By.XPATH, "//div[@class='sp grid']//a[@attr-tag='anchor']"))
+PRODUCT_LINK = define("search.product_link",
+                      (By.XPATH, "//div[@class='sp grid']//a[@attr-tag='anchor' and contains(., '{product}')]"))
+PRODUCT_PRICES = define("search.product_prices", (By.XPATH, "//div[@class='product-price']"))
+SORT_PRICE_HIGH_LOW = define("search.sort_price_high_low", (By.XPATH, "//span[contains(text(), 'Price(High-Low)')]"))
+
+# Filter panel
+MIN_PRICE = define("filters.min_price", (By.XPATH, "//input[@aria-label='Min.']"))
+MAX_PRICE = define("filters.max_price", (By.XPATH, "//input[@aria-label='Max.']"))
+PRICE_GO = define("filters.price_go", (By.XPATH, "//button[@aria-label='Go']"))
+SEE_MORE_BRANDS = define("filters.see_more_brands", (By.XPATH, "//span[contains(text(), 'See More')]"))
+# The class names are generated by styled-components and change with every release of the site
+BRAND = define("filters.brand",
+               (By.XPATH, "//div[contains(text(), '{brand}') and @class='TextWeb__Text-sc-1cyx778-0 eJjyJG']"),
+               (By.XPATH, "//div[contains(text(), '{brand}') and starts-with(@class, 'TextWeb__Text')]"))
+BATTERY_SECTION = define("filters.battery_section", (By.XPATH, "//h4[text()='Battery Capacities']"))
+BATTERY_OPTION = define("filters.battery_option",
+                        (By.XPATH, "//div[contains(text(), '{capacity}') and @class='TextWeb__Text-sc-1cyx778-0 eJjyJG']"),
+                        (By.XPATH, "//div[contains(text(), '{capacity}') and starts-with(@class, 'TextWeb__Text')]"))
+CLEAR_FILTERS = define("filters.clear_all", (By.XPATH, "//div[contains(text(), 'Clear All')]"))
+
+# Product page
+ADD_TO_CART = define("product.add_to_cart", (By.ID, "add_to_cart_main_btn"))
+ADD_TO_WISHLIST = define("product.add_to_wishlist", (By.XPATH, "//button[@aria-label='Add to Wishlist']"))
+WISHLIST_SHOULD_BUY = define("product.wishlist_should_buy", (By.XPATH, "//button[@aria-label='should_by']"))
+WISHLIST_CONFIRM = define("product.wishlist_confirm",
+                          (By.XPATH, "//button[@aria-label='Add to Wishlist' and @theme='primary']"))
+
+# Cart
+REMOVE_FROM_CART = define("cart.remove",
+                          (By.XPATH, "//button[@aria-label='Remove from Cart' and @id='btn-cab-remove-491997702']"),
+                          (By.CSS_SELECTOR, "button[aria-label='Remove from Cart']"))
+CONFIRM_REMOVE = define("cart.confirm_remove",
+                        (By.XPATH, "//button[@aria-label='Yes' and contains(., 'Yes')]"),
+                        (By.CSS_SELECTOR, "button[aria-label='Yes']"))
+
+# Wishlist
+WISHLIST_TITLES = define("wishlist.titles", (By.CSS_SELECTOR, "div.mywishlist__main-container__wishlist__title"))
+WISHLIST_DELETE = define("wishlist.delete", (By.CSS_SELECTOR, "div i.fa-trash-o"))
+WISHLIST_CONFIRM_DELETE = define("wishlist.confirm_delete", (By.CSS_SELECTOR, "button.btn__primary span"))
+WISHLIST_EMPTY = define("wishlist.empty_message", (By.CSS_SELECTOR, "div.wishlist-main__noOrder h3"))
+CONTINUE_SHOPPING = define("wishlist.continue_shopping", (By.CSS_SELECTOR, "a.wishlist-main__continueShopping"))
+
+# My Credits
+CREDIT_BALANCE = define("credits.balance", (By.CSS_SELECTOR, "div.mycredit__page__balance__icon__amount"))
+
+# Address book
+ADD_ADDRESS = define("address.add_new", (By.CSS_SELECTOR, "div.myaddress__section__add"))
+NEW_ADDRESS_TITLE = define("address.new_address_title", (By.CSS_SELECTOR, "div[title='Add a new Address']"))
+ADDRESS_PINCODE = define("address.pincode", (By.ID, "input-address-m-pincode"))
+ADDRESS_FIRST_NAME = define("address.first_name", (By.ID, "input-address-w-fname"))
+ADDRESS_LAST_NAME = define("address.last_name", (By.ID, "input-address-w-lname"))
+ADDRESS_LINE1 = define("address.line1", (By.ID, "input-address-w-line1"))
+ADDRESS_LINE2 = define("address.line2", (By.ID, "input-address-w-line2"))
+ADDRESS_LANDMARK = define("address.landmark", (By.ID, "input-address-w-line3"))
+ADDRESS_MOBILE_NUMBER = define("address.mobile_number", (By.ID, "input-address-w-mobileNumber"))
+SUBMIT_ADDRESS = define("address.submit",
+                        (By.CSS_SELECTOR, "button.Button__StyledButton-sc-1py7swr-0.jehPGe span.TextWeb__Text-sc-1cyx778-0.cXyRgU"),
+                        (By.XPATH, "//button[normalize-space()='Submit']"))
+ADDRESS_CARD = define("address.card", (By.CSS_SELECTOR, "label.myaddress__section__address__container"))
+DELETE_ADDRESS = define("address.delete",
+                        (By.CSS_SELECTOR, "button.Button__StyledButton-sc-1py7swr-0.krSokV span.TextWeb__Text-sc-1cyx778-0.cXyRgU i.fa.fa-trash-o"),
+                        (By.CSS_SELECTOR, "label.myaddress__section__address__container i.fa-trash-o"))
+CONFIRM_DELETE_ADDRESS = define("address.confirm_delete",
+                                (By.CSS_SELECTOR, "button.Button__StyledButton-sc-1py7swr-0.jPTXqT.ripple[aria-label=' Yes '] span.TextWeb__Text-sc-1cyx778-0.cXyRgU"),
+                                (By.CSS_SELECTOR, "button[aria-label=' Yes ']"))
+LOGOUT = define("account.logout",
+                (By.CSS_SELECTOR, "div.left-nav__link-container__myacc.pb__32 i.fa.hidden-xs.fa-sign-out"),
+                (By.CSS_SELECTOR, "i.fa-sign-out"))
+
+# Store finder
+STORE_SEARCH = define("stores.search", (By.XPATH, "//input[@aria-label='Enter Pincode / Town / Street']"))
+STORE_SUGGESTION = define("stores.suggestion", (By.XPATH, "//li[contains(text(), '{place}')]"))
+STORE_NAME = define("stores.name", (By.XPATH, "//div[contains(text(), '{store}')]"))
+
+
+class LookupStats:
+    """How long each locator took to find and which of its selectors matched."""
+
+    def __init__(self):
+        self.rows = {}
+        self.lock = threading.Lock()
+
+    def record(self, locator, seconds, index):
+        """index is the position of the selector that matched, None when nothing did."""
+        with self.lock:
+            row = self.rows.setdefault(locator.name, {"locator": locator.name, "lookups": 0, "total": 0.0, "max": 0.0,
+                                                      "fallbacks": 0, "failures": 0, "matched": {}})
+            row["lookups"] += 1
+            row["total"] += seconds
+            row["max"] = max(row["max"], seconds)
+            if index is None:
+                row["failures"] += 1
+            else:
+                if index > 0:
+                    row["fallbacks"] += 1
+                by, value = locator.selectors[index]
+                key = f"{by} {value}"
+                row["matched"][key] = row["matched"].get(key, 0) + 1
+
+    def report(self):
+        with self.lock:
+            rows = [dict(row, mean=row["total"] / row["lookups"]) for row in self.rows.values()]
+        return sorted(rows, key=lambda row: row["mean"], reverse=True)
+
+stats = LookupStats()
+
+def write_report(path=None):
+    if path is None:
+        worker = os.getenv('PYTEST_XDIST_WORKER')
+        path = os.path.join(REPORT_DIR, f"locators_{worker}.json" if worker else "locators.json")
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"locators": stats.report()}, file, indent=2)
+    return path
+
+def log_report(slow=SLOW_LOOKUP):
+    """Logs the locators that were slow, needed a fallback or were not found at all."""
+    for row in stats.report():
+        if row["fallbacks"]:
+            logging.warning(f"LOCATOR: {row['locator']} needed a fallback selector in {row['fallbacks']} of "
+                            f"{row['lookups']} lookups: {row['matched']}")
+        if row["failures"]:
+            logging.warning(f"LOCATOR: {row['locator']} was not found in {row['failures']} of {row['lookups']} lookups")
+        if row["mean"] > slow:
+            logging.info(f"LOCATOR: {row['locator']} is slow, {row['mean']:.2f}s on average, {row['max']:.2f}s at most")
@@ -0,0 +1,208 @@
+"""Where the login flow gets its OTP from.
+
+Every provider exposes ``wait_for_otp(otp_input, timeout)`` which returns
+the code as soon as it is available, or None once the timeout is over:
+
+* ConfigOtpProvider - the OTP value from config.json
+* EnvOtpProvider    - an environment variable
+* FileOtpProvider   - a local file that something else writes the code into
+* HttpOtpProvider   - a local stub SMS endpoint; POST the code to /otp
+* ManualOtpProvider - a person types the code into the browser (the old behaviour)
+
+The provider is picked with OTP_PROVIDER in config.json. "auto" uses the
+config value or the environment variable when one holds a code, and falls
+back to manual entry otherwise.
+
+Push a code to the HTTP provider with ``python -m tests.framework.otp 123456``
+from the project root.
+"""
+import abc
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .config import OTP, OTP_PROVIDER, OTP_ENV, OTP_FILE, OTP_HTTP_PORT
+
+OTP_PATTERN = re.compile(r"\b(\d{6})\b")
+
+
+def parse_otp(text):
+    """Returns the first 6 digit code found in text, or None."""
+    match = OTP_PATTERN.search(text or "")
+    return match.group(1) if match else None
+
+
+class OtpProvider(abc.ABC):
+    name = "base"
+
+    @abc.abstractmethod
+    def wait_for_otp(self, otp_input, timeout):
+        """Returns the code, or None when none arrived within timeout seconds."""
+
+    def close(self):
+        pass
+
+
+class ConfigOtpProvider(OtpProvider):
+    name = "config"
+
+    def __init__(self, value=None):
+        self.value = parse_otp(OTP if value is None else value)
+
+    def wait_for_otp(self, otp_input, timeout):
+        return self.value
+
+
+class EnvOtpProvider(OtpProvider):
+    name = "env"
+
+    def __init__(self, variable=None):
+        self.variable = variable or OTP_ENV
+
+    def wait_for_otp(self, otp_input, timeout):
+        return parse_otp(os.getenv(self.variable))
+
+
+class FileOtpProvider(OtpProvider):
+    """Watches a file and takes the first code written to it after the wait started."""
+    name = "file"
+
+    def __init__(self, path=OTP_FILE, poll=0.05):
+        self.path = path
+        self.poll = poll
+
+    def _mtime(self):
+        try:
+            return os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def wait_for_otp(self, otp_input, timeout):
+        # Codes left over from an earlier login are already spent
+        seen = self._mtime()
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            mtime = self._mtime()
+            if mtime is not None and mtime != seen:
+                seen = mtime
+                with open(self.path) as file:
+                    code = parse_otp(file.read())
+                if code:
+                    os.remove(self.path)
+                    return code
+            time.sleep(self.poll)
+        return None
+
+
+class HttpOtpProvider(OtpProvider):
+    """Local stub SMS gateway. Accepts the code as plain text, JSON {"otp": ...} or form data on POST /otp."""
+    name = "http"
+
+    def __init__(self, host="127.0.0.1", port=OTP_HTTP_PORT):
+        self.received = threading.Event()
+        self.code = None
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode()
+                code = parse_otp(body)
+                if self.path.rstrip("/") != "/otp" or code is None:
+                    self.send_response(400)
+                    self.end_headers()
+                    return
+                provider.code = code
+                provider.received.set()
+                self.send_response(204)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logging.debug("OTP endpoint: " + format, *args)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        logging.info(f"OTP: Listening for codes on http://{host}:{port}/otp")
+
+    def wait_for_otp(self, otp_input, timeout):
+        if not self.received.wait(timeout):
+            return None
+        code, self.code = self.code, None
+        self.received.clear()
+        return code
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class ManualOtpProvider(OtpProvider):
+    """Waits for someone to type the code into the OTP field of the open browser."""
+    name = "manual"
+
+    def __init__(self, poll=0.5):
+        self.poll = poll
+
+    def wait_for_otp(self, otp_input, timeout):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                code = parse_otp(otp_input.get_attribute('value'))
+                if code:
+                    return code
+            except Exception as e:
+                logging.error("Error while checking OTP entry: %s", e)
+            time.sleep(self.poll)
+        return None
+
+
+def worker_port(port):
+    """Gives every pytest-xdist worker its own port (gw0 -> port, gw1 -> port + 1, ...)."""
+    worker = os.getenv('PYTEST_XDIST_WORKER', 'gw0')
+    return port + int(worker[2:] or 0)
+
+_provider = None
+
+def get_otp_provider():
+    """Returns the provider configured by OTP_PROVIDER, created once per process."""
+    global _provider
+    if _provider is None:
+        if OTP_PROVIDER == "config":
+            _provider = ConfigOtpProvider()
+        elif OTP_PROVIDER == "env":
+            _provider = EnvOtpProvider()
+        elif OTP_PROVIDER == "file":
+            _provider = FileOtpProvider()
+        elif OTP_PROVIDER == "http":
+            _provider = HttpOtpProvider(port=worker_port(OTP_HTTP_PORT))
+        elif OTP_PROVIDER == "manual":
+            _provider = ManualOtpProvider()
+        elif OTP_PROVIDER == "auto":
+            if ConfigOtpProvider().value:
+                _provider = ConfigOtpProvider()
+            elif EnvOtpProvider().wait_for_otp(None, 0):
+                _provider = EnvOtpProvider()
+            else:
+                _provider = ManualOtpProvider()
+        else:
+            raise SystemExit(f"Unknown OTP_PROVIDER in configuration: {OTP_PROVIDER}")
+        logging.info(f"OTP: Using the {_provider.name} provider")
+    return _provider
+
+def push_otp(code, host="127.0.0.1", port=OTP_HTTP_PORT):
+    """Sends a code to a running HttpOtpProvider, the way an SMS gateway webhook would."""
+    request = urllib.request.Request(f"http://{host}:{port}/otp", data=json.dumps({"otp": code}).encode(),
+                                     headers={"Content-Type": "application/json"}, method="POST")
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return response.status
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        raise SystemExit("usage: python -m tests.framework.otp <code> [port]")
+    push_otp(sys.argv[1], port=int(sys.argv[2]) if len(sys.argv) == 3 else OTP_HTTP_PORT)
@@ -0,0 +1,387 @@
+"""Page objects for the parts of the site the suite works with.
+
+A page object finds each element once and keeps the handle for as long as
+the page it came from is showing, so a step that reads, highlights and
+clicks an element, or a test that hovers the account menu twice, does not
+go back to the DOM for it every time. The handles are dropped when the
+driver navigates (see drivers.track_navigation) or when the page object
+itself does something that loads another page. A handle that the page
+replaced behind our back raises StaleElementReferenceException; it is then
+found again and the action is retried once.
+
+Page objects live on the driver, one per class: ``Header.of(driver)``.
+"""
+import logging
+from selenium.common.exceptions import StaleElementReferenceException
+from selenium.webdriver.common.action_chains import ActionChains
+from selenium.webdriver.common.keys import Keys
+
+from . import locators
+from .drivers import switch_to_window
+from .helpers import highlight_element, fill_form, find, wait_for_page_ready, handle_popup, is_present, query_all
+
+
+class Page:
+    def __init__(self, driver):
+        self.driver = driver
+        self.generation = getattr(driver, "page_generation", 0)
+        self.elements = {}  # (selectors, clickable) -> WebElement
+        self.highlighted = set()
+
+    @classmethod
+    def of(cls, driver):
+        """Returns the page object of this class for driver, creating it on first use."""
+        pages = driver.__dict__.setdefault("pages", {})
+        if cls not in pages:
+            pages[cls] = cls(driver)
+        return pages[cls]
+
+    def invalidate(self):
+        """Forgets every cached element."""
+        self.elements.clear()
+        self.highlighted.clear()
+        self.generation = getattr(self.driver, "page_generation", 0)
+
+    def navigated(self, step):
+        """Call after an action that loads another page: waits for it and invalidates every page object."""
+        self.driver.page_generation = getattr(self.driver, "page_generation", 0) + 1
+        wait_for_page_ready(self.driver, step)
+
+    @staticmethod
+    def cache_key(locator, clickable=False):
+        """The cache key of a locator. Filled-in templates keep their name, so the selectors are the key."""
+        return tuple(locator.selectors), clickable
+
+    def element(self, locator, clickable=False):
+        """The element behind the registry locator, from the cache if the page has not changed since."""
+        if self.generation != getattr(self.driver, "page_generation", 0):
+            self.invalidate()
+        key = self.cache_key(locator, clickable)
+        if key not in self.elements:
+            self.elements[key] = find(self.driver, locator, clickable=clickable)
+        return self.elements[key]
+
+    def use(self, locator, action, clickable=False):
+        """Runs action(element); if the element went stale it is found again and action retried once."""
+        try:
+            return action(self.element(locator, clickable))
+        except StaleElementReferenceException:
+            logging.info(f"PAGE: {locator} was replaced by the page, finding it again")
+            key = self.cache_key(locator, clickable)
+            self.elements.pop(key, None)
+            self.highlighted.discard(key)
+            return action(self.element(locator, clickable))
+
+    def highlight(self, locator, clickable=False):
+        """Highlights the element, once per handle."""
+        key = self.cache_key(locator, clickable)
+        if key in self.highlighted and key in self.elements:
+            return
+        self.use(locator, lambda element: highlight_element(self.driver, element), clickable)
+        self.highlighted.add(key)
+
+    def click(self, locator):
+        self.highlight(locator, clickable=True)
+        self.use(locator, lambda element: element.click(), clickable=True)
+
+    def type(self, locator, text, clear=False):
+        self.highlight(locator)
+
+        def send(element):
+            if clear:
+                element.clear()
+            element.send_keys(text)
+        self.use(locator, send)
+
+    def fill(self, form, fields, typed=()):
+        """Fills the form in one script call, see helpers.fill_form."""
+        return fill_form(self.driver, form, fields, typed)
+
+    def text(self, locator):
+        return self.use(locator, lambda element: element.text)
+
+    def hover(self, locator):
+        self.highlight(locator)
+        self.use(locator, lambda element: ActionChains(self.driver).move_to_element(element).perform())
+
+    def is_present(self, locator):
+        """True if the element is cached or can be seen right now, without waiting."""
+        if self.generation == getattr(self.driver, "page_generation", 0) and self.cache_key(locator) in self.elements:
+            return True
+        return is_present(self.driver, locator)
+
+
+class Header(Page):
+    """The site header: login, account menu, search, pin code and store finder."""
+
+    def open_login(self):
+        handle_popup(self.driver)
+        self.click(locators.LOGIN_BUTTON)
+        logging.info("ACTION: Clicked login button")
+        wait_for_page_ready(self.driver, "login modal")
+        handle_popup(self.driver)
+        return LoginModal.of(self.driver)
+
+    def is_logged_in(self):
+        return is_present(self.driver, locators.ACCOUNT_DETAILS)
+
+    def login_text(self):
+        self.highlight(locators.LOGIN_BUTTON)
+        return self.text(locators.LOGIN_BUTTON)
+
+    def greeting(self):
+        self.highlight(locators.ACCOUNT_GREETING)
+        return self.text(locators.ACCOUNT_GREETING)
+
+    def hover_account_menu(self):
+        self.hover(locators.ACCOUNT_MENU)
+        logging.info("ACTION: Hovered over account details")
+
+    def open_wishlist(self):
+        self.hover_account_menu()
+        self.click(locators.WISHLIST_LINK)
+        logging.info("ACTION: Clicked on My Wishlist")
+        self.navigated("wishlist page")
+        return Wishlist.of(self.driver)
+
+    def open_my_credits(self):
+        self.hover_account_menu()
+        self.click(locators.MY_CREDITS_LINK)
+        logging.info("ACTION: Clicked on 'My Credits' link")
+        self.navigated("my credits page")
+        return MyCredits.of(self.driver)
+
+    def set_pin_code(self, pin_code):
+        handle_popup(self.driver)
+        self.click(locators.PIN_CODE_BUTTON)
+        logging.info("ACTION: Clicked 'Select your Pin Code' button")
+        wait_for_page_ready(self.driver, "pin code modal")
+        self.type(locators.PIN_CODE_INPUT, pin_code)
+        logging.info(f"ACTION: Entered pin code: {pin_code}")
+        self.click(locators.PIN_CODE_APPLY)
+        logging.info("ACTION: Clicked 'APPLY' button")
+        wait_for_page_ready(self.driver, "pin code update")
+
+    def delivery_location(self):
+        self.highlight(locators.DELIVERY_LOCATION)
+        return self.text(locators.DELIVERY_LOCATION)
+
+    def search(self, term):
+        handle_popup(self.driver)
+        self.type(locators.SEARCH_BAR, term)
+        logging.info(f"ACTION: Entered '{term}' into the search bar")
+        self.type(locators.SEARCH_BAR, Keys.ENTER)
+        logging.info("ACTION: Pressed Enter to search")
+        self.navigated("search results")
+        handle_popup(self.driver)
+        return SearchResults.of(self.driver)
+
+    def open_find_store(self):
+        """Opens "Find a store" in a new tab and switches to it."""
+        handle_popup(self.driver)
+        self.use(locators.FIND_STORE_LINK,
+                 lambda link: self.driver.execute_script("window.open(arguments[0].href, '_blank');", link),
+                 clickable=True)
+        switch_to_window(self.driver, self.driver.window_handles[-1])
+        logging.info("ACTION: Opened 'Find a store' page in a new tab")
+        wait_for_page_ready(self.driver, "find a store")
+        return StoreFinder.of(self.driver)
+
+
+class LoginModal(Page):
+    def enter_mobile_number(self, number):
+        self.type(locators.MOBILE_NUMBER, number)
+        logging.info(f"ACTION: Entered mobile number: {number}")
+        handle_popup(self.driver)
+
+    def proceed(self, step="OTP form"):
+        self.click(locators.PROCEED)
+        logging.info("ACTION: Clicked proceed button")
+        wait_for_page_ready(self.driver, step)
+        handle_popup(self.driver)
+
+    def otp_input(self):
+        self.highlight(locators.OTP_INPUT)
+        return self.element(locators.OTP_INPUT)
+
+    def submit(self):
+        self.click(locators.SUBMIT_LOGIN)
+        logging.info("ACTION: Clicked login button")
+        self.navigated("login")
+
+    def error_text(self):
+        return self.text(locators.LOGIN_ERROR)
+
+
+class SearchResults(Page):
+    def heading(self):
+        self.highlight(locators.SEARCH_HEADING)
+        return self.text(locators.SEARCH_HEADING)
+
+    def products(self):
+        """The visible product links, read in one call."""
+        rows = query_all(self.driver, *locators.PRODUCT_LINKS.primary, attributes=("href",))
+        return [row for row in rows if row["visible"]]
+
+    def prices(self):
+        """The listed product prices in page order."""
+        rows = query_all(self.driver, *locators.PRODUCT_PRICES.primary)
+        return [float(row["text"].replace('₹', '').replace(',', '')) for row in rows if row["text"]]
+
+    def sort_by_price_high_low(self):
+        handle_popup(self.driver)
+        self.click(locators.SORT_PRICE_HIGH_LOW)
+        logging.info("ACTION: Clicked 'Price (High-Low)' sorting option")
+        wait_for_page_ready(self.driver, "sort by price")
+
+    def open_product(self, product):
+        """Opens the product in a new window and switches to it."""
+        locator = locators.PRODUCT_LINK.format(product=product)
+        self.highlight(locator, clickable=True)
+        product_url = self.use(locator, lambda link: link.get_attribute("href"), clickable=True)
+        self.driver.execute_script("window.open(arguments[0], '_blank');", product_url)
+        logging.info("ACTION: Opened the specified product link in a new window")
+        switch_to_window(self.driver, self.driver.window_handles[-1])
+        logging.info("ACTION: Switched to the new window")
+        find(self.driver, locators.PAGE_BODY)
+        logging.info("ACTION: Verified product page loaded successfully")
+        return ProductPage.of(self.driver)
+
+    @property
+    def filters(self):
+        return FilterPanel.of(self.driver)
+
+
+class FilterPanel(Page):
+    def set_price_range(self, minimum, maximum):
+        handle_popup(self.driver)
+        self.type(locators.MIN_PRICE, minimum, clear=True)
+        logging.info(f"ACTION: Set minimum price to {minimum}")
+        self.type(locators.MAX_PRICE, maximum, clear=True)
+        logging.info(f"ACTION: Set maximum price to {maximum}")
+        self.click(locators.PRICE_GO)
+        logging.info("ACTION: Clicked 'Go' button to apply price filter")
+        wait_for_page_ready(self.driver, "price filter")
+
+    def choose_brand(self, brand):
+        self.click(locators.SEE_MORE_BRANDS)
+        logging.info("ACTION: Clicked 'See More' for brand options")
+        self.click(locators.BRAND.format(brand=brand))
+        logging.info(f"ACTION: Clicked '{brand}' brand div")
+        wait_for_page_ready(self.driver, "brand filter")
+
+    def choose_battery_capacity(self, capacity):
+        self.click(locators.BATTERY_SECTION)
+        logging.info("ACTION: Clicked to expand battery capacities filter")
+        self.click(locators.BATTERY_OPTION.format(capacity=capacity))
+        logging.info(f"ACTION: Clicked '{capacity}' battery capacity div")
+        wait_for_page_ready(self.driver, "battery filter")
+
+    def clear(self):
+        self.click(locators.CLEAR_FILTERS)
+        logging.info("ACTION: Clicked 'Clear All' to reset all filters")
+        wait_for_page_ready(self.driver, "clear filters")
+
+
+class ProductPage(Page):
+    def add_to_cart(self):
+        self.click(locators.ADD_TO_CART)
+        logging.info("ACTION: Clicked 'ADD TO CART' button")
+        wait_for_page_ready(self.driver, "add to cart")
+
+    def has_item_in_cart(self):
+        return self.is_present(locators.REMOVE_FROM_CART)
+
+    def remove_from_cart(self):
+        self.click(locators.REMOVE_FROM_CART)
+        logging.info("ACTION: Clicked 'Remove' button")
+        wait_for_page_ready(self.driver, "remove from cart")
+        self.click(locators.CONFIRM_REMOVE)
+        logging.info("ACTION: Clicked 'Yes' button to confirm removal")
+        wait_for_page_ready(self.driver, "confirm cart removal")
+
+    def add_to_wishlist(self):
+        handle_popup(self.driver)
+        self.click(locators.ADD_TO_WISHLIST)
+        logging.info("ACTION: Clicked 'Add to Wishlist' button")
+        wait_for_page_ready(self.driver, "wishlist modal")
+        self.click(locators.WISHLIST_SHOULD_BUY)
+        logging.info("ACTION: Clicked 'should_by' button")
+        wait_for_page_ready(self.driver, "wishlist choice")
+        self.click(locators.WISHLIST_CONFIRM)
+        logging.info("ACTION: Clicked final 'Add to Wishlist' button")
+        wait_for_page_ready(self.driver, "add to wishlist")
+
+
+class Wishlist(Page):
+    def titles(self):
+        return [row["text"] for row in query_all(self.driver, *locators.WISHLIST_TITLES.primary)]
+
+    def remove_first_item(self):
+        self.click(locators.WISHLIST_TITLES)
+        logging.info("ACTION: Clicked on the wishlist item")
+        self.click(locators.WISHLIST_DELETE)
+        logging.info("ACTION: Clicked on the delete icon")
+        self.click(locators.WISHLIST_CONFIRM_DELETE)
+        logging.info("ACTION: Confirmed the deletion")
+        wait_for_page_ready(self.driver, "wishlist update")
+
+    def empty_message(self):
+        return self.text(locators.WISHLIST_EMPTY)
+
+    def continue_shopping(self):
+        self.click(locators.CONTINUE_SHOPPING)
+        logging.info("ACTION: Clicked on Continue Shopping")
+        self.navigated("continue shopping")
+
+
+class MyCredits(Page):
+    def balance(self):
+        self.highlight(locators.CREDIT_BALANCE)
+        return self.text(locators.CREDIT_BALANCE).strip()
+
+
+class AddressBook(Page):
+    def open_form(self):
+        self.click(locators.ADD_ADDRESS)
+        logging.info("ACTION: Clicked on 'Add New Shipping Address' button")
+        wait_for_page_ready(self.driver, "address form")
+
+    def form_title_displayed(self):
+        self.highlight(locators.NEW_ADDRESS_TITLE)
+        return self.use(locators.NEW_ADDRESS_TITLE, lambda element: element.is_displayed())
+
+    def submit_form(self):
+        self.click(locators.SUBMIT_ADDRESS)
+        logging.info("ACTION: Clicked 'Submit' button")
+        wait_for_page_ready(self.driver, "save address")
+
+    def address_text(self):
+        self.highlight(locators.ADDRESS_CARD)
+        return self.text(locators.ADDRESS_CARD)
+
+    def delete_address(self):
+        self.click(locators.DELETE_ADDRESS)
+        logging.info("ACTION: Clicked 'Delete' button for the address")
+        wait_for_page_ready(self.driver, "delete address dialog")
+        self.click(locators.CONFIRM_DELETE_ADDRESS)
+        logging.info("ACTION: Clicked 'Yes' button to confirm deletion")
+        wait_for_page_ready(self.driver, "delete address")
+        self.invalidate()  # The address card is gone or shows another address
+
+    def logout(self):
+        self.click(locators.LOGOUT)
+        logging.info("ACTION: Clicked 'Logout' button")
+        self.navigated("logout")
+
+
+class StoreFinder(Page):
+    def search(self, pin_code, place):
+        self.type(locators.STORE_SEARCH, pin_code)
+        logging.info(f"ACTION: Entered pin code: {pin_code}")
+        self.click(locators.STORE_SUGGESTION.format(place=place))
+        logging.info("ACTION: Clicked on the search result")
+        wait_for_page_ready(self.driver, "store search")
+
+    def store_details(self, store):
+        return self.text(locators.STORE_NAME.format(store=store))
@@ -0,0 +1,72 @@
+"""Dismisses overlay popups inside the page instead of polling for them from the test.
+
+A MutationObserver is registered in every new document through the CDP
+command Page.addScriptToEvaluateOnNewDocument. It clicks any visible
+element matching POPUP_SELECTORS (the CleverTap "wzrk-cancel" button by
+default) as soon as it is added to the page. Each dismissal is kept in
+sessionStorage so collect_dismissals can report what was closed.
+"""
+import json
+import logging
+
+from .config import POPUP_SELECTORS
+
+AUTO_DISMISS_SCRIPT = """
+(function (selectors) {
+    if (window.__popupAutoDismiss) { return; }
+    window.__popupAutoDismiss = true;
+    var KEY = '__popupDismissals';
+    function record(selector) {
+        try {
+            var log = JSON.parse(window.sessionStorage.getItem(KEY) || '[]');
+            log.push({selector: selector, url: location.href, time: Date.now()});
+            window.sessionStorage.setItem(KEY, JSON.stringify(log));
+        } catch (e) {}  // No storage on about:blank and sandboxed frames
+    }
+    function dismiss() {
+        selectors.forEach(function (selector) {
+            document.querySelectorAll(selector).forEach(function (element) {
+                if (element.offsetParent !== null || element.getClientRects().length) {
+                    element.click();
+                    record(selector);
+                }
+            });
+        });
+    }
+    var scheduled = false;
+    new MutationObserver(function () {
+        if (scheduled) { return; }
+        scheduled = true;
+        setTimeout(function () { scheduled = false; dismiss(); }, 0);
+    }).observe(document, {childList: true, subtree: true, attributes: true, attributeFilter: ['style', 'class']});
+    dismiss();
+})(%s);
+"""
+
+COLLECT_DISMISSALS = """
+try {
+    var log = JSON.parse(window.sessionStorage.getItem('__popupDismissals') || '[]');
+    window.sessionStorage.removeItem('__popupDismissals');
+    return log;
+} catch (e) { return []; }
+"""
+
+
+def enable_popup_auto_dismiss(driver, selectors=POPUP_SELECTORS):
+    """Installs the auto-dismiss observer for every future document of the current tab and the current one."""
+    source = AUTO_DISMISS_SCRIPT % json.dumps(selectors)
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": source})
+    driver.execute_script(source)
+    driver.auto_dismiss = True
+
+def collect_dismissals(driver):
+    """Returns and clears the popups dismissed in the current tab since the last call."""
+    return driver.execute_script(COLLECT_DISMISSALS) or []
+
+def log_dismissals(name, dismissals):
+    counts = {}
+    for dismissal in dismissals:
+        counts[dismissal["selector"]] = counts.get(dismissal["selector"], 0) + 1
+    for selector, count in counts.items():
+        logging.info(f"POPUP: {name}: dismissed {selector} {count} time(s)")
+    return counts
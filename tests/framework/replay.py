@@ -0,0 +1,230 @@
+"""Record-and-replay stand-in for the target site.
+
+SITE_MODE (or --site-mode) decides where the browser's traffic goes:
+
+* live   - straight to the real site, as before
+* record - through a local proxy that forwards to the real site and saves
+           every exchange to an archive in REPLAY_DIR
+* replay - through a local proxy that answers from that archive and never
+           touches the network, so runs are fast and repeatable offline
+
+The proxy terminates TLS itself with a throwaway self-signed certificate,
+which is why the browser is started with --ignore-certificate-errors in
+the record and replay modes.
+
+Requests are matched on method, URL and a hash of the request body, then
+on method and URL, then on method, host and path so that cache busting
+query strings still find their response. When the same request was
+recorded more than once the recordings are replayed in order, which keeps
+flows like "add to cart, then look at the cart" consistent.
+"""
+import base64
+import datetime
+import glob
+import gzip
+import hashlib
+import http.client
+import json
+import logging
+import os
+import ssl
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+
+from .config import REPLAY_DIR
+
+MODES = ("live", "record", "replay")
+
+# Headers that only describe one hop and must not be forwarded or replayed
+HOP_BY_HOP = {"connection", "keep-alive", "proxy-connection", "proxy-authorization", "proxy-authenticate",
+              "te", "trailer", "transfer-encoding", "upgrade", "content-length"}
+
+
+def _self_signed_context():
+    """Returns a server side SSL context with a certificate generated for this run."""
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "replay.localhost")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    certificate = (x509.CertificateBuilder().subject_name(name).issuer_name(name)
+                   .public_key(key.public_key()).serial_number(x509.random_serial_number())
+                   .not_valid_before(now - datetime.timedelta(days=1))
+                   .not_valid_after(now + datetime.timedelta(days=7))
+                   .sign(key, hashes.SHA256()))
+    with tempfile.TemporaryDirectory() as directory:
+        cert_file = os.path.join(directory, "cert.pem")
+        key_file = os.path.join(directory, "key.pem")
+        with open(cert_file, "wb") as file:
+            file.write(certificate.public_bytes(serialization.Encoding.PEM))
+        with open(key_file, "wb") as file:
+            file.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                         serialization.NoEncryption()))
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.load_cert_chain(cert_file, key_file)
+    return context
+
+def _keys(method, url, body):
+    """Lookup keys for a request, from the most to the least specific."""
+    parts = urlsplit(url)
+    return [
+        (method, url, hashlib.sha1(body or b"").hexdigest()),
+        (method, url),
+        (method, parts.netloc, parts.path),
+    ]
+
+
+class Archive:
+    """The recorded exchanges of one or more runs, stored as gzipped JSON lines."""
+
+    def __init__(self, directory=REPLAY_DIR):
+        self.directory = directory
+        self.exchanges = []
+        self.index = {}
+        self.served = {}
+        self.lock = threading.Lock()
+
+    def add(self, exchange):
+        with self.lock:
+            self.exchanges.append(exchange)
+            for key in _keys(exchange["method"], exchange["url"], base64.b64decode(exchange["request_body"])):
+                self.index.setdefault(key, []).append(exchange)
+
+    def lookup(self, method, url, body):
+        with self.lock:
+            for key in _keys(method, url, body):
+                recorded = self.index.get(key)
+                if recorded:
+                    # Replay repeated requests in the order they were recorded, then keep serving the last one
+                    count = self.served.get(key, 0)
+                    self.served[key] = count + 1
+                    return recorded[min(count, len(recorded) - 1)]
+        return None
+
+    def load(self):
+        files = sorted(glob.glob(os.path.join(self.directory, "*.jsonl.gz")))
+        if not files:
+            raise SystemExit(f"No recordings found in {self.directory}, run once with --site-mode record first")
+        for path in files:
+            with gzip.open(path, "rt", encoding="utf-8") as file:
+                for line in file:
+                    self.add(json.loads(line))
+        logging.info(f"REPLAY: Loaded {len(self.exchanges)} exchanges from {len(files)} archive(s)")
+
+    def save(self, name):
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{name}.jsonl.gz")
+        with self.lock, gzip.open(path, "wt", encoding="utf-8") as file:
+            for exchange in self.exchanges:
+                file.write(json.dumps(exchange) + "\n")
+        logging.info(f"RECORD: Saved {len(self.exchanges)} exchanges to {path}")
+        return path
+
+
+class _ProxyHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    tunnel = None  # host:port of the CONNECT tunnel this connection was switched to
+
+    def do_CONNECT(self):
+        self.send_response(200, "Connection Established")
+        self.end_headers()
+        self.tunnel = self.path
+        # Keep reading requests on this connection, decrypted this time
+        self.connection = self.server.ssl_context.wrap_socket(self.connection, server_side=True)
+        self.rfile = self.connection.makefile("rb", self.rbufsize)
+        self.wfile = self.connection.makefile("wb")
+        self.close_connection = False
+
+    def _url(self):
+        if self.tunnel is None:
+            return self.path  # Plain HTTP proxy requests carry the absolute URL
+        host, _, port = self.tunnel.partition(":")
+        return f"https://{host}{'' if port in ('', '443') else ':' + port}{self.path}"
+
+    def _handle(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0) or 0))
+        url = self._url()
+        if self.server.mode == "record":
+            exchange = self._forward(url, body)
+            self.server.archive.add(exchange)
+        else:
+            exchange = self.server.archive.lookup(self.command, url, body)
+            if exchange is None:
+                self.server.misses += 1
+                logging.warning(f"REPLAY: No recording for {self.command} {url}")
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            self.server.hits += 1
+        response_body = base64.b64decode(exchange["response_body"])
+        self.send_response(exchange["status"])
+        for name, value in exchange["response_headers"]:
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(response_body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(response_body)
+
+    def _forward(self, url, body):
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connection = connection_class(parts.netloc, timeout=30)
+        headers = {name: value for name, value in self.headers.items() if name.lower() not in HOP_BY_HOP}
+        try:
+            connection.request(self.command, parts.path + (f"?{parts.query}" if parts.query else "") or "/",
+                               body=body or None, headers=headers)
+            response = connection.getresponse()
+            response_body = response.read()
+        finally:
+            connection.close()
+        return {
+            "method": self.command,
+            "url": url,
+            "request_body": base64.b64encode(body).decode(),
+            "status": response.status,
+            "response_headers": [(name, value) for name, value in response.getheaders() if name.lower() not in HOP_BY_HOP],
+            "response_body": base64.b64encode(response_body).decode(),
+        }
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = do_OPTIONS = _handle
+
+    def log_message(self, format, *args):
+        logging.debug("PROXY: " + format, *args)
+
+
+class SiteProxy:
+    """Local proxy that records the live site or replays a recording of it."""
+
+    def __init__(self, mode, directory=REPLAY_DIR, host="127.0.0.1", port=0):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"SiteProxy only handles record and replay, not {mode}")
+        self.server = ThreadingHTTPServer((host, port), _ProxyHandler)
+        self.server.daemon_threads = True
+        self.server.mode = mode
+        self.server.ssl_context = _self_signed_context()
+        self.server.archive = Archive(directory)
+        self.server.hits = 0
+        self.server.misses = 0
+        if mode == "replay":
+            self.server.archive.load()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        logging.info(f"PROXY: {mode} proxy listening on {self.address}")
+
+    @property
+    def address(self):
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.server.mode == "record":
+            self.server.archive.save(os.getenv('PYTEST_XDIST_WORKER', 'main'))
+        else:
+            logging.info(f"REPLAY: {self.server.hits} requests served, {self.server.misses} missing from the archive")
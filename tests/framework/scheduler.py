@@ -0,0 +1,161 @@
+"""Orders and selects tests from their durations and failure rates in the run history.
+
+Longest first: the tests are sorted by their median duration over the last
+SCHEDULER["history_days"], longest first, so pytest-xdist hands the long
+ones out early and the short ones fill the gaps at the end. Tests of one
+xdist_group stay together in their file order and count as one block of
+their summed duration, because loadgroup sends them to the same worker.
+
+Budget: --budget SECONDS keeps the most valuable tests whose expected
+durations fit into the budget on every worker, and deselects the rest. A
+test is worth 1 plus SCHEDULER["failure_weight"] times its failure rate, so
+tests that fail more often are picked first. An xdist_group is picked or
+dropped as a whole and must fit into the budget of the one worker it runs
+on, and the picked blocks must still fit when they are handed out longest
+first to the least loaded worker. Tests without history count as
+SCHEDULER["default_duration"] seconds and as failing half the time, which
+gets new tests picked up early.
+
+    python -m tests.framework.scheduler
+    python -m tests.framework.scheduler --budget 180 --workers 2
+
+prints the plan for the tests in the history.
+
+Shards: --shard K/N splits the tests into N shards of about equal expected
+duration and runs shard K (1-based), for spreading one run over N machines
+or grid nodes. Every shard keeps its xdist_groups whole.
+"""
+import argparse
+import os
+import statistics
+import time
+
+from .config import HISTORY_DB, SCHEDULER
+from .history import connect
+
+HISTORY_DAYS = SCHEDULER.get("history_days", 30)
+DEFAULT_DURATION = SCHEDULER.get("default_duration", 30)  # seconds, for tests without history
+FAILURE_WEIGHT = SCHEDULER.get("failure_weight", 4)
+RESOLUTION = 0.5  # seconds per step of the budget selection
+ORDERS = ("duration", "file")
+
+
+def scenario_stats(connection, days=HISTORY_DAYS):
+    """{test name: {"duration": median seconds, "failure_rate": ..., "runs": ...}} of the passed and failed runs."""
+    samples = {}
+    for name, outcome, duration in connection.execute(
+            "SELECT name, outcome, duration FROM tests WHERE started_at >= ? AND outcome IN ('passed', 'failed')",
+            (time.time() - days * 86400,)):
+        samples.setdefault(name, []).append((outcome, duration))
+    return {name: {"duration": statistics.median(duration for _, duration in runs),
+                   "failure_rate": sum(outcome == "failed" for outcome, _ in runs) / len(runs),
+                   "runs": len(runs)}
+            for name, runs in samples.items()}
+
+def load_stats(path=HISTORY_DB, days=HISTORY_DAYS):
+    """scenario_stats of the history at path; empty, without creating the database, when there is none yet."""
+    if not os.path.exists(path):
+        return {}
+    connection = connect(path)
+    try:
+        return scenario_stats(connection, days)
+    finally:
+        connection.close()
+
+def expected(stats, name):
+    """(expected seconds, value) of one test."""
+    test = stats.get(name)
+    if test is None:
+        return DEFAULT_DURATION, 1 + FAILURE_WEIGHT * 0.5
+    return test["duration"], 1 + FAILURE_WEIGHT * test["failure_rate"]
+
+def _group(item):
+    marker = item.get_closest_marker("xdist_group")
+    return marker.args[0] if marker and marker.args else None
+
+def blocks(items):
+    """items in blocks that run on one worker: each xdist_group in file order, every other test on its own."""
+    grouped = {}
+    for item in items:
+        grouped.setdefault(_group(item) or item.nodeid, []).append(item)
+    return list(grouped.values())
+
+def longest_first(items, stats):
+    """items reordered longest first, keeping each xdist_group together in file order."""
+    ordered = sorted(blocks(items), key=lambda block: sum(expected(stats, item.nodeid)[0] for item in block),
+                     reverse=True)
+    return [item for block in ordered for item in block]
+
+def shards(items, stats, count):
+    """Splits items into count lists of about equal expected duration, longest blocks first onto the least loaded."""
+    loads = [[0.0, []] for _ in range(count)]
+    for block in sorted(blocks(items), key=lambda block: sum(expected(stats, item.nodeid)[0] for item in block),
+                        reverse=True):
+        lightest = min(loads, key=lambda load: load[0])
+        lightest[0] += sum(expected(stats, item.nodeid)[0] for item in block)
+        lightest[1].extend(block)
+    return [sorted(chosen, key=items.index) for _, chosen in loads]
+
+def _spread(durations, workers):
+    """Load of every worker when the durations are handed out longest first to the least loaded one."""
+    loads = [0.0] * workers
+    for duration in sorted(durations, reverse=True):
+        loads[loads.index(min(loads))] += duration
+    return loads
+
+def select_within_budget(blocks, stats, budget, workers=1):
+    """The names in the most valuable blocks that fit into budget seconds on each of workers.
+
+    blocks are lists of names that run on one worker (see blocks). A 0/1
+    knapsack picks blocks up to budget * workers; while the picked blocks do
+    not spread over the workers within the budget, the one worth the least
+    per second is dropped.
+    """
+    costs = [(block, sum(expected(stats, name)[0] for name in block), sum(expected(stats, name)[1] for name in block))
+             for block in blocks]
+    capacity = int(budget * workers / RESOLUTION)
+    best = {0: (0.0, [])}  # used capacity -> (value, chosen blocks)
+    for block, duration, value in costs:
+        if duration > budget:
+            continue  # Longer than the budget of the one worker it would run on
+        cost = max(int(round(duration / RESOLUTION)), 1)
+        for used, (total, chosen) in sorted(best.items(), reverse=True):
+            if used + cost <= capacity and best.get(used + cost, (-1, None))[0] < total + value:
+                best[used + cost] = (total + value, chosen + [(block, duration, value)])
+    chosen = max(best.values(), key=lambda entry: entry[0])[1]
+    while chosen and max(_spread([duration for _, duration, _ in chosen], workers)) > budget:
+        chosen.remove(min(chosen, key=lambda entry: entry[2] / entry[1]))
+    return {name for block, _, _ in chosen for name in block}
+
+def plan(names, stats, budget=None, workers=1):
+    """Rows (name, expected seconds, failure rate, value, selected) in longest-first order."""
+    selected = select_within_budget([[name] for name in names], stats, budget, workers) if budget else set(names)
+    rows = []
+    for name in names:
+        duration, value = expected(stats, name)
+        failure_rate = stats[name]["failure_rate"] if name in stats else None
+        rows.append((name, duration, failure_rate, value, name in selected))
+    return sorted(rows, key=lambda row: row[1], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m tests.framework.scheduler",
+                                     description="Show the longest-first order and the budget selection from the run history.")
+    parser.add_argument("--db", default=HISTORY_DB)
+    parser.add_argument("--days", type=int, default=HISTORY_DAYS)
+    parser.add_argument("--budget", type=float, help="wall-clock seconds per worker")
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args(argv)
+    stats = load_stats(args.db, args.days)
+    rows = plan(sorted(stats), stats, args.budget, args.workers)
+    print(f"{'expected (s)':>13}{'failures':>10}{'value':>7}  test")
+    for name, duration, failure_rate, value, selected in rows:
+        rate = f"{failure_rate:.0%}" if failure_rate is not None else "-"
+        print(f"{duration:>13.1f}{rate:>10}{value:>7.2f}  {'' if selected else '(skipped) '}{name}")
+    chosen = [row for row in rows if row[4]]
+    print(f"{len(chosen)} of {len(rows)} tests, {sum(row[1] for row in chosen):.0f}s expected"
+          + (f" for a budget of {args.budget:.0f}s on {args.workers} workers" if args.budget else ""))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""Encrypted on-disk store for an authenticated browser session.
+
+After one successful OTP login the cookies, localStorage and sessionStorage
+are written to SESSION_FILE, encrypted with Fernet. Any driver (including
+the other pytest-xdist workers) can rehydrate from that file instead of
+going through the OTP flow again until the session expires.
+"""
+import json
+import logging
+import os
+import time
+from cryptography.fernet import Fernet, InvalidToken
+
+from .config import URL, SESSION_FILE, SESSION_TTL
+
+# The key comes from SESSION_KEY when set (e.g. in CI), otherwise from a key file kept next to the store
+KEY_FILE = SESSION_FILE + ".key"
+
+DUMP_STORAGE = """
+function dump(storage) {
+    var items = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        items[key] = storage.getItem(key);
+    }
+    return items;
+}
+return {localStorage: dump(window.localStorage), sessionStorage: dump(window.sessionStorage)};
+"""
+
+LOAD_STORAGE = """
+var data = arguments[0];
+Object.keys(data.localStorage).forEach(function (key) { window.localStorage.setItem(key, data.localStorage[key]); });
+Object.keys(data.sessionStorage).forEach(function (key) { window.sessionStorage.setItem(key, data.sessionStorage[key]); });
+"""
+
+
+def cipher():
+    """The Fernet cipher for the files that hold session data: SESSION_KEY, or a key file made on first use."""
+    key = os.getenv('SESSION_KEY')
+    if not key:
+        if not os.path.exists(KEY_FILE):
+            os.makedirs(os.path.dirname(KEY_FILE) or ".", exist_ok=True)
+            with open(KEY_FILE, "wb") as file:
+                file.write(Fernet.generate_key())
+            os.chmod(KEY_FILE, 0o600)
+        with open(KEY_FILE, "rb") as file:
+            key = file.read()
+    return Fernet(key)
+
+def save_session(driver, ttl=SESSION_TTL):
+    """Saves the current browser session so later drivers can skip the login."""
+    now = time.time()
+    session = {
+        "origin": URL,
+        "saved_at": now,
+        "expires_at": now + ttl,
+        "cookies": driver.get_cookies(),
+        **driver.execute_script(DUMP_STORAGE),
+    }
+    token = cipher().encrypt(json.dumps(session).encode())
+    # Write then rename so a worker never reads a half written file
+    os.makedirs(os.path.dirname(SESSION_FILE) or ".", exist_ok=True)
+    tmp_file = f"{SESSION_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, "wb") as file:
+        file.write(token)
+    os.replace(tmp_file, SESSION_FILE)
+    logging.info(f"SESSION: Saved session to {SESSION_FILE}, valid for {ttl}s")
+
+def load_session():
+    """Returns the stored session, or None when it is missing, unreadable or stale."""
+    try:
+        with open(SESSION_FILE, "rb") as file:
+            session = json.loads(cipher().decrypt(file.read()))
+    except FileNotFoundError:
+        return None
+    except (InvalidToken, ValueError) as e:
+        logging.warning(f"SESSION: Ignoring unreadable session file {SESSION_FILE}: {e!r}")
+        return None
+    if session.get("origin") != URL or session.get("expires_at", 0) <= time.time():
+        logging.info("SESSION: Stored session is stale")
+        return None
+    return session
+
+def clear_session():
+    if os.path.exists(SESSION_FILE):
+        os.remove(SESSION_FILE)
+        logging.info(f"SESSION: Removed {SESSION_FILE}")
+
+def restore_session(driver):
+    """Loads the stored session into the driver. Returns False when there is nothing to restore.
+
+    The caller is expected to check that the restored session is still
+    accepted by the site, since it can be revoked before it expires.
+    """
+    session = load_session()
+    if session is None:
+        return False
+    start = time.monotonic()
+    # Cookies and storage can only be set for the origin that is currently open
+    if not driver.current_url.startswith(URL):
+        driver.get(URL)
+    for cookie in session["cookies"]:
+        if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+            cookie.pop("sameSite", None)  # add_cookie rejects any other value
+        driver.add_cookie(cookie)
+    driver.execute_script(LOAD_STORAGE, session)
+    driver.refresh()
+    logging.info(f"SESSION: Restored session in {time.monotonic() - start:.2f}s")
+    return True
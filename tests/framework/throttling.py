@@ -0,0 +1,53 @@
+"""Named network and CPU profiles for running the flows like a slower user would.
+
+A profile is applied to a tab with the CDP commands
+Network.emulateNetworkConditions and Emulation.setCPUThrottlingRate:
+
+    "slow-4G": {"latency": 150, "download_kbps": 1600, "upload_kbps": 750, "cpu_slowdown": 1}
+
+latency is in milliseconds, the throughputs in kilobits per second and
+cpu_slowdown is the factor the CPU is slowed down by. "none" turns
+throttling off. The profiles live under THROTTLING_PROFILES in config.json;
+THROTTLING (or --throttling) picks the one for the run and
+@pytest.mark.throttling("3G") the one for a single test.
+"""
+import logging
+
+from . import instrumentation
+from .config import THROTTLING, THROTTLING_PROFILES
+
+NO_THROTTLING = "none"
+
+PROFILES = {NO_THROTTLING: {}, **THROTTLING_PROFILES}
+
+
+def apply_throttling(driver, name):
+    """Applies the profile to the current tab and remembers it for the tabs opened later."""
+    if name not in PROFILES:
+        raise ValueError(f"Unknown throttling profile: {name}")
+    profile = PROFILES[name]
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.emulateNetworkConditions", {
+        "offline": False,
+        "latency": profile.get("latency", 0),
+        # CDP wants bytes per second, -1 disables the limit
+        "downloadThroughput": profile["download_kbps"] * 1000 / 8 if "download_kbps" in profile else -1,
+        "uploadThroughput": profile["upload_kbps"] * 1000 / 8 if "upload_kbps" in profile else -1,
+    })
+    driver.execute_cdp_cmd("Emulation.setCPUThrottlingRate", {"rate": profile.get("cpu_slowdown", 1)})
+    if getattr(driver, "throttling", NO_THROTTLING) != name:
+        logging.info(f"THROTTLING: Using the {name} profile")
+    driver.throttling = name
+
+def enable_throttling(driver):
+    """Per-tab setup: gives a new tab the same profile as the rest of the session."""
+    name = getattr(driver, "throttling", THROTTLING)
+    if name != NO_THROTTLING:
+        apply_throttling(driver, name)
+    driver.throttling = name
+
+def use_throttling(driver, name):
+    """Switches the current tab to the profile, if it is not using it already, and tags the running test with it."""
+    if getattr(driver, "throttling", NO_THROTTLING) != name:
+        apply_throttling(driver, name)
+    instrumentation.tag("throttling", name)
@@ -0,0 +1,143 @@
+"""Front-end performance metrics for every page the suite visits.
+
+A PerformanceObserver is registered in every new document through the CDP
+command Page.addScriptToEvaluateOnNewDocument (like the popup observer).
+It keeps the Largest Contentful Paint, the Cumulative Layout Shift (the
+plain sum of shifts without recent input) and the long tasks. Each time
+wait_for_page_ready sees the page settle, the metrics are read together
+with Navigation Timing and Paint Timing and recorded under the name of
+that step, e.g. "search results".
+
+PERF_BUDGETS in config.json sets limits per step name, with "*" applying
+to every step and "<step> [<profile>]" to a step under a throttling
+profile. Times are in milliseconds, CLS is unitless:
+
+    "PERF_BUDGETS": {"*": {"cls": 0.25}, "search results": {"lcp": 4000},
+                     "search results [slow-4G]": {"lcp": 8000}}
+
+Budget violations are logged, shown in the report and, when
+PERF_BUDGET_ENFORCE is true, fail the test.
+"""
+import html
+import json
+import logging
+import os
+from selenium.common.exceptions import WebDriverException
+
+from . import instrumentation
+from .config import PERF_BUDGETS, REPORT_DIR
+
+METRICS = ("ttfb", "first_paint", "fcp", "dom_content_loaded", "load", "lcp", "cls", "long_tasks",
+           "total_blocking_time", "transfer_size")
+
+OBSERVER_SCRIPT = """
+(function () {
+    if (window.__webVitals) { return; }
+    var vitals = window.__webVitals = {lcp: null, cls: 0, longTasks: 0, blockingTime: 0};
+    function observe(type, callback) {
+        try {
+            new PerformanceObserver(function (list) { list.getEntries().forEach(callback); })
+                .observe({type: type, buffered: true});
+        } catch (e) {}  // Entry type not supported by this browser
+    }
+    observe('largest-contentful-paint', function (entry) { vitals.lcp = entry.startTime; });
+    observe('layout-shift', function (entry) { if (!entry.hadRecentInput) { vitals.cls += entry.value; } });
+    observe('longtask', function (entry) {
+        vitals.longTasks++;
+        vitals.blockingTime += Math.max(0, entry.duration - 50);
+    });
+})();
+"""
+
+COLLECT_METRICS = OBSERVER_SCRIPT + """
+var navigation = performance.getEntriesByType('navigation')[0] || {};
+var paint = {};
+performance.getEntriesByType('paint').forEach(function (entry) { paint[entry.name] = entry.startTime; });
+var vitals = window.__webVitals;
+return {
+    url: location.href,
+    ttfb: navigation.responseStart,
+    first_paint: paint['first-paint'],
+    fcp: paint['first-contentful-paint'],
+    dom_content_loaded: navigation.domContentLoadedEventEnd,
+    load: navigation.loadEventEnd,
+    lcp: vitals.lcp,
+    cls: vitals.cls,
+    long_tasks: vitals.longTasks,
+    total_blocking_time: vitals.blockingTime,
+    transfer_size: navigation.transferSize
+};
+"""
+
+# Every sample recorded in this process: {"test", "step", "url", "violations", **metrics}
+samples = []
+
+
+def enable_web_vitals(driver):
+    """Installs the observer for every future document of the current tab and the current one."""
+    driver.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": OBSERVER_SCRIPT})
+    driver.execute_script(OBSERVER_SCRIPT)
+    driver.web_vitals = True
+
+def check_budgets(step, metrics, budgets=PERF_BUDGETS, throttling="none"):
+    """Returns one readable line for every metric of the step that is over its budget.
+
+    A budget for "<step> [<throttling profile>]" takes precedence over the one for the step.
+    """
+    limits = {**budgets.get("*", {}), **budgets.get(step, {}), **budgets.get(f"{step} [{throttling}]", {})}
+    return [f"{step}: {name} {metrics[name]:g} over budget {limit:g}"
+            for name, limit in limits.items() if metrics.get(name) is not None and metrics[name] > limit]
+
+def record(driver, step):
+    """Reads the metrics of the current page and records them under step."""
+    try:
+        metrics = driver.execute_script(COLLECT_METRICS)
+    except WebDriverException as e:
+        logging.warning(f"VITALS: Could not read the metrics of {step}: {e.msg}")
+        return None
+    if not metrics:
+        return None
+    sample = {"test": instrumentation.current_test(), "step": step, "url": metrics.pop("url"),
+              "throttling": getattr(driver, "throttling", "none")}
+    sample.update({name: round(value, 3) if isinstance(value, float) else value for name, value in metrics.items()})
+    sample["violations"] = check_budgets(step, sample, throttling=sample["throttling"])
+    samples.append(sample)
+    logging.info(f"VITALS: {step} ({sample['throttling']}): TTFB {sample['ttfb']} ms, FCP {sample['fcp']} ms, LCP {sample['lcp']} ms, "
+                 f"CLS {sample['cls']}, {sample['long_tasks']} long tasks ({sample['total_blocking_time']} ms blocking)")
+    for violation in sample["violations"]:
+        logging.warning(f"BUDGET: {violation}")
+    return sample
+
+def samples_for(test):
+    return [sample for sample in samples if sample["test"] == test]
+
+def write_report(path=None):
+    """Writes every sample of this process as JSON, with the worst value of each metric per step and
+    throttling profile, and returns the path."""
+    if path is None:
+        worker = os.getenv('PYTEST_XDIST_WORKER')
+        path = os.path.join(REPORT_DIR, f"web_vitals_{worker}.json" if worker else "web_vitals.json")
+    pages = {}
+    for sample in samples:
+        key = sample["step"] if sample["throttling"] == "none" else f"{sample['step']} [{sample['throttling']}]"
+        page = pages.setdefault(key, {"step": sample["step"], "throttling": sample["throttling"], "samples": 0})
+        page["samples"] += 1
+        for name in METRICS:
+            if sample.get(name) is not None:
+                page[name] = max(page.get(name, sample[name]), sample[name])
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as file:
+        json.dump({"budgets": PERF_BUDGETS, "pages": pages, "samples": samples}, file, indent=2)
+    return path
+
+def html_summary(test_samples):
+    """Renders the samples of one test as an HTML table for the pytest-html report."""
+    def cell(value):
+        return "" if value is None else f"{value:g}"
+    rows = "".join(
+        f"<tr><td>{html.escape(sample['step'])}</td><td>{html.escape(sample['throttling'])}</td>"
+        + "".join(f"<td>{cell(sample.get(name))}</td>" for name in METRICS)
+        + f"<td>{html.escape('; '.join(sample['violations']))}</td></tr>"
+        for sample in test_samples)
+    head = "".join(f"<th>{name}</th>" for name in METRICS)
+    return f"<table><tr><th>Page</th><th>Throttling</th>{head}<th>Over budget</th></tr>{rows}</table>"
@@ -0,0 +1,30 @@
+"""Unit tests of the framework's pure-Python logic. They never start a browser.
+
+The suite's conftest one directory up makes every test time itself and
+depend on a pooled browser through its autouse fixtures. The fixtures below
+replace those of the same name for the tests in this directory.
+
+    python -m pytest tests/unit
+"""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def step_timings():
+    pass
+
+@pytest.fixture(autouse=True)
+def throttling():
+    pass
+
+@pytest.fixture(autouse=True)
+def network_report():
+    pass
+
+@pytest.fixture(autouse=True)
+def popup_report():
+    pass
+
+@pytest.fixture(autouse=True)
+def web_vitals_report():
+    pass
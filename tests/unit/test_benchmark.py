@@ -0,0 +1,35 @@
+from framework.benchmark import compare, percentile
+
+
+def report(p50=1.0, commands=100, wall=10.0, throttling="none"):
+    return {"throttling": throttling, "wall": wall, "flows": {"search results": {"p50": p50, "commands": commands}}}
+
+
+def test_percentile_is_nearest_rank():
+    values = [5, 1, 4, 2, 3]
+    assert percentile(values, 0.5) == 3
+    assert percentile(values, 0.9) == 5
+    assert percentile(values, 0.0) == 1
+    assert percentile([7], 0.95) == 7
+
+def test_compare_passes_within_the_threshold():
+    assert compare(report(p50=1.15, commands=115, wall=11.5), report(), threshold=0.2) == []
+
+def test_compare_flags_a_slower_flow():
+    assert compare(report(p50=1.3), report(), threshold=0.2) == ["search results: p50 1.300s, baseline 1.000s"]
+
+def test_compare_allows_command_counts_to_vary_within_the_threshold():
+    assert compare(report(commands=119), report(), threshold=0.2) == []
+    assert compare(report(commands=121), report(), threshold=0.2) == \
+        ["search results: 121 WebDriver commands, baseline 100"]
+
+def test_compare_flags_a_slower_run():
+    assert compare(report(wall=13.0), report(), threshold=0.2) == ["wall time 13.00s, baseline 10.00s"]
+
+def test_compare_ignores_flows_missing_from_the_baseline():
+    baseline = report()
+    baseline["flows"] = {}
+    assert compare(report(p50=5.0), baseline) == []
+
+def test_compare_refuses_a_baseline_from_other_throttling():
+    assert len(compare(report(), report(throttling="3G"))) == 1
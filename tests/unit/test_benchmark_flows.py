@@ -0,0 +1,79 @@
+import pytest
+from selenium.webdriver.remote.webelement import WebElement
+
+from framework import benchmark, flows, helpers, instrumentation, otp
+
+
+PRODUCTS = 3
+
+
+class FakeElement(WebElement):
+    """An element that is always there, visible and takes any input."""
+
+    def __init__(self, driver):
+        super().__init__(driver, "element")
+        self.value = ""
+
+    @property
+    def text(self):
+        return ""
+
+    def is_displayed(self):
+        return True
+
+    def is_enabled(self):
+        return True
+
+    def click(self):
+        pass
+
+    def clear(self):
+        self.value = ""
+
+    def send_keys(self, *keys):
+        self.value += "".join(key for key in keys if key.isdigit())
+
+    def get_attribute(self, name):
+        return self.value if name == "value" else ""
+
+
+class FakeDriver:
+    """Answers the helpers the way a settled fixture page would."""
+
+    auto_dismiss = True
+    current_window_handle = "main"
+    window_handles = ["main"]
+
+    def __init__(self):
+        self.current_url = "about:blank"
+
+    def get(self, url):
+        self.current_url = url
+
+    def find_element(self, by, value):
+        return FakeElement(self)
+
+    def find_elements(self, by, value):
+        return [FakeElement(self)]
+
+    def execute_script(self, script, *args):
+        if script == helpers.READINESS_PROBE:
+            return {"readyState": "complete", "pending": 0, "idle": 1000}
+        if script == helpers.QUERY_ALL:
+            return [{"text": "₹12,000", "visible": True} for _ in range(PRODUCTS)]
+        if script == helpers.FILL_FORM:
+            return []
+        return None
+
+
+@pytest.fixture(autouse=True)
+def quick(monkeypatch):
+    """No highlight pauses, and a login code without asking."""
+    monkeypatch.setattr(instrumentation, "sleep", lambda seconds: None)
+    monkeypatch.setattr(otp, "_provider", otp.ConfigOtpProvider("123456"))
+
+
+@pytest.mark.parametrize("name", benchmark.FLOWS)
+def test_flow_runs_against_the_fixture_markup(name):
+    site = type("Site", (), {"url": "http://127.0.0.1/"})()
+    benchmark.FLOWS[name](FakeDriver(), site, PRODUCTS)
@@ -0,0 +1,46 @@
+import pytest
+
+from framework.browser_pool import LAUNCH_RETRIES, BrowserPool
+
+
+class FakeDriver:
+    window_handles = ["main"]
+
+    def quit(self):
+        pass
+
+
+def failing_factory(failures):
+    """A driver factory whose first `failures` launches fail."""
+    calls = []
+
+    def factory():
+        calls.append(None)
+        if len(calls) <= failures:
+            raise OSError(f"launch {len(calls)} failed")
+        return FakeDriver()
+    return factory
+
+
+def test_failed_launch_is_retried():
+    pool = BrowserPool(factory=failing_factory(1), size=1, contexts=False)
+    with pytest.raises(OSError):
+        pool.acquire(timeout=5)
+    assert isinstance(pool.acquire(timeout=5), FakeDriver)
+    pool.close()
+
+def test_pool_gives_up_after_repeated_launch_failures():
+    pool = BrowserPool(factory=failing_factory(LAUNCH_RETRIES + 1), size=1, contexts=False)
+    for _ in range(LAUNCH_RETRIES + 1):
+        with pytest.raises(OSError):
+            pool.acquire(timeout=5)
+    with pytest.raises(RuntimeError, match="exhausted"):
+        pool.acquire(timeout=5)
+    pool.close()
+
+def test_waiting_too_long_reports_an_exhausted_pool():
+    pool = BrowserPool(factory=FakeDriver, size=1, contexts=False)
+    pool.acquire(timeout=5)
+    with pytest.raises(RuntimeError, match="no session became idle"):
+        pool.acquire(timeout=0.05)
+    pool.close()
@@ -0,0 +1,54 @@
+from types import SimpleNamespace
+
+import pytest
+
+from framework import checkpoints
+
+
+class FakeDriver:
+    current_url = "https://www.reliancedigital.in/cart"
+
+    def get_cookies(self):
+        return [{"name": "session", "value": "abc"}]
+
+    def execute_script(self, script, *args):
+        return {"localStorage": {"pin": "560001"}, "sessionStorage": {}}
+
+
+@pytest.fixture(autouse=True)
+def key(monkeypatch):
+    monkeypatch.setenv("SESSION_KEY", "ZmDfcTF7_60GrrY167zsiPd67pEvs0aGOv2oasOM1Pg=")
+
+
+def test_checkpoint_round_trip(tmp_path):
+    checkpoints.save_checkpoint(FakeDriver(), "item-in-cart", {"wishlisted"}, str(tmp_path))
+    checkpoint = checkpoints.load_checkpoint("item-in-cart", str(tmp_path))
+    assert checkpoint["url"] == FakeDriver.current_url
+    assert checkpoint["state"] == ["wishlisted"]
+    assert checkpoint["localStorage"] == {"pin": "560001"}
+    assert b"560001" not in next(tmp_path.iterdir()).read_bytes()
+
+def test_old_and_missing_checkpoints_are_ignored(tmp_path):
+    checkpoints.save_checkpoint(FakeDriver(), "logged-in", (), str(tmp_path))
+    assert checkpoints.load_checkpoint("logged-in", str(tmp_path), max_age=0) is None
+    assert checkpoints.load_checkpoint("pin-set", str(tmp_path)) is None
+
+def test_unreadable_checkpoint_is_ignored(tmp_path, monkeypatch):
+    checkpoints.save_checkpoint(FakeDriver(), "logged-in", (), str(tmp_path))
+    monkeypatch.setenv("SESSION_KEY", "bmV3LWtleS1uZXcta2V5LW5ldy1rZXktbmV3LWtleSE=")
+    assert checkpoints.load_checkpoint("logged-in", str(tmp_path)) is None
+
+ITEMS = [SimpleNamespace(nodeid=f"tests/test_script.py::{name}", name=name)
+         for name in ("test_login", "test_add_to_cart", "test_remove_from_cart")]
+
+def test_resume_point_by_name_or_node_id():
+    assert checkpoints.resume_point(ITEMS, start_at="test_add_to_cart") == 1
+    assert checkpoints.resume_point(ITEMS, start_at="tests/test_script.py::test_remove_from_cart") == 2
+
+def test_resume_point_at_the_first_failure_in_file_order():
+    failed = ["tests/test_script.py::test_remove_from_cart", "tests/test_script.py::test_add_to_cart"]
+    assert checkpoints.resume_point(ITEMS, failed) == 1
+
+def test_nothing_to_resume_from():
+    assert checkpoints.resume_point(ITEMS, []) is None
+    assert checkpoints.resume_point(ITEMS, start_at="test_missing") is None
@@ -0,0 +1,82 @@
+from framework import flows
+from framework.browser_pool import BrowserPool
+
+
+class FakeChrome:
+    """Just enough of a driver and of Chrome's Target domain to open and dispose of contexts."""
+    window_setup = None
+
+    def __init__(self):
+        self.current = "default"
+        self.targets = [{"targetId": "default", "type": "page", "browserContextId": "main"}]
+        self.contexts = 0
+        self.tabs = 0
+        driver = self
+
+        class SwitchTo:
+            def window(self, handle):
+                driver.current = handle
+        self.switch_to = SwitchTo()
+
+    @property
+    def current_window_handle(self):
+        return self.current
+
+    @property
+    def window_handles(self):
+        return [target["targetId"] for target in self.targets]
+
+    def open_tab(self, context):
+        self.tabs += 1
+        self.targets.append({"targetId": f"tab-{self.tabs}", "type": "page", "browserContextId": context})
+
+    def close(self):
+        self.targets = [target for target in self.targets if target["targetId"] != self.current]
+
+    def quit(self):
+        pass
+
+    def execute_cdp_cmd(self, cmd, params):
+        if cmd == "Target.createBrowserContext":
+            self.contexts += 1
+            return {"browserContextId": f"context-{self.contexts}"}
+        if cmd == "Target.createTarget":
+            self.open_tab(params["browserContextId"])
+            return {"targetId": self.targets[-1]["targetId"]}
+        if cmd == "Target.getTargets":
+            return {"targetInfos": self.targets}
+        if cmd == "Performance.getMetrics":
+            return {"metrics": [{"name": "JSHeapUsedSize", "value": 2 ** 20}, {"name": "Nodes", "value": 100}]}
+        if cmd == "Target.disposeBrowserContext":
+            self.targets = [target for target in self.targets if target["browserContextId"] != params["browserContextId"]]
+        return {}
+
+
+def test_every_test_gets_a_fresh_context():
+    pool = BrowserPool(factory=FakeChrome, size=1, contexts=True)
+    driver = pool.acquire(timeout=5)
+    first = driver.current
+    assert first != "default" and driver.main_window == first
+    pool.release(driver)
+    assert pool.acquire(timeout=5).current not in ("default", first)
+    pool.close()
+
+def test_closing_a_context_disposes_of_its_tabs_and_measures_them():
+    pool = BrowserPool(factory=FakeChrome, size=1, contexts=True)
+    driver = pool.acquire(timeout=5)
+    driver.open_tab(driver.context.id)
+    usage = pool.release(driver)
+    assert usage["JSHeapUsedSize"] == 2 * 2 ** 20 and usage["Nodes"] == 200
+    assert driver.window_handles == ["default"] and driver.current == "default"
+    assert pool.close()["contexts"] == 1
+
+def test_switch_to_main_window_stays_in_the_context():
+    pool = BrowserPool(factory=FakeChrome, size=1, contexts=True)
+    driver = pool.acquire(timeout=5)
+    main = driver.current
+    driver.open_tab(driver.context.id)
+    driver.switch_to.window(driver.window_handles[-1])
+    flows.switch_to_main_window(driver)
+    assert driver.current == main
+    assert driver.window_handles == ["default", main]
+    pool.close()
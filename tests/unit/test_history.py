@@ -0,0 +1,82 @@
+import time
+
+import pytest
+
+from framework import history, instrumentation
+
+
+def result(name, started_at, wall=2.0, steps=()):
+    return {"test": name, "started_at": started_at, "wall": wall, "sleep": 0.0, "wait": 1.0, "execute": 0.5,
+            "commands": 10, "tags": {}, "steps": list(steps)}
+
+def wait_step(step, target, outcome="ok", duration=0.5):
+    return {"step": step, "target": target, "offset": 0.1, "duration": duration, "sleep": 0.0,
+            "wait": duration, "execute": 0.0, "commands": 2, "outcome": outcome}
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "history.db")
+
+@pytest.fixture
+def connection(db):
+    connection = history.connect(db)
+    yield connection
+    connection.close()
+
+
+def test_record_run_puts_workers_of_one_run_together(db, connection):
+    now = time.time()
+    history.record_run("run-1", [result("test_a", now)], {"test_a": ("passed", None, None)}, worker="gw0", path=db)
+    history.record_run("run-1", [result("test_b", now - 5)], {"test_b": ("passed", None, None)}, worker="gw1", path=db)
+    _, rows = history.recent_runs(connection)
+    assert len(rows) == 1
+    assert rows[0][4] == 2  # tests
+
+def test_flaky_tests_count_outcome_flips(db, connection):
+    now = time.time()
+    for number, outcome in enumerate(("passed", "failed", "passed", "passed")):
+        history.record_run(f"run-{number}", [result("test_a", now - 100 + number)],
+                           {"test_a": (outcome, "call" if outcome == "failed" else None, None)}, path=db)
+    _, rows = history.flaky_tests(connection)
+    assert rows == [("test_a", 4, 1, 0.25, 2)]
+
+def test_failed_in_last_run(db, connection):
+    now = time.time()
+    history.record_run("old", [result("test_a", now - 100)], {"test_a": ("failed", "call", "boom")}, path=db)
+    history.record_run("new", [result("test_a", now), result("test_b", now + 1)],
+                       {"test_a": ("passed", None, None), "test_b": ("failed", "call", "boom")}, path=db)
+    assert history.failed_in_last_run(connection) == ["test_b"]
+
+def test_timeouts_include_page_ready_waits(db, connection):
+    steps = [wait_step("wait_for_page_ready", "search results", "timeout", 10.0),
+             wait_step("wait_for_element", "id body")]
+    history.record_run("run", [result("test_search", time.time(), steps=steps)],
+                       {"test_search": ("passed", None, None)}, path=db)
+    _, rows = history.timeouts(connection, "search")
+    assert [(test, kind, locator, timeouts) for test, kind, locator, _, timeouts, _, _ in rows] == \
+        [("test_search", "page", "search results", 1)]
+
+def test_slower_steps_compare_with_the_period_before(db, connection):
+    now = time.time()
+    history.record_run("before", [result("test_a", now - 10 * 86400, steps=[wait_step("find", "LOGIN", duration=1.0)])],
+                       {}, path=db)
+    history.record_run("recent", [result("test_a", now, steps=[wait_step("find", "LOGIN", duration=3.0)])], {}, path=db)
+    _, rows = history.slower_steps(connection, days=7)
+    assert rows == [("find", "LOGIN", 3.0, 1.0, 2.0, 1)]
+
+def test_marked_outcome_is_recorded_on_the_step(monkeypatch):
+    monkeypatch.setattr(instrumentation, "results", [])
+
+    @instrumentation.step("wait")
+    def settle(driver):
+        instrumentation.mark_outcome("timeout")
+
+    @instrumentation.step()
+    def journey(driver):
+        settle(driver)
+
+    instrumentation.start_test("test_marked")
+    journey(None)
+    summary = instrumentation.finish_test()
+    assert {step["step"]: step["outcome"] for step in summary["steps"]} == {"settle": "timeout", "journey": "ok"}
@@ -0,0 +1,71 @@
+import itertools
+import time
+
+import pytest
+
+from framework import history, latency_model
+from framework.latency_model import DEFAULT_TIMEOUT, MAX_TIMEOUT, MIN_SAMPLES, MIN_TIMEOUT, LatencyModel
+
+
+@pytest.fixture
+def model(tmp_path):
+    return LatencyModel(str(tmp_path / "history.db"))
+
+
+def test_default_timeout_until_there_are_enough_samples(model):
+    for _ in range(MIN_SAMPLES - 1):
+        model.observe("LOGIN", 0.2)
+    assert model.timeout("LOGIN") == DEFAULT_TIMEOUT
+
+def test_timeout_is_the_scaled_percentile_within_bounds(model, monkeypatch):
+    monkeypatch.setattr(latency_model, "ENABLED", True)
+    for _ in range(MIN_SAMPLES):
+        model.observe("FAST", 0.1)
+        model.observe("MEDIUM", 4.0)
+        model.observe("SLOW", 60.0)
+    assert model.timeout("FAST") == MIN_TIMEOUT
+    assert model.timeout("MEDIUM") == 4.0 * latency_model.FACTOR
+    assert model.timeout("SLOW") == MAX_TIMEOUT
+
+def test_timed_out_waits_are_counted_but_not_learned(model, monkeypatch):
+    monkeypatch.setattr(latency_model, "ENABLED", True)
+    for _ in range(MIN_SAMPLES):
+        model.observe("LOGIN", 1.0)
+    for _ in range(MIN_SAMPLES * 3):
+        model.observe("LOGIN", 30.0, timed_out=True)
+    assert model.timeout("LOGIN") == max(1.0 * latency_model.FACTOR, MIN_TIMEOUT)
+    assert model.stats()[0]["timed_out"] == MIN_SAMPLES * 3
+
+def test_history_timeouts_are_not_learned(tmp_path):
+    path = str(tmp_path / "history.db")
+    steps = [{"step": "find", "target": "LOGIN", "offset": 0.0, "duration": duration, "sleep": 0.0, "wait": duration,
+              "execute": 0.0, "commands": 1, "outcome": outcome}
+             for duration, outcome in ((0.5, "ok"), (10.0, "Failed"))]
+    history.record_run("run", [{"test": "test_login", "started_at": time.time(), "wall": 11.0, "sleep": 0.0,
+                                "wait": 10.5, "execute": 0.0, "commands": 2, "steps": steps}], {}, path=path)
+    assert LatencyModel(path)._samples("LOGIN") == [0.5]
+
+def test_timeouts_are_learned_per_throttling_profile(model, monkeypatch):
+    monkeypatch.setattr(latency_model, "ENABLED", True)
+    for _ in range(MIN_SAMPLES):
+        model.observe("LOGIN", 0.1)
+    assert model.timeout("LOGIN") == MIN_TIMEOUT
+    assert model.timeout("LOGIN", throttling="3G") == DEFAULT_TIMEOUT
+    for _ in range(MIN_SAMPLES):
+        model.observe("LOGIN", 6.0, throttling="3G")
+    assert model.timeout("LOGIN", throttling="3G") == 6.0 * latency_model.FACTOR
+    assert model.timeout("LOGIN") == MIN_TIMEOUT
+
+def test_history_samples_keep_their_throttling_profile(tmp_path):
+    path = str(tmp_path / "history.db")
+    step = {"step": "find", "target": "LOGIN", "offset": 0.0, "duration": 4.0, "sleep": 0.0, "wait": 4.0,
+            "execute": 0.0, "commands": 1, "outcome": "ok"}
+    history.record_run("run", [{"test": "test_login", "started_at": time.time(), "wall": 4.0, "sleep": 0.0,
+                                "wait": 4.0, "execute": 0.0, "commands": 1, "steps": [step],
+                                "tags": {"throttling": "3G"}}], {}, path=path)
+    model = LatencyModel(path)
+    assert model._samples("LOGIN", "3G") == [4.0]
+    assert model._samples("LOGIN") == []
+
+def test_poll_intervals_back_off_to_the_maximum():
+    assert list(itertools.islice(latency_model.poll_intervals(0.1, 2, 0.5), 5)) == [0.1, 0.2, 0.4, 0.5, 0.5]
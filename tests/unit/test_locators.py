@@ -0,0 +1,62 @@
+import pytest
+from selenium.webdriver.common.by import By
+
+from framework import locators
+from framework.locators import LookupStats, define, xpath_to_css
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    """Keeps the locators defined by a test out of the suite's registry."""
+    monkeypatch.setattr(locators, "REGISTRY", dict(locators.REGISTRY))
+
+
+@pytest.mark.parametrize("xpath, css", [
+    ("//button", "button"),
+    ("//div[@id='login']", "div#login"),
+    ("//*[@id='login']", "#login"),
+    ("//input[@name='pin' and @type='text']", "input[name='pin'][type='text']"),
+    ("//div[@id='2fa']", "div[id='2fa']"),
+    ("//ul[@class='menu']/li//a", "ul[class='menu'] > li a"),
+])
+def test_simple_xpath_becomes_css(xpath, css):
+    assert xpath_to_css(xpath) == css
+
+@pytest.mark.parametrize("xpath", [
+    "//button[text()='Login']",
+    "//div[contains(@class, 'price')]",
+    "//li[2]",
+    "/html/body",
+    "(//a)[1]",
+    "//div/..",
+])
+def test_xpath_without_a_css_equivalent_is_kept(xpath):
+    assert xpath_to_css(xpath) is None
+
+def test_define_converts_and_deduplicates_selectors():
+    locator = define("test.login", (By.XPATH, "//*[@id='login']"), (By.CSS_SELECTOR, "#login"), (By.ID, "login"))
+    assert locator.selectors == [(By.CSS_SELECTOR, "#login"), (By.ID, "login")]
+
+def test_define_keeps_templates_as_xpath():
+    locator = define("test.brand", (By.XPATH, "//div[@title='{brand}']"))
+    assert locator.format(brand="Xiaomi").primary == (By.XPATH, "//div[@title='Xiaomi']")
+
+@pytest.mark.parametrize("selectors", [(), ((By.XPATH, "//a"), ("shadow", "a"))])
+def test_define_rejects_bad_definitions(selectors):
+    with pytest.raises(ValueError):
+        define("test.bad", *selectors)
+
+def test_define_rejects_duplicate_names():
+    define("test.twice", (By.ID, "a"))
+    with pytest.raises(ValueError):
+        define("test.twice", (By.ID, "b"))
+
+def test_lookup_stats_count_fallbacks_and_failures():
+    locator = locators.Locator("test.stats", [(By.ID, "a"), (By.ID, "b")])
+    stats = LookupStats()
+    stats.record(locator, 0.5, 0)
+    stats.record(locator, 1.5, 1)
+    stats.record(locator, 4.0, None)
+    row, = stats.report()
+    assert (row["lookups"], row["fallbacks"], row["failures"], row["mean"], row["max"]) == (3, 1, 1, 2.0, 4.0)
+    assert row["matched"] == {"id a": 1, "id b": 1}
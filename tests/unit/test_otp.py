@@ -0,0 +1,74 @@
+import threading
+
+import pytest
+
+from framework import otp
+
+
+@pytest.fixture
+def provider_setting(monkeypatch):
+    """Sets OTP_PROVIDER and forgets the provider created so far."""
+    monkeypatch.setattr(otp, "_provider", None)
+    return lambda name: monkeypatch.setattr(otp, "OTP_PROVIDER", name)
+
+
+def test_parse_otp_takes_the_first_six_digit_code():
+    assert otp.parse_otp("Your code is 123456. Do not share 654321") == "123456"
+
+def test_parse_otp_ignores_other_numbers():
+    assert otp.parse_otp("Call 98765 or 1234567") is None
+    assert otp.parse_otp(None) is None
+
+def test_base_provider_is_abstract():
+    with pytest.raises(TypeError):
+        otp.OtpProvider()
+
+@pytest.mark.parametrize("name, provider_class", [
+    ("config", otp.ConfigOtpProvider),
+    ("env", otp.EnvOtpProvider),
+    ("file", otp.FileOtpProvider),
+    ("manual", otp.ManualOtpProvider),
+])
+def test_provider_is_picked_by_name(provider_setting, name, provider_class):
+    provider_setting(name)
+    assert type(otp.get_otp_provider()) is provider_class
+
+def test_provider_is_created_once(provider_setting):
+    provider_setting("config")
+    assert otp.get_otp_provider() is otp.get_otp_provider()
+
+def test_unknown_provider_stops_the_run(provider_setting):
+    provider_setting("sms")
+    with pytest.raises(SystemExit):
+        otp.get_otp_provider()
+
+def test_auto_prefers_the_config_value(provider_setting, monkeypatch):
+    provider_setting("auto")
+    monkeypatch.setattr(otp, "OTP", "112233")
+    assert otp.get_otp_provider().wait_for_otp(None, 0) == "112233"
+
+def test_auto_uses_the_environment_without_a_config_value(provider_setting, monkeypatch):
+    provider_setting("auto")
+    monkeypatch.setattr(otp, "OTP", " ")
+    monkeypatch.setenv(otp.OTP_ENV, "445566")
+    assert otp.get_otp_provider().name == "env"
+
+def test_auto_falls_back_to_manual_entry(provider_setting, monkeypatch):
+    provider_setting("auto")
+    monkeypatch.setattr(otp, "OTP", " ")
+    monkeypatch.delenv(otp.OTP_ENV, raising=False)
+    assert otp.get_otp_provider().name == "manual"
+
+def test_file_provider_skips_a_code_left_from_before_the_wait(tmp_path):
+    path = tmp_path / "otp.txt"
+    path.write_text("old 111111")
+    provider = otp.FileOtpProvider(str(path), poll=0.01)
+    assert provider.wait_for_otp(None, 0.05) is None  # Left over from an earlier login
+
+def test_file_provider_consumes_a_new_code(tmp_path):
+    path = tmp_path / "otp.txt"
+    provider = otp.FileOtpProvider(str(path), poll=0.01)
+    writer = threading.Timer(0.05, path.write_text, ["Your OTP is 778899"])
+    writer.start()
+    assert provider.wait_for_otp(None, 2) == "778899"
+    assert not path.exists()
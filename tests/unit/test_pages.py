@@ -0,0 +1,42 @@
+import pytest
+
+from framework import locators, pages
+
+
+class FakeDriver:
+    page_generation = 0
+
+
+@pytest.fixture
+def found(monkeypatch):
+    """Records every lookup of pages.find and answers it with the locator's primary selector."""
+    lookups = []
+
+    def find(driver, locator, clickable=False):
+        lookups.append(locator.primary)
+        return locator.primary
+    monkeypatch.setattr(pages, "find", find)
+    return lookups
+
+
+def test_elements_are_cached_per_page(found):
+    page = pages.Page(FakeDriver())
+    assert page.element(locators.CLEAR_FILTERS) is page.element(locators.CLEAR_FILTERS)
+    assert len(found) == 1
+
+def test_filled_in_templates_are_cached_apart(found):
+    page = pages.FilterPanel(FakeDriver())
+    xiaomi = page.element(locators.BRAND.format(brand="Xiaomi"))
+    samsung = page.element(locators.BRAND.format(brand="Samsung"))
+    assert "Xiaomi" in xiaomi[1] and "Samsung" in samsung[1]
+    assert len(found) == 2
+    assert page.element(locators.BRAND.format(brand="Xiaomi")) == xiaomi
+    assert len(found) == 2
+
+def test_a_new_page_generation_drops_the_cache(found):
+    driver = FakeDriver()
+    page = pages.Page(driver)
+    page.element(locators.CLEAR_FILTERS)
+    driver.page_generation = 1
+    page.element(locators.CLEAR_FILTERS)
+    assert len(found) == 2
@@ -0,0 +1,49 @@
+import base64
+
+import pytest
+
+from framework.replay import Archive
+
+
+def exchange(url, status=200, method="GET", body=b""):
+    return {"method": method, "url": url, "request_body": base64.b64encode(body).decode(), "status": status}
+
+
+def test_lookup_matches_method_url_and_body():
+    archive = Archive()
+    archive.add(exchange("https://site/api", 201, "POST", b'{"pin": 1}'))
+    archive.add(exchange("https://site/api", 202, "POST", b'{"pin": 2}'))
+    assert archive.lookup("POST", "https://site/api", b'{"pin": 2}')["status"] == 202
+
+def test_lookup_falls_back_to_the_url_for_another_body():
+    archive = Archive()
+    archive.add(exchange("https://site/api", 201, "POST", b'{"pin": 1}'))
+    assert archive.lookup("POST", "https://site/api", b'{"pin": 3}')["status"] == 201
+
+def test_lookup_ignores_the_query_string_as_a_last_resort():
+    archive = Archive()
+    archive.add(exchange("https://site/app.js?v=1"))
+    assert archive.lookup("GET", "https://site/app.js?v=2", b"")["url"] == "https://site/app.js?v=1"
+
+def test_lookup_does_not_mix_methods():
+    archive = Archive()
+    archive.add(exchange("https://site/cart", method="POST"))
+    assert archive.lookup("GET", "https://site/cart", b"") is None
+
+def test_repeated_requests_replay_in_recorded_order_then_repeat_the_last():
+    archive = Archive()
+    for status in (200, 201, 202):
+        archive.add(exchange("https://site/cart", status))
+    assert [archive.lookup("GET", "https://site/cart", b"")["status"] for _ in range(4)] == [200, 201, 202, 202]
+
+def test_saved_archive_loads_back(tmp_path):
+    archive = Archive(str(tmp_path))
+    archive.add(exchange("https://site/"))
+    archive.save("run")
+    loaded = Archive(str(tmp_path))
+    loaded.load()
+    assert loaded.lookup("GET", "https://site/", b"")["status"] == 200
+
+def test_load_without_recordings_stops_the_run(tmp_path):
+    with pytest.raises(SystemExit):
+        Archive(str(tmp_path)).load()
@@ -0,0 +1,76 @@
+import pytest
+
+from framework import scheduler
+from framework.scheduler import DEFAULT_DURATION, blocks, expected, longest_first, select_within_budget, shards
+
+
+class Marker:
+    def __init__(self, name):
+        self.args = (name,)
+
+
+class Item:
+    def __init__(self, nodeid, group=None):
+        self.nodeid = nodeid
+        self.group = group
+
+    def get_closest_marker(self, name):
+        return Marker(self.group) if name == "xdist_group" and self.group else None
+
+    def __repr__(self):
+        return self.nodeid
+
+
+def history(**durations):
+    return {name: {"duration": duration, "failure_rate": 0.0, "runs": 5} for name, duration in durations.items()}
+
+
+def test_tests_without_history_count_as_the_default_and_half_failing():
+    assert expected({}, "new") == (DEFAULT_DURATION, 1 + scheduler.FAILURE_WEIGHT * 0.5)
+
+def test_blocks_keep_groups_together_in_file_order():
+    items = [Item("a", "account"), Item("b"), Item("c", "account")]
+    assert blocks(items) == [[items[0], items[2]], [items[1]]]
+
+def test_longest_first_orders_blocks_by_their_summed_duration():
+    items = [Item("a", "account"), Item("b"), Item("c", "account"), Item("d")]
+    stats = history(a=10, b=25, c=20, d=5)
+    assert [item.nodeid for item in longest_first(items, stats)] == ["a", "c", "b", "d"]
+
+def test_shards_balance_the_expected_durations():
+    items = [Item(name) for name in "abcd"]
+    stats = history(a=40, b=30, c=20, d=10)
+    assert [[item.nodeid for item in shard] for shard in shards(items, stats, 2)] == [["a", "d"], ["b", "c"]]
+
+def test_budget_prefers_tests_that_fail_more_often():
+    stats = history(a=10, b=10, c=10)
+    stats["b"]["failure_rate"] = 0.5
+    assert select_within_budget([["a"], ["b"], ["c"]], stats, budget=10) == {"b"}
+
+def test_budget_fills_every_worker():
+    stats = history(a=10, b=10, c=10)
+    assert select_within_budget([["a"], ["b"], ["c"]], stats, budget=10, workers=2) in ({"a", "b"}, {"a", "c"}, {"b", "c"})
+
+def test_group_longer_than_the_budget_of_one_worker_is_dropped():
+    stats = history(a=8, b=8, c=5)
+    # a and b together fit into the budget of two workers, but the group runs on one
+    assert select_within_budget([["a", "b"], ["c"]], stats, budget=10, workers=2) == {"c"}
+
+def test_picked_blocks_must_spread_over_the_workers_within_the_budget():
+    stats = history(a=6, b=6, c=6)
+    # 18s fit into 2 x 10s, but three 6s tests cannot be split into two workers of 10s
+    assert len(select_within_budget([["a"], ["b"], ["c"]], stats, budget=10, workers=2)) == 2
+
+def test_budget_below_the_default_duration_selects_nothing_without_history():
+    assert select_within_budget([["new"]], {}, budget=DEFAULT_DURATION - 1) == set()
+
+@pytest.mark.parametrize("budget, selected", [(None, 3), (15, 2), (8, 1)])
+def test_plan_marks_the_selected_tests(budget, selected):
+    rows = scheduler.plan(["a", "b", "c"], history(a=10, b=20, c=5), budget)
+    assert [row[0] for row in rows] == ["b", "a", "c"]
+    assert sum(row[4] for row in rows) == selected
+
+def test_load_stats_does_not_create_a_missing_history(tmp_path):
+    path = tmp_path / "history.sqlite"
+    assert scheduler.load_stats(str(path)) == {}
+    assert not path.exists()
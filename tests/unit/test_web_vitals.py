@@ -0,0 +1,31 @@
+from framework.web_vitals import check_budgets
+
+BUDGETS = {
+    "*": {"cls": 0.25, "total_blocking_time": 1500},
+    "home page": {"lcp": 5000},
+    "home page [3G]": {"lcp": 12000},
+}
+
+
+def test_metrics_within_budget_pass():
+    assert check_budgets("home page", {"cls": 0.1, "lcp": 4000, "total_blocking_time": 100}, BUDGETS) == []
+
+def test_page_budget_applies_on_top_of_the_default():
+    assert check_budgets("home page", {"cls": 0.3, "lcp": 6000}, BUDGETS) == [
+        "home page: cls 0.3 over budget 0.25",
+        "home page: lcp 6000 over budget 5000",
+    ]
+
+def test_default_budget_applies_to_other_pages():
+    assert check_budgets("search results", {"lcp": 9000, "total_blocking_time": 2000}, BUDGETS) == [
+        "search results: total_blocking_time 2000 over budget 1500",
+    ]
+
+def test_throttling_budget_takes_precedence():
+    assert check_budgets("home page", {"lcp": 9000}, BUDGETS, throttling="3G") == []
+    assert check_budgets("home page", {"lcp": 9000}, BUDGETS, throttling="slow-4G") == [
+        "home page: lcp 9000 over budget 5000",
+    ]
+
+def test_missing_metrics_are_not_violations():
+    assert check_budgets("home page", {"lcp": None}, BUDGETS) == []